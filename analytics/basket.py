@@ -0,0 +1,179 @@
+# backend/analytics/basket.py
+"""
+Market-basket co-occurrence engine: counts how often variations are bought together in
+completed orders and serves support / confidence / lift for upsell suggestions.
+"""
+import heapq
+import threading
+import time
+from collections import Counter
+from itertools import combinations, groupby
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from orders.models import OrderItems
+from .models import VariationCooccurrence, VariationOrderCount, MarketBasketStats
+
+STATS_PK = 1
+MAX_PAIRINGS = 20
+
+
+def _pairs(variation_ids):
+    return list(combinations(sorted(set(variation_ids)), 2))
+
+
+@transaction.atomic
+def record_basket(variation_ids):
+    """Adds one completed order containing `variation_ids` to the matrix."""
+    items = sorted(set(variation_ids))
+    if not items:
+        return
+    pairs = _pairs(items)
+
+    VariationOrderCount.objects.bulk_create(
+        [VariationOrderCount(variation_id=v, order_count=0) for v in items], ignore_conflicts=True
+    )
+    VariationOrderCount.objects.filter(variation_id__in=items).update(order_count=F('order_count') + 1)
+
+    if pairs:
+        VariationCooccurrence.objects.bulk_create(
+            [VariationCooccurrence(variation_a_id=a, variation_b_id=b, order_count=0) for a, b in pairs],
+            ignore_conflicts=True,
+        )
+        pair_filter = Q()
+        for a, b in pairs:
+            pair_filter |= Q(variation_a_id=a, variation_b_id=b)
+        VariationCooccurrence.objects.filter(pair_filter).update(order_count=F('order_count') + 1)
+
+    MarketBasketStats.objects.get_or_create(pk=STATS_PK)
+    MarketBasketStats.objects.filter(pk=STATS_PK).update(order_count=F('order_count') + 1, updated_at=timezone.now())
+
+    transaction.on_commit(basket_index.invalidate)
+
+
+def record_order(order):
+    record_basket(order.order_items.values_list('variation_id', flat=True))
+
+
+def rebuild(chunk_size=2000, batch_size=1000):
+    """
+    Recomputes the whole matrix from order history.
+
+    Order items are streamed in order_id order with a server-side cursor, so only the running
+    counters (bounded by the menu size, not by the number of orders) are held in memory.
+    Returns (orders, pairs) counted.
+    """
+    item_counts = Counter()
+    pair_counts = Counter()
+    total_orders = 0
+
+    rows = (
+        OrderItems.objects.filter(order__status='completed')
+        .order_by('order_id')
+        .values_list('order_id', 'variation_id')
+        .iterator(chunk_size=chunk_size)
+    )
+    for _, group in groupby(rows, key=itemgetter(0)):
+        items = sorted({variation_id for _, variation_id in group})
+        total_orders += 1
+        item_counts.update(items)
+        pair_counts.update(combinations(items, 2))
+
+    with transaction.atomic():
+        VariationCooccurrence.objects.all().delete()
+        VariationOrderCount.objects.all().delete()
+        VariationOrderCount.objects.bulk_create(
+            (VariationOrderCount(variation_id=v, order_count=c) for v, c in item_counts.items()),
+            batch_size=batch_size,
+        )
+        VariationCooccurrence.objects.bulk_create(
+            (VariationCooccurrence(variation_a_id=a, variation_b_id=b, order_count=c) for (a, b), c in pair_counts.items()),
+            batch_size=batch_size,
+        )
+        MarketBasketStats.objects.update_or_create(
+            pk=STATS_PK, defaults={'order_count': total_orders, 'rebuilt_at': timezone.now()}
+        )
+        transaction.on_commit(basket_index.invalidate)
+
+    return total_orders, len(pair_counts)
+
+
+class BasketIndex:
+    """In-memory copy of the matrix with memoized top-k pairings per variation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._neighbours = {}
+        self._item_counts = {}
+        self._total_orders = 0
+        self._top = {}
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def _ensure_loaded(self):
+        ttl = settings.MARKET_BASKET_INDEX_TTL
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < ttl:
+                return
+
+            neighbours = {}
+            for a, b, count in VariationCooccurrence.objects.values_list(
+                'variation_a_id', 'variation_b_id', 'order_count'
+            ).iterator():
+                neighbours.setdefault(a, {})[b] = count
+                neighbours.setdefault(b, {})[a] = count
+
+            self._neighbours = neighbours
+            self._item_counts = dict(VariationOrderCount.objects.values_list('variation_id', 'order_count'))
+            stats = MarketBasketStats.objects.filter(pk=STATS_PK).first()
+            self._total_orders = stats.order_count if stats else 0
+            self._top = {}
+            self._loaded_at = time.monotonic()
+
+    def pairings(self, variation_id, k=5, min_count=3):
+        """
+        Returns up to `k` variations most often bought with `variation_id`, ranked by lift.
+
+        Each entry has support (share of all orders containing both), confidence (share of
+        orders with `variation_id` that also contain the other variation) and lift
+        (confidence relative to how often the other variation is bought at all).
+        """
+        self._ensure_loaded()
+        cache_key = (variation_id, min_count)
+        ranked = self._top.get(cache_key)
+
+        if ranked is None:
+            total = self._total_orders
+            base_count = self._item_counts.get(variation_id, 0)
+            ranked = []
+            if total and base_count:
+                for other_id, together in self._neighbours.get(variation_id, {}).items():
+                    other_count = self._item_counts.get(other_id, 0)
+                    if together < min_count or not other_count:
+                        continue
+                    confidence = together / base_count
+                    lift = confidence / (other_count / total)
+                    ranked.append({
+                        'variation_id': other_id,
+                        'order_count': together,
+                        'support': round(together / total, 4),
+                        'confidence': round(confidence, 4),
+                        'lift': round(lift, 4),
+                    })
+                ranked = heapq.nlargest(
+                    MAX_PAIRINGS, ranked,
+                    key=lambda p: (p['lift'], p['confidence']),
+                )
+            self._top[cache_key] = ranked
+
+        return ranked[:k]
+
+
+basket_index = BasketIndex()
@@ -0,0 +1,172 @@
+# backend/analytics/comparison.py
+"""Period-over-period comparisons for the performance report and the stored analytics reports."""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Sum, Count, Q, F
+from django.utils import timezone
+
+from orders.models import Orders, OrderItems
+from .models import Analytics
+
+COMPARE_MODES = ('previous', 'last_year')
+REPORT_FIELDS = (
+    'total_sales_revenue', 'total_order_count', 'online_order_count',
+    'walkin_order_count', 'avg_items_per_order',
+)
+
+
+def _shift_year(d, years=-1):
+    try:
+        return d.replace(year=d.year + years)
+    except ValueError:
+        # 29 February -> 28 February
+        return d.replace(year=d.year + years, day=28)
+
+
+def comparison_period(start_date, end_date, mode):
+    """The period `start_date`..`end_date` is compared against."""
+    if mode == 'last_year':
+        return _shift_year(start_date), _shift_year(end_date)
+    length = end_date - start_date
+    previous_end = start_date - timedelta(days=1)
+    return previous_end - length, previous_end
+
+
+def _change(current, previous):
+    current = current or 0
+    previous = previous or 0
+    change = current - previous
+    percent_change = round(float(change) / float(previous) * 100, 2) if previous else None
+    return {'current': current, 'previous': previous, 'change': change, 'percent_change': percent_change}
+
+
+def _bounds(start_date, end_date):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(start_date, time.min), tz)
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def compare_performance(start_date, end_date, previous_start, previous_end):
+    """
+    Summary and per-variation performance for both periods, with deltas.
+
+    Each period is a filtered aggregate over one scan of the union of both ranges, and items
+    are grouped by variation_id so a renamed dish still lines up with its past sales.
+    """
+    current_start, current_end = _bounds(start_date, end_date)
+    prev_start, prev_end = _bounds(previous_start, previous_end)
+
+    current_orders = Q(processed_at__gte=current_start, processed_at__lt=current_end)
+    previous_orders = Q(processed_at__gte=prev_start, processed_at__lt=prev_end)
+    totals = Orders.objects.filter(status='completed').filter(current_orders | previous_orders).aggregate(
+        total_revenue=Sum('total_amount', filter=current_orders),
+        previous_total_revenue=Sum('total_amount', filter=previous_orders),
+        total_orders=Count('id', filter=current_orders),
+        previous_total_orders=Count('id', filter=previous_orders),
+    )
+
+    current_items = Q(order__processed_at__gte=current_start, order__processed_at__lt=current_end)
+    previous_items = Q(order__processed_at__gte=prev_start, order__processed_at__lt=prev_end)
+    line_revenue = F('quantity') * F('price_at_order')
+    rows = (
+        OrderItems.objects.filter(order__status='completed')
+        .filter(current_items | previous_items)
+        .values('variation_id')
+        .annotate(
+            item_name=F('variation__menu_item__name'),
+            variation_name=F('variation__size_name'),
+            units_sold=Sum('quantity', filter=current_items),
+            previous_units_sold=Sum('quantity', filter=previous_items),
+            total_revenue=Sum(line_revenue, filter=current_items),
+            previous_total_revenue=Sum(line_revenue, filter=previous_items),
+        )
+    )
+
+    item_performance = []
+    items_sold = previous_items_sold = 0
+    for row in rows:
+        units = row['units_sold'] or 0
+        previous_units = row['previous_units_sold'] or 0
+        revenue = row['total_revenue'] or Decimal('0.00')
+        previous_revenue = row['previous_total_revenue'] or Decimal('0.00')
+        items_sold += units
+        previous_items_sold += previous_units
+
+        revenue_change = _change(revenue, previous_revenue)
+        item_performance.append({
+            'variation_id': row['variation_id'],
+            'item_name': row['item_name'],
+            'variation_name': row['variation_name'],
+            'units_sold': units,
+            'previous_units_sold': previous_units,
+            'units_change': units - previous_units,
+            'total_revenue': revenue,
+            'previous_total_revenue': previous_revenue,
+            'revenue_change': revenue_change['change'],
+            'revenue_percent_change': revenue_change['percent_change'],
+            'average_price': (revenue / units) if units else None,
+        })
+    item_performance.sort(key=lambda item: item['total_revenue'], reverse=True)
+
+    def average(revenue, orders):
+        return (revenue / orders) if orders else 0
+
+    summary = {
+        'total_revenue': _change(totals['total_revenue'], totals['previous_total_revenue']),
+        'total_orders': _change(totals['total_orders'], totals['previous_total_orders']),
+        'total_items_sold': _change(items_sold, previous_items_sold),
+        'average_order_value': _change(
+            average(totals['total_revenue'] or 0, totals['total_orders']),
+            average(totals['previous_total_revenue'] or 0, totals['previous_total_orders']),
+        ),
+    }
+
+    return {
+        'current_period': {'start_date': start_date, 'end_date': end_date},
+        'previous_period': {'start_date': previous_start, 'end_date': previous_end},
+        'summary': summary,
+        'item_performance': item_performance,
+    }
+
+
+def find_comparison_report(report, mode):
+    reports = Analytics.objects.filter(report_type=report.report_type)
+    if mode == 'last_year':
+        if report.report_type == 'weekly':
+            # Same week of the year, so weekdays line up.
+            return reports.filter(start_date=report.start_date - timedelta(weeks=52)).first()
+        return reports.filter(start_date=_shift_year(report.start_date)).first()
+    return reports.filter(start_date__lt=report.start_date).order_by('-start_date').first()
+
+
+def compare_reports(report, previous):
+    """Deltas between two stored Analytics rows; dishes are joined on menu_item_id when recorded."""
+    summary = {
+        field: _change(getattr(report, field), getattr(previous, field) if previous else 0)
+        for field in REPORT_FIELDS
+    }
+
+    previous_dishes = previous.dish_performance if previous else []
+    by_id = {d['menu_item_id']: d for d in previous_dishes if d.get('menu_item_id')}
+    # Reports generated before menu_item_id was recorded can only be matched by name.
+    by_name = {d.get('dish_name'): d for d in previous_dishes if not d.get('menu_item_id')}
+
+    dishes = []
+    for dish in report.dish_performance:
+        before = by_id.get(dish.get('menu_item_id')) or by_name.get(dish.get('dish_name'), {})
+        dishes.append({
+            **dish,
+            'previous_sold': before.get('sold', 0),
+            'sold_change': dish.get('sold', 0) - before.get('sold', 0),
+        })
+
+    return {
+        'previous_report_id': previous.id if previous else None,
+        'previous_period': (
+            {'start_date': previous.start_date, 'end_date': previous.end_date} if previous else None
+        ),
+        'summary': summary,
+        'dish_performance': dishes,
+    }
@@ -0,0 +1,121 @@
+# backend/analytics/forecasting.py
+"""
+Per-variation demand forecasting for prep planning.
+
+Every variation is fitted at once: the hourly sales history is loaded into a single
+(variations x days x 24) array and the seasonal profile and trend are computed with
+vectorized NumPy operations, so the cost is one grouped query plus a few array passes.
+"""
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from menu.models import Variations
+from orders.models import OrderItems
+from .models import DemandForecast
+
+# Weight of a week relative to the week after it when averaging the weekday x hour profile.
+WEEK_DECAY = 0.8
+# Bounds on how far the trend may scale the seasonal profile, to avoid wild extrapolation.
+TREND_CLIP = (0.5, 1.5)
+
+
+def load_hourly_sales(variation_ids, start_date, num_days):
+    """Returns a (variations x num_days x 24) array of units sold, in local time."""
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(start_date, time.min), tz)
+    end = start + timedelta(days=num_days)
+
+    index = {variation_id: i for i, variation_id in enumerate(variation_ids)}
+    sales = np.zeros((len(variation_ids), num_days * 24), dtype=np.float64)
+
+    rows = (
+        OrderItems.objects.filter(
+            order__status='completed',
+            order__created_at__gte=start,
+            order__created_at__lt=end,
+            variation_id__in=variation_ids,
+        )
+        .annotate(hour=TruncHour('order__created_at', tzinfo=tz))
+        .values('variation_id', 'hour')
+        .annotate(units=Sum('quantity'))
+        .values_list('variation_id', 'hour', 'units')
+    )
+    naive_start = datetime.combine(start_date, time.min)
+    for variation_id, hour, units in rows:
+        local_hour = timezone.localtime(hour, tz).replace(tzinfo=None) if timezone.is_aware(hour) else hour
+        slot = int((local_hour - naive_start).total_seconds() // 3600)
+        if 0 <= slot < num_days * 24:
+            sales[index[variation_id], slot] += units
+
+    return sales.reshape(len(variation_ids), num_days, 24)
+
+
+def fit_predict(sales, start_date, target_date):
+    """
+    Predicts units per variation and hour for `target_date`.
+
+    The seasonal component is a recency-weighted mean of the same weekday's hourly sales.
+    The trend is a least-squares line through each variation's weekly totals, extrapolated
+    to the target week and applied as a multiplier on the seasonal profile.
+    Returns a (variations x 24) array.
+    """
+    num_variations, num_days, _ = sales.shape
+    day_offsets = np.arange(num_days)
+    weekdays = (start_date.weekday() + day_offsets) % 7
+    days_before_target = (target_date - start_date).days - day_offsets
+    weeks_ago = (days_before_target - 1) // 7
+
+    # Seasonal profile for the target weekday.
+    same_weekday = weekdays == target_date.weekday()
+    weights = np.where(same_weekday, WEEK_DECAY ** weeks_ago, 0.0)
+    if weights.sum() == 0:
+        return np.zeros((num_variations, 24))
+    profile = np.einsum('vdh,d->vh', sales, weights) / weights.sum()
+
+    # Trend over full weeks, oldest first, ending on the day before the target.
+    num_weeks = num_days // 7
+    if num_weeks >= 2:
+        daily_totals = sales[:, num_days - num_weeks * 7:, :].sum(axis=2)
+        weekly_totals = daily_totals.reshape(num_variations, num_weeks, 7).sum(axis=2)
+        t = np.arange(num_weeks, dtype=np.float64)
+        t_centered = t - t.mean()
+        mean_weekly = weekly_totals.mean(axis=1)
+        slope = (weekly_totals - mean_weekly[:, None]) @ t_centered / (t_centered ** 2).sum()
+        fitted_next_week = mean_weekly + slope * (num_weeks - t.mean())
+        with np.errstate(divide='ignore', invalid='ignore'):
+            trend = np.where(mean_weekly > 0, fitted_next_week / mean_weekly, 1.0)
+        profile *= np.clip(trend, *TREND_CLIP)[:, None]
+
+    return np.clip(profile, 0.0, None)
+
+
+def generate_forecasts(target_date, weeks=8, min_units=0.01):
+    """Fits every variation and replaces the stored forecast for `target_date`."""
+    variation_ids = list(Variations.objects.order_by('id').values_list('id', flat=True))
+    num_days = weeks * 7
+    start_date = target_date - timedelta(days=num_days)
+
+    sales = load_hourly_sales(variation_ids, start_date, num_days)
+    predictions = fit_predict(sales, start_date, target_date)
+
+    rows = [
+        DemandForecast(
+            variation_id=variation_id,
+            forecast_date=target_date,
+            hour=hour,
+            predicted_units=round(float(predictions[i, hour]), 2),
+        )
+        for i, variation_id in enumerate(variation_ids)
+        for hour in np.flatnonzero(predictions[i] >= min_units).tolist()
+    ]
+
+    with transaction.atomic():
+        DemandForecast.objects.filter(forecast_date=target_date).delete()
+        DemandForecast.objects.bulk_create(rows, batch_size=2000)
+
+    return len(variation_ids), len(rows)
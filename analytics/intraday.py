@@ -0,0 +1,136 @@
+# backend/analytics/intraday.py
+"""
+Live counters for today's dashboard.
+
+Completed orders increment per-day counters in the cache, so reading today's KPIs is a single
+`get_many`. A day's counters are recounted from the orders table when they are missing (cold
+cache, eviction) and again INTRADAY_KPI_RECOUNT_TTL seconds after their last count. An order
+completing while a recount runs can be missed or counted twice; the next recount corrects it,
+so that drift lasts at most INTRADAY_KPI_RECOUNT_TTL seconds.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum, Count, Q
+from django.db.models.functions import ExtractHour
+from django.utils import timezone
+from django.utils.timezone import localtime
+
+from orders.models import Orders, OrderItems
+from .models import IntradayKPI
+
+COUNTERS = ('revenue_cents', 'orders', 'items', 'online_orders', 'walkin_orders')
+HOURS = range(24)
+KEY_TIMEOUT = 60 * 60 * 48
+
+
+def _key(day, name):
+    return f"kpi:{day.isoformat()}:{name}"
+
+
+def _all_keys(day):
+    return [_key(day, name) for name in COUNTERS] + [_key(day, f"hour:{h}") for h in HOURS]
+
+
+def _day_bounds(day):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, time.min), tz)
+    return start, start + timedelta(days=1)
+
+
+def _to_cents(amount):
+    return int((Decimal(amount) * 100).quantize(Decimal('1')))
+
+
+def prime(day):
+    """Recomputes `day`'s counters from the orders table and stores them in the cache."""
+    start, end = _day_bounds(day)
+    orders = Orders.objects.filter(status='completed', processed_at__gte=start, processed_at__lt=end)
+
+    summary = orders.aggregate(
+        revenue=Sum('total_amount'),
+        orders=Count('id'),
+        online_orders=Count('id', filter=Q(order_type='pre-selection')),
+        walkin_orders=Count('id', filter=Q(order_type='walk-in')),
+    )
+    items = OrderItems.objects.filter(order__in=orders).aggregate(total=Sum('quantity'))['total'] or 0
+    hourly = dict(
+        orders.annotate(hour=ExtractHour('processed_at')).values('hour')
+        .annotate(count=Count('id')).values_list('hour', 'count')
+    )
+
+    values = {
+        _key(day, 'revenue_cents'): _to_cents(summary['revenue'] or 0),
+        _key(day, 'orders'): summary['orders'],
+        _key(day, 'items'): items,
+        _key(day, 'online_orders'): summary['online_orders'],
+        _key(day, 'walkin_orders'): summary['walkin_orders'],
+    }
+    values.update({_key(day, f"hour:{h}"): hourly.get(h, 0) for h in HOURS})
+    cache.set_many(values, KEY_TIMEOUT)
+    # Present while the counts are recent enough; its expiry schedules the next recount.
+    cache.set(_key(day, 'primed'), True, settings.INTRADAY_KPI_RECOUNT_TTL)
+    return values
+
+
+def record_completed_order(order):
+    if order.processed_at is None:
+        return
+    processed_at = localtime(order.processed_at)
+    day = processed_at.date()
+
+    items = OrderItems.objects.filter(order=order).aggregate(total=Sum('quantity'))['total'] or 0
+    deltas = {
+        'revenue_cents': _to_cents(order.total_amount),
+        'orders': 1,
+        'items': items,
+        'online_orders' if order.order_type == 'pre-selection' else 'walkin_orders': 1,
+        f"hour:{processed_at.hour}": 1,
+    }
+    try:
+        for name, delta in deltas.items():
+            if delta:
+                cache.incr(_key(day, name), delta)
+    except ValueError:
+        # The day isn't counted yet or a counter was evicted; the next read recounts it.
+        cache.delete(_key(day, 'primed'))
+
+
+def get_counters(day):
+    if not cache.get(_key(day, 'primed')):
+        values = prime(day)
+    else:
+        values = cache.get_many(_all_keys(day))
+        if len(values) < len(COUNTERS) + len(HOURS):
+            values = prime(day)
+
+    total_orders = values[_key(day, 'orders')]
+    revenue = (Decimal(values[_key(day, 'revenue_cents')]) / 100).quantize(Decimal('0.01'))
+    return {
+        'date': day,
+        'total_sales_revenue': revenue,
+        'total_order_count': total_orders,
+        'total_items_sold': values[_key(day, 'items')],
+        'online_order_count': values[_key(day, 'online_orders')],
+        'walkin_order_count': values[_key(day, 'walkin_orders')],
+        'average_order_value': round(revenue / total_orders, 2) if total_orders else 0,
+        'hourly_orders': [{'hour': h, 'orders': values[_key(day, f"hour:{h}")]} for h in HOURS],
+    }
+
+
+def checkpoint(day):
+    counters = get_counters(day)
+    IntradayKPI.objects.update_or_create(
+        date=day,
+        defaults={
+            'total_sales_revenue': counters['total_sales_revenue'],
+            'total_order_count': counters['total_order_count'],
+            'total_items_sold': counters['total_items_sold'],
+            'online_order_count': counters['online_order_count'],
+            'walkin_order_count': counters['walkin_order_count'],
+            'hourly_orders': counters['hourly_orders'],
+        }
+    )
+    return counters
@@ -0,0 +1,144 @@
+# backend/analytics/jobs.py
+"""
+On-demand recommendation jobs, run in a small in-process thread pool.
+
+Enqueueing only writes a RecommendationJob row and hands its id to the pool once the
+transaction commits, so the request never waits on embeddings or the LLM. The pool shares one
+RecommendationPipeline (embedding model, vector store, uncached LLM client) for the
+process lifetime.
+
+A job queued, or running, for longer than RECOMMENDATION_JOB_TIMEOUT is assumed to have died
+with its process and is marked failed, so it no longer blocks new requests for the same report.
+Workers only start a job that is still queued and only record the result of one still running,
+so an expired job that was merely slow never runs the LLM again or overwrites its replacement.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import RecommendationJob
+from .rag.llm import get_llm
+from .rag.pipeline import RecommendationPipeline, previous_weekly_report
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.RECOMMENDATION_JOB_WORKERS, thread_name_prefix='recommendation-job'
+            )
+        return _executor
+
+
+def _expire_stale_jobs(report):
+    cutoff = timezone.now() - timedelta(seconds=settings.RECOMMENDATION_JOB_TIMEOUT)
+    RecommendationJob.objects.filter(
+        Q(status='queued', created_at__lt=cutoff) | Q(status='running', started_at__lt=cutoff),
+        report=report,
+    ).update(status='failed', error='Timed out.', finished_at=timezone.now())
+
+
+ENQUEUE_ATTEMPTS = 3
+
+
+def enqueue_recommendation(report, user_id=None):
+    """
+    Returns (job, created). An active job for the same report is returned instead of a new one;
+    job is None if concurrent requests kept racing for the report.
+    """
+    _expire_stale_jobs(report)
+    active = RecommendationJob.objects.filter(report=report, status__in=RecommendationJob.ACTIVE_STATUSES)
+    for _ in range(ENQUEUE_ATTEMPTS):
+        job = active.first()
+        if job:
+            return job, False
+        try:
+            with transaction.atomic():
+                job = RecommendationJob.objects.create(report=report, requested_by_id=user_id)
+        except IntegrityError:
+            # Lost the race against a concurrent request; that job may already have finished.
+            continue
+        transaction.on_commit(lambda: _get_executor().submit(run_job, job.id))
+        return job, True
+    return None, False
+
+
+def _update(job, **fields):
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.save(update_fields=list(fields))
+
+
+def _load_pipeline():
+    global _pipeline
+    if _pipeline is None:
+        # A job is an explicit request for a fresh recommendation; a cached answer to the same
+        # prompt would just repeat the last one.
+        pipeline = RecommendationPipeline(llm=get_llm(use_cache=False))
+        pipeline.load()
+        _pipeline = pipeline
+    return _pipeline
+
+
+def _transition(job, from_status, **fields):
+    """Updates the job only if it is still in `from_status`; False if it expired meanwhile."""
+    if not RecommendationJob.objects.filter(pk=job.pk, status=from_status).update(**fields):
+        return False
+    for name, value in fields.items():
+        setattr(job, name, value)
+    return True
+
+
+def run_job(job_id):
+    close_old_connections()
+    job = RecommendationJob.objects.select_related('report').get(pk=job_id)
+    started = _transition(
+        job, 'queued', status='running', stage='loading knowledge base', progress=10, started_at=timezone.now(),
+    )
+    if not started:
+        logger.info("Recommendation job %s expired before it started; skipping", job_id)
+        close_old_connections()
+        return
+    try:
+        report = job.report
+        previous_report = previous_weekly_report(report)
+
+        # Loading and retrieval touch the shared embedding model; the LLM call does not.
+        with _pipeline_lock:
+            pipeline = _load_pipeline()
+            _update(job, stage='retrieving context', progress=30)
+            context, _, _ = pipeline.retrieve_context(report)
+            pipeline.update_feedback_topics()
+            feedback_themes = pipeline.feedback_themes(report)
+
+        _update(job, stage='generating recommendation', progress=50)
+        prompt = pipeline.build_prompt(report, previous_report, context, feedback_themes=feedback_themes)
+        recommendation, _ = pipeline.generate(prompt)
+
+        with transaction.atomic():
+            if not _transition(job, 'running', status='succeeded', stage='', progress=100, finished_at=timezone.now()):
+                logger.warning("Recommendation job %s timed out while running; discarding its result", job_id)
+                return
+            report.recommendation = recommendation
+            report.recommendation_status = 'pending'
+            report.is_viewed = False
+            report.save(update_fields=['recommendation', 'recommendation_status', 'is_viewed'])
+    except Exception as e:
+        logger.exception("Recommendation job %s failed", job_id)
+        _transition(job, 'running', status='failed', error=str(e), finished_at=timezone.now())
+    finally:
+        close_old_connections()
@@ -0,0 +1,76 @@
+# backend/analytics/management/commands/benchmark_vector_store.py
+
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from analytics.rag.benchmark import run_backend
+from analytics.rag.embeddings import LazyEmbeddings
+from analytics.rag.ingest import iter_chunks
+from analytics.rag.stores import BACKENDS
+
+
+class Command(BaseCommand):
+    help = 'Compares the knowledge base vector store backends: build time, query latency and memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+        parser.add_argument('--queries', type=int, default=200, help='Single-vector searches to time per backend.')
+        parser.add_argument('--k', type=int, default=4)
+        parser.add_argument(
+            '--synthetic', type=int, default=0,
+            help='Benchmark N random 384-d vectors instead of embedding the knowledge base (no model load).',
+        )
+        parser.add_argument('--output', help='Write the results as JSON to this path.')
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as workdir:
+            vectors_path = os.path.join(workdir, 'vectors.npy')
+            corpus_path = os.path.join(workdir, 'corpus.json')
+            self.prepare_corpus(options['synthetic'], vectors_path, corpus_path)
+
+            results = []
+            for backend in options['backends']:
+                self.stdout.write(f"Benchmarking {backend}...")
+                results.append(run_backend(
+                    backend, os.path.join(workdir, backend), vectors_path, corpus_path,
+                    num_queries=options['queries'], k=options['k'],
+                ))
+
+        columns = [
+            'backend', 'chunks', 'build_seconds', 'open_seconds', 'query_p50_ms',
+            'query_p95_ms', 'batch_query_ms', 'rss_delta_mb', 'peak_rss_mb',
+        ]
+        self.stdout.write("  ".join(f"{c:>14}" for c in columns))
+        for result in results:
+            self.stdout.write("  ".join(f"{result[c]!s:>14}" for c in columns))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+
+    def prepare_corpus(self, synthetic, vectors_path, corpus_path):
+        if synthetic:
+            rng = np.random.default_rng(0)
+            vectors = rng.normal(size=(synthetic, 384)).astype(np.float32)
+            ids = [f"synthetic-{i}" for i in range(synthetic)]
+            texts = [f"synthetic chunk {i}" for i in range(synthetic)]
+            metadatas = [{'source': 'synthetic', 'doc_type': 'synthetic', 'chunk_index': i} for i in range(synthetic)]
+        else:
+            chunks = list({c[0]: c for c in iter_chunks(settings.RAG_DATA_DIR, settings.RAG_INGEST_WORKERS)}.values())
+            ids = [c[0] for c in chunks]
+            texts = [c[1] for c in chunks]
+            metadatas = [c[2] for c in chunks]
+            started = time.perf_counter()
+            vectors = np.asarray(LazyEmbeddings().embed_documents(texts), dtype=np.float32)
+            self.stdout.write(f"Embedded {len(texts)} chunks in {time.perf_counter() - started:.2f}s (shared by all backends).")
+
+        np.save(vectors_path, vectors)
+        with open(corpus_path, 'w', encoding='utf-8') as f:
+            json.dump({'ids': ids, 'texts': texts, 'metadatas': metadatas}, f)
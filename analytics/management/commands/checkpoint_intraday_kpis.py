@@ -0,0 +1,23 @@
+# backend/analytics/management/commands/checkpoint_intraday_kpis.py
+
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.timezone import localtime
+
+from analytics import intraday
+
+
+class Command(BaseCommand):
+    help = "Saves the live intraday KPI counters for today (and yesterday's final values) to the IntradayKPI table."
+
+    def handle(self, *args, **options):
+        today = localtime(timezone.now()).date()
+
+        for day in (today - timedelta(days=1), today):
+            counters = intraday.checkpoint(day)
+            self.stdout.write(
+                f"{day}: {counters['total_order_count']} orders, ₱{counters['total_sales_revenue']} revenue."
+            )
+
+        self.stdout.write(self.style.SUCCESS('Intraday KPIs checkpointed.'))
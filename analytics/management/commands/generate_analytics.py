@@ -77,10 +77,10 @@ class Command(BaseCommand):
         avg_items = total_items_sold / total_orders if total_orders > 0 else 0
 
         dish_performance = list(OrderItems.objects.filter(order__in=orders_in_period)
-            .values('variation__menu_item__name')
-            .annotate(dish_name=F('variation__menu_item__name'), sold=Sum('quantity'))
+            .values('variation__menu_item_id')
+            .annotate(menu_item_id=F('variation__menu_item_id'), dish_name=F('variation__menu_item__name'), sold=Sum('quantity'))
             .order_by('-sold')
-            .values('dish_name', 'sold')[:10]
+            .values('menu_item_id', 'dish_name', 'sold')[:10]
         )
 
         num_days_in_period = (end_date - start_date).days + 1
@@ -0,0 +1,36 @@
+# backend/analytics/management/commands/generate_forecasts.py
+
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localtime
+
+from analytics.forecasting import generate_forecasts
+
+
+class Command(BaseCommand):
+    help = 'Forecasts units sold per variation and hour for the next day from recent sales history.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Date to forecast (YYYY-MM-DD). Defaults to tomorrow.')
+        parser.add_argument('--weeks', type=int, default=8, help='Weeks of sales history to fit on.')
+
+    def handle(self, *args, **options):
+        if options['date']:
+            target_date = parse_date(options['date'])
+            if not target_date:
+                raise CommandError("Invalid --date. Use YYYY-MM-DD.")
+        else:
+            target_date = localtime(timezone.now()).date() + timedelta(days=1)
+
+        self.stdout.write(f"Forecasting demand for {target_date} from {options['weeks']} weeks of history...")
+        started = time.perf_counter()
+
+        num_variations, num_rows = generate_forecasts(target_date, weeks=options['weeks'])
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Forecasted {num_variations} variations ({num_rows} hourly rows) in {elapsed:.2f}s."
+        ))
@@ -0,0 +1,24 @@
+# backend/analytics/management/commands/rebuild_market_basket.py
+
+import time
+from django.core.management.base import BaseCommand
+
+from analytics import basket
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the variation co-occurrence matrix used for upsell suggestions from all completed orders.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Order items fetched per database round trip.')
+
+    def handle(self, *args, **options):
+        self.stdout.write("Rebuilding market basket matrix...")
+        started = time.perf_counter()
+
+        total_orders, total_pairs = basket.rebuild(chunk_size=options['chunk_size'])
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Counted {total_orders} orders and {total_pairs} variation pairs in {elapsed:.2f}s."
+        ))
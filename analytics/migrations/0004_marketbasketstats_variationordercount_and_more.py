@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_analytics_is_viewed'),
+        ('menu', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketBasketStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('rebuilt_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VariationOrderCount',
+            fields=[
+                ('variation', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='menu.variations')),
+                ('order_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VariationCooccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('variation_a', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='menu.variations')),
+                ('variation_b', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='menu.variations')),
+            ],
+            options={
+                'unique_together': {('variation_a', 'variation_b')},
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_marketbasketstats_variationordercount_and_more'),
+        ('menu', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DemandForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('forecast_date', models.DateField(db_index=True)),
+                ('hour', models.PositiveSmallIntegerField()),
+                ('predicted_units', models.FloatField(default=0.0)),
+                ('generated_at', models.DateTimeField(auto_now=True)),
+                ('variation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='demand_forecasts', to='menu.variations')),
+            ],
+            options={
+                'unique_together': {('variation', 'forecast_date', 'hour')},
+            },
+        ),
+    ]
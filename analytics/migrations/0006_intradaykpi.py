@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0005_demandforecast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IntradayKPI',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('total_sales_revenue', models.DecimalField(decimal_places=2, default=0.0, max_digits=12)),
+                ('total_order_count', models.IntegerField(default=0)),
+                ('total_items_sold', models.IntegerField(default=0)),
+                ('online_order_count', models.IntegerField(default=0)),
+                ('walkin_order_count', models.IntegerField(default=0)),
+                ('hourly_orders', models.JSONField(default=list)),
+                ('checkpointed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+    ]
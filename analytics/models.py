@@ -1,4 +1,5 @@
 # backend/analytics/models.py
+from django.conf import settings
 from django.db import models
 
 class Analytics(models.Model):
@@ -39,4 +40,101 @@ class Analytics(models.Model):
         ordering = ['-start_date']
 
     def __str__(self):
-        return f"{self.report_type.title()} report for {self.start_date} to {self.end_date}"    
\ No newline at end of file
+        return f"{self.report_type.title()} report for {self.start_date} to {self.end_date}"    
+
+class VariationCooccurrence(models.Model):
+    # Sparse, upper-triangular co-occurrence matrix over completed orders: one row per pair of
+    # variations (variation_a_id < variation_b_id) that has ever been bought together.
+    variation_a = models.ForeignKey('menu.Variations', on_delete=models.CASCADE, related_name='+')
+    variation_b = models.ForeignKey('menu.Variations', on_delete=models.CASCADE, related_name='+')
+    order_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('variation_a', 'variation_b')
+
+    def __str__(self):
+        return f"{self.variation_a_id} + {self.variation_b_id}: {self.order_count}"
+
+
+class VariationOrderCount(models.Model):
+    # Diagonal of the co-occurrence matrix: number of completed orders containing the variation.
+    variation = models.OneToOneField('menu.Variations', on_delete=models.CASCADE, primary_key=True, related_name='+')
+    order_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.variation_id}: {self.order_count}"
+
+
+class MarketBasketStats(models.Model):
+    # Single row holding the number of baskets (completed orders) the matrix was built from.
+    order_count = models.PositiveIntegerField(default=0)
+    rebuilt_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.order_count} baskets"
+
+
+class DemandForecast(models.Model):
+    variation = models.ForeignKey('menu.Variations', on_delete=models.CASCADE, related_name='demand_forecasts')
+    forecast_date = models.DateField(db_index=True)
+    hour = models.PositiveSmallIntegerField()
+    predicted_units = models.FloatField(default=0.0)
+    generated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('variation', 'forecast_date', 'hour')
+
+    def __str__(self):
+        return f"{self.variation_id} on {self.forecast_date} {self.hour}:00: {self.predicted_units}"
+
+
+class IntradayKPI(models.Model):
+    # Periodic checkpoint of the live counters kept in the cache by analytics.intraday.
+    date = models.DateField(unique=True)
+    total_sales_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0.00)
+    total_order_count = models.IntegerField(default=0)
+    total_items_sold = models.IntegerField(default=0)
+    online_order_count = models.IntegerField(default=0)
+    walkin_order_count = models.IntegerField(default=0)
+    hourly_orders = models.JSONField(default=list)
+    checkpointed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"Intraday KPIs for {self.date}"
+
+
+class RecommendationJob(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ('queued', 'running')
+
+    report = models.ForeignKey(Analytics, on_delete=models.CASCADE, related_name='recommendation_jobs')
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    stage = models.CharField(max_length=50, blank=True)
+    progress = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        constraints = [
+            # At most one queued or running job per report; duplicate requests reuse it.
+            models.UniqueConstraint(
+                fields=['report'], condition=models.Q(status__in=['queued', 'running']),
+                name='unique_active_recommendation_job',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Recommendation job {self.id} for report {self.report_id}: {self.status}"
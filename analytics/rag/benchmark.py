@@ -0,0 +1,83 @@
+# backend/analytics/rag/benchmark.py
+"""
+Vector store benchmark runner.
+
+Each backend is measured in a fresh spawned process so its import cost and resident memory
+are not mixed with the other backend's (or with the embedding model's).
+"""
+import json
+import multiprocessing
+import os
+import resource
+import time
+
+import numpy as np
+
+from .stores import open_store
+
+
+def current_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if os.uname().sysname == 'Darwin' else peak / 2 ** 10
+
+
+def _measure(backend, directory, vectors_path, corpus_path, num_queries, k, seed):
+    rss_before = current_rss_mb()
+    vectors = np.load(vectors_path)
+    with open(corpus_path, encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    started = time.perf_counter()
+    store = open_store(backend, directory)
+    store.reset()
+    for start in range(0, len(vectors), 1000):
+        end = start + 1000
+        store.upsert(corpus['ids'][start:end], corpus['texts'][start:end], corpus['metadatas'][start:end], vectors[start:end])
+    store.persist()
+    build_seconds = time.perf_counter() - started
+    del store
+
+    started = time.perf_counter()
+    store = open_store(backend, directory)
+    open_seconds = time.perf_counter() - started
+
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.integers(0, len(vectors), size=num_queries)]
+    queries = queries + rng.normal(scale=0.05, size=queries.shape).astype(np.float32)
+
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        store.search([query], k=k)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    store.search(queries, k=k)
+    batch_ms = (time.perf_counter() - started) * 1000
+
+    return {
+        'backend': backend,
+        'chunks': len(vectors),
+        'build_seconds': round(build_seconds, 4),
+        'open_seconds': round(open_seconds, 4),
+        'query_p50_ms': round(float(np.percentile(latencies, 50)), 3),
+        'query_p95_ms': round(float(np.percentile(latencies, 95)), 3),
+        'batch_query_ms': round(batch_ms, 3),
+        'rss_delta_mb': round(current_rss_mb() - rss_before, 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def run_backend(backend, directory, vectors_path, corpus_path, num_queries=200, k=4, seed=0):
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        return pool.apply(_measure, (backend, directory, vectors_path, corpus_path, num_queries, k, seed))
@@ -0,0 +1,75 @@
+# backend/analytics/rag/embeddings.py
+import hashlib
+import json
+import os
+import threading
+
+from langchain_core.embeddings import Embeddings
+
+EMBEDDING_MODEL_NAME = "sentence-transformers/paraphrase-MiniLM-L6-v2"
+ENCODE_BATCH_SIZE = 64
+
+
+class LazyEmbeddings(Embeddings):
+    """
+    Loads the sentence-transformers model only when something actually has to be embedded.
+
+    Query embeddings are cached on disk keyed by model and text, so a run whose index and
+    queries are unchanged never loads the model.
+    """
+
+    def __init__(self, model_name=EMBEDDING_MODEL_NAME, query_cache_path=None):
+        self.model_name = model_name
+        self.query_cache_path = query_cache_path
+        self._model = None
+        self._lock = threading.Lock()
+        self._query_cache = None
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                from langchain_huggingface import HuggingFaceEmbeddings
+                self._model = HuggingFaceEmbeddings(
+                    model_name=self.model_name,
+                    model_kwargs={'device': 'cpu'},
+                    encode_kwargs={'batch_size': ENCODE_BATCH_SIZE},
+                )
+            return self._model
+
+    @property
+    def is_loaded(self):
+        return self._model is not None
+
+    def embed_documents(self, texts):
+        return self.model.embed_documents(list(texts))
+
+    def embed_query(self, text):
+        return self.embed_queries([text])[0]
+
+    def embed_queries(self, texts):
+        """Embeds several queries, running the model once for all that are not cached."""
+        cache = self._load_query_cache()
+        keys = [hashlib.sha256(f"{self.model_name}\n{text}".encode('utf-8')).hexdigest() for text in texts]
+        missing = {key: text for key, text in zip(keys, texts) if key not in cache}
+        if missing:
+            vectors = self.model.embed_documents(list(missing.values()))
+            cache.update(zip(missing.keys(), vectors))
+            self._save_query_cache()
+        return [cache[key] for key in keys]
+
+    def _load_query_cache(self):
+        if self._query_cache is None:
+            self._query_cache = {}
+            if self.query_cache_path and os.path.exists(self.query_cache_path):
+                with open(self.query_cache_path, encoding='utf-8') as f:
+                    self._query_cache = json.load(f)
+        return self._query_cache
+
+    def _save_query_cache(self):
+        if not self.query_cache_path:
+            return
+        tmp_path = f"{self.query_cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._query_cache, f)
+        os.replace(tmp_path, self.query_cache_path)
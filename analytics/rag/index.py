@@ -0,0 +1,108 @@
+# backend/analytics/rag/index.py
+"""
+Persistent knowledge-base index keyed by chunk content hash.
+
+Each chunk is stored under the SHA-256 of its source and text, so re-running only embeds
+chunks that are new or changed and prunes the ones that disappeared. The embedding model is
+recorded in `index_meta.json`; a different model invalidates every stored vector and forces
+a rebuild.
+
+The index lives in `<RAG_INDEX_DIR>/<backend>/` for whichever backend from `stores` is selected.
+"""
+import json
+import os
+import time
+
+from django.utils import timezone
+
+from .embeddings import LazyEmbeddings, EMBEDDING_MODEL_NAME
+from .stores import open_store
+
+META_FILE = 'index_meta.json'
+QUERY_CACHE_FILE = 'query_embeddings.json'
+EMBED_BATCH_SIZE = 256
+
+
+def read_meta(persist_directory):
+    path = os.path.join(persist_directory, META_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_meta(persist_directory, meta):
+    path = os.path.join(persist_directory, META_FILE)
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def sync_index(chunks, index_directory, backend, model_name=EMBEDDING_MODEL_NAME, batch_size=EMBED_BATCH_SIZE):
+    """
+    Brings the on-disk index in line with `chunks`, an iterable of (chunk_id, text, metadata).
+
+    New chunks are embedded and written `batch_size` at a time as they stream in. Returns
+    (store, embeddings, stats); `stats` has the number of chunks added, deleted and left
+    untouched, whether the index was rebuilt because the embedding model changed, and the
+    seconds spent embedding.
+    """
+    persist_directory = os.path.join(index_directory, backend)
+    os.makedirs(persist_directory, exist_ok=True)
+    meta = read_meta(persist_directory)
+    rebuilt = meta.get('embedding_model') != model_name
+
+    query_cache_path = os.path.join(persist_directory, QUERY_CACHE_FILE)
+    embeddings = LazyEmbeddings(model_name, query_cache_path=query_cache_path)
+    store = open_store(backend, persist_directory)
+    if rebuilt:
+        # Vectors from another model are not comparable; drop everything and start over.
+        store.reset()
+        if os.path.exists(query_cache_path):
+            os.remove(query_cache_path)
+
+    existing = store.ids()
+    seen = set()
+    batch = []
+    stats = {'added': 0, 'deleted': 0, 'unchanged': 0, 'rebuilt': rebuilt, 'embed_seconds': 0.0}
+
+    def flush():
+        started = time.perf_counter()
+        texts = [text for _, text, _ in batch]
+        vectors = embeddings.embed_documents(texts)
+        stats['embed_seconds'] += time.perf_counter() - started
+        store.upsert(
+            ids=[i for i, _, _ in batch],
+            texts=texts,
+            metadatas=[{**metadata, 'chunk_id': i} for i, _, metadata in batch],
+            vectors=vectors,
+        )
+        stats['added'] += len(batch)
+        batch.clear()
+
+    for i, text, metadata in chunks:
+        if i in seen:
+            continue
+        seen.add(i)
+        if i in existing:
+            stats['unchanged'] += 1
+            continue
+        batch.append((i, text, metadata))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+    to_delete = sorted(existing - seen)
+    if to_delete:
+        store.delete(to_delete)
+    stats['deleted'] = len(to_delete)
+    store.persist()
+
+    write_meta(persist_directory, {
+        'embedding_model': model_name,
+        'backend': backend,
+        'chunk_count': len(seen),
+        'updated_at': timezone.now().isoformat(),
+    })
+    return store, embeddings, stats
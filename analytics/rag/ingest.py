@@ -0,0 +1,103 @@
+# backend/analytics/rag/ingest.py
+"""
+Knowledge-base ingestion: discovers text and markdown files under the data directory and
+splits them into chunks in a pool of worker processes.
+
+Files are streamed through a bounded window of pending jobs, so only a handful of documents
+are held in memory at any time regardless of how many files the directory contains.
+"""
+import hashlib
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+DOCUMENT_EXTENSIONS = ('.txt', '.md')
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+
+logger = logging.getLogger(__name__)
+
+_splitters = {}
+
+
+def chunk_id(source, text):
+    return hashlib.sha256(f"{source}\n{text}".encode('utf-8')).hexdigest()
+
+
+def discover_documents(data_dir, extensions=DOCUMENT_EXTENSIONS):
+    for root, dirs, files in os.walk(data_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(extensions):
+                yield os.path.join(root, name)
+
+
+def _splitter(extension):
+    if extension not in _splitters:
+        from langchain.text_splitter import MarkdownTextSplitter, RecursiveCharacterTextSplitter
+        splitter_class = MarkdownTextSplitter if extension == '.md' else RecursiveCharacterTextSplitter
+        _splitters[extension] = splitter_class(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    return _splitters[extension]
+
+
+def chunk_file(path, data_dir):
+    """
+    Returns [(chunk_id, text, metadata)] for one file, or None if it isn't valid UTF-8 (it is
+    skipped). Runs inside a worker process.
+    """
+    source = os.path.relpath(path, data_dir).replace(os.sep, '/')
+    extension = os.path.splitext(path)[1].lower()
+    # Top-level folder (e.g. "playbooks/", "supplier_notes/") doubles as a filterable type.
+    doc_type = source.split('/', 1)[0] if '/' in source else 'general'
+
+    try:
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+    except UnicodeDecodeError as e:
+        logger.warning("Skipping %s: not valid UTF-8 (%s)", source, e)
+        return None
+
+    return [
+        (chunk_id(source, chunk), chunk, {'source': source, 'doc_type': doc_type, 'chunk_index': i})
+        for i, chunk in enumerate(_splitter(extension).split_text(text))
+    ]
+
+
+def iter_chunks(data_dir, workers=None, stats=None):
+    """
+    Yields (chunk_id, text, metadata) for every document under `data_dir`.
+
+    With more than one worker, files are chunked in parallel with at most `workers * 4` files
+    in flight. `stats`, if given, is updated with the number of documents and chunks seen and
+    of files skipped because they couldn't be decoded.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault('documents', 0)
+    stats.setdefault('chunks', 0)
+    stats.setdefault('skipped', 0)
+    workers = workers or os.cpu_count() or 1
+
+    def record(chunks):
+        if chunks is None:
+            stats['skipped'] += 1
+            return []
+        stats['documents'] += 1
+        stats['chunks'] += len(chunks)
+        return chunks
+
+    paths = discover_documents(data_dir)
+    if workers <= 1:
+        for path in paths:
+            yield from record(chunk_file(path, data_dir))
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for path in paths:
+            pending.add(executor.submit(chunk_file, path, data_dir))
+            if len(pending) >= workers * 4:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from record(future.result())
+        for future in pending:
+            yield from record(future.result())
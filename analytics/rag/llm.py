@@ -0,0 +1,141 @@
+# backend/analytics/rag/llm.py
+"""
+LLM providers for the weekly recommendation.
+
+- `gemini`: Google Gemini with a per-request timeout; transient errors (timeouts, overload, rate
+  limits, server errors) are retried with exponential backoff, anything else fails at once.
+- `stub`: a deterministic local provider that answers in the expected report format without
+  any network access, for CI and benchmarking the rest of the pipeline.
+
+`CachedLLM` wraps either one with an on-disk response cache keyed by the SHA-256 of the
+provider, model and full prompt, so regenerating the same week with the same inputs is free.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+
+from django.conf import settings
+from django.utils import timezone
+
+PROVIDERS = ('gemini', 'stub')
+
+
+class LLMError(Exception):
+    pass
+
+
+class GeminiProvider:
+    name = 'gemini'
+
+    def __init__(self, model_name, api_key, timeout=60, max_retries=3, backoff=2.0):
+        self.model_name = model_name
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            if not self.api_key:
+                raise LLMError("GOOGLE_API_KEY is not set.")
+            import google.generativeai as genai
+            genai.configure(api_key=self.api_key)
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def generate(self, prompt):
+        model = self.model
+        from google.api_core import exceptions as google_exceptions
+        transient = (
+            google_exceptions.DeadlineExceeded,
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.ResourceExhausted,
+            google_exceptions.TooManyRequests,
+            google_exceptions.InternalServerError,
+        )
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = model.generate_content(prompt, request_options={'timeout': self.timeout})
+                return response.text.strip()
+            except transient as e:
+                if attempt == self.max_retries:
+                    raise LLMError(f"Gemini request failed after {attempt + 1} attempts: {e}") from e
+                time.sleep(self.backoff * 2 ** attempt)
+            except Exception as e:
+                # Invalid key, permission denied, a rejected prompt...: retrying won't help.
+                raise LLMError(f"Gemini request failed: {e}") from e
+
+
+class StubProvider:
+    name = 'stub'
+    model_name = 'stub'
+
+    def generate(self, prompt):
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:12]
+        heading = re.search(r'^## Weekly Business Insights \(Week of .+?\)$', prompt, re.MULTILINE)
+        heading = heading.group(0) if heading else "## Weekly Business Insights"
+        return (
+            f"{heading}\n\n"
+            f"**Summary:** \nStub summary for prompt {digest}.\n\n"
+            "**Observations & Potential Issues:** \n- Stub observation.\n\n"
+            "**Recommendation for Next Week:** \nStub recommendation."
+        )
+
+
+class CachedLLM:
+    def __init__(self, provider, cache_dir=None):
+        self.provider = provider
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def name(self):
+        return self.provider.name
+
+    @property
+    def model_name(self):
+        return self.provider.model_name
+
+    def cache_key(self, prompt):
+        return hashlib.sha256(f"{self.provider.name}\n{self.provider.model_name}\n{prompt}".encode('utf-8')).hexdigest()
+
+    def generate(self, prompt):
+        """Returns (text, cached)."""
+        path = os.path.join(self.cache_dir, f"{self.cache_key(prompt)}.json") if self.cache_dir else None
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.hits += 1
+                return json.load(f)['response'], True
+
+        text = self.provider.generate(prompt)
+        self.misses += 1
+        if path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+                json.dump({
+                    'provider': self.provider.name,
+                    'model': self.provider.model_name,
+                    'response': text,
+                    'created_at': timezone.now().isoformat(),
+                }, f)
+            os.replace(f"{path}.tmp", path)
+        return text, False
+
+
+def get_llm(provider=None, use_cache=True):
+    provider = provider or settings.RAG_LLM_PROVIDER
+    if provider == 'gemini':
+        backend = GeminiProvider(
+            settings.RAG_LLM_MODEL, settings.GOOGLE_API_KEY,
+            timeout=settings.RAG_LLM_TIMEOUT, max_retries=settings.RAG_LLM_MAX_RETRIES,
+        )
+    elif provider == 'stub':
+        backend = StubProvider()
+    else:
+        raise ValueError(f"Unknown LLM provider '{provider}'. Choose from: {', '.join(PROVIDERS)}.")
+    return CachedLLM(backend, settings.RAG_LLM_CACHE_DIR if use_cache else None)
@@ -0,0 +1,210 @@
+# backend/analytics/rag/pipeline.py
+"""
+The weekly recommendation pipeline: KPI summary -> knowledge-base retrieval -> prompt -> LLM.
+
+Shared by the `generate_recommendation` command and the background recommendation jobs, so a
+process that loads it once reuses the same embedding model, vector store and LLM client.
+"""
+import os
+import time
+
+from django.conf import settings
+
+from analytics.models import Analytics
+from feedback import topics
+from .index import sync_index
+from .ingest import iter_chunks
+from .llm import get_llm
+from .retrieval import retrieve
+
+
+class PipelineError(Exception):
+    pass
+
+
+def format_kpi_text(report):
+    top_dishes = sorted(report.dish_performance, key=lambda x: x.get('sold', 0), reverse=True)[:3]
+    dish_summary = "\n".join([f"  - {d.get('dish_name', 'N/A')}: {d.get('sold', 0)} sold" for d in top_dishes])
+
+    slow_hours_list = sorted(report.avg_hourly_orders, key=lambda item: item.get('orders', 0))[:3]
+    slow_hour_summary = "\n".join([f"  - {item.get('hour', 'N/A')}:00: {item.get('orders', 0)} avg orders" for item in slow_hours_list])
+    peak_hours_list = sorted(report.avg_hourly_orders, key=lambda item: item.get('orders', 0), reverse=True)[:3]
+    peak_hour_summary = "\n".join([f"  - {item.get('hour', 'N/A')}:00: {item.get('orders', 0)} avg orders" for item in peak_hours_list])
+
+    kpi_text = f"""
+📅 Week: {report.start_date} to {report.end_date}
+- Total Sales Revenue: ₱{report.total_sales_revenue}
+- Total Order Count: {report.total_order_count}
+- Online Orders: {report.online_order_count}
+- Walk-in Orders: {report.walkin_order_count}
+- Avg Items per Order: {report.avg_items_per_order}
+
+🍽️ Top Performing Dishes:
+{dish_summary}
+
+⏰ Peak Order Hours:
+{peak_hour_summary}
+
+🕒 Slowest Hours of the Day:
+{slow_hour_summary}
+""".strip()
+    
+    kpi_raw = {
+        "total_sales_revenue": report.total_sales_revenue,
+        "online_order_count": report.online_order_count,
+        "walkin_order_count": report.walkin_order_count,
+        "avg_items_per_order": report.avg_items_per_order,
+    }
+
+    return kpi_text, kpi_raw, slow_hours_list
+
+
+def generate_kb_query_from_kpis(kpis_dict, slow_hours):
+    query_parts = []
+    if float(kpis_dict.get("total_sales_revenue", 0)) < 150000: 
+        query_parts.append("strategies to increase overall restaurant sales revenue")
+    if float(kpis_dict.get("avg_items_per_order", 0)) < 3.0:
+        query_parts.append("how to increase average order size and upsell items")
+    if len(slow_hours) >= 3 and any(h['orders'] < 1.0 for h in slow_hours):
+         query_parts.append("how to attract customers during off-peak or slow hours")
+    if not query_parts:
+        return "general strategies to improve restaurant operations and menu performance"
+    return ", ".join(query_parts)
+
+
+def build_system_prompt(kpi_text, last_week_reco, last_week_status_text, context, report, feedback_themes=None):
+    restaurant_info = """
+RESTAURANT PROFILE:
+
+LUK'S BY GOODCHOICE is a fast-casual Filipino diner located in a busy urban area with consistently high foot traffic. It has been in operation for approximately one and a half year.
+
+Key Characteristics:
+- Restaurant Type: Fast-casual, Filipino comfort food.
+- Location: High-traffic commercial area.
+- Operating Hours: Open 24 hours a day, from Monday to Saturday (closed on Sundays).
+- Capacity: Can accommodate up to 120 dine-in customers at once.
+- Ordering System:
+  - Online kiosk accessible via customers' personal devices.
+  - Orders placed online must still be paid for in-store.
+  - Walk-in customers may also order directly at the counter.
+"""
+
+    # Only weeks with clustered feedback get this section, so other prompts are unchanged.
+    feedback_section = f"""
+CUSTOMER FEEDBACK THEMES (Most Common Topics This Week):
+{feedback_themes}
+""" if feedback_themes else ""
+
+    system_prompt = f"""
+{restaurant_info}
+
+You are an expert restaurant business strategist. Your task is to act as a consultant, determine the key issues of the restaurant based on the sales data, and provide a single, comprehensive, actionable recommendation for the upcoming week. To do this, you must analyze various sources of information: general business principles, last week's recommendation, its corresponding status, and the current week's sales data. Your final recommendation must be a logical next step, building upon or diverging from last week's advice based on the new data. DO NOT simply repeat the previous recommendation.
+
+CURRENT WEEK'S KPIs (Analytics Data for this Week):
+{kpi_text}
+
+PREVIOUS WEEK'S RECOMMENDATION (Last Week's Advice):
+{last_week_reco or "N/A"}
+
+PREVIOUS WEEK'S RECOMMENDATION STATUS:
+{last_week_status_text}
+
+CONTEXT FROM THE KNOWLEDGE BASE (General Strategies):
+{context}
+{feedback_section}
+TASK:
+Provide your observations for the week and identify potential issues. Review the general strategies, the PREVIOUS WEEK'S RECOMMENDATION, PREVIOUS WEEK'S RECOMMENDATION STATUS, and the CURRENT WEEK'S KPIs. Generate a new, follow-up strategy. What is the logical next step? Generate a unified strategic recommendation that considers the given factors.
+
+STRICTLY FOLLOW THIS FORMAT: (
+## Weekly Business Insights (Week of {report.start_date.strftime('%B %d, %Y')})
+
+**Summary:** 
+(Start with a brief summary of the current week's performance.)
+
+**Observations & Potential Issues:** 
+(List down the identified key issues or opportunities in a bulleted form with its corresponding description.)
+
+**Recommendation for Next Week:** 
+(Provide an actionable recommendation for the upcoming week, building on or diverging from last week's advice.)
+)
+
+**IMPORTANT:**
+- Your recommendation should be a single, clear action item that the restaurant can implement next week.
+- It should not be a repeat of last week's recommendation unless it is a necessary follow-up.
+- DO NOT stray too far from the context provided. Your recommendation must be grounded in the current week's KPIs and the previous week's recommendation.
+- DO NOT include the restaurant's limitations in the potential issues section. Focus on the data and the recommendation.
+""".strip()
+    
+    return system_prompt
+
+
+def previous_weekly_report(report):
+    return Analytics.objects.filter(report_type='weekly', start_date__lt=report.start_date).order_by('-start_date').first()
+
+
+class RecommendationPipeline:
+    def __init__(self, llm=None, data_dir=None, index_dir=None, backend=None, workers=None):
+        self.llm = llm or get_llm()
+        self.data_dir = data_dir or settings.RAG_DATA_DIR
+        self.index_dir = index_dir or settings.RAG_INDEX_DIR
+        self.backend = backend or settings.RAG_VECTOR_BACKEND
+        self.workers = workers or settings.RAG_INGEST_WORKERS
+        self.store = None
+        self.embeddings = None
+
+    @property
+    def is_loaded(self):
+        return self.store is not None
+
+    def load(self):
+        """
+        Syncs the knowledge-base index. Returns (ingest_stats, index_stats, seconds).
+        Raises PipelineError if there is nothing to index.
+        """
+        if not os.path.isdir(self.data_dir):
+            raise PipelineError(f"Knowledge base directory not found at '{self.data_dir}'.")
+
+        started = time.perf_counter()
+        ingest_stats = {}
+        store, embeddings, index_stats = sync_index(
+            iter_chunks(self.data_dir, self.workers, ingest_stats), self.index_dir, self.backend
+        )
+        elapsed = max(time.perf_counter() - started, 1e-6)
+        if not ingest_stats['documents']:
+            raise PipelineError(f"No .txt or .md documents found in '{self.data_dir}'.")
+
+        self.store, self.embeddings = store, embeddings
+        return ingest_stats, index_stats, elapsed
+
+    def retrieve_context(self, report):
+        """Returns (context, documents, timings) for the report's KPI-driven queries."""
+        _, kpi_raw, slow_hours = format_kpi_text(report)
+        base_query = generate_kb_query_from_kpis(kpi_raw, slow_hours)
+        multi_queries = [
+            base_query,
+            "actionable advice for restaurant menu optimization based on sales data",
+            "strategies to improve customer traffic patterns in a restaurant"
+        ]
+        documents, timings = retrieve(self.store, self.embeddings, multi_queries, k=2)
+        context = "\n\n---\n\n".join(doc.page_content for doc in documents)
+        return context, documents, timings
+
+    def update_feedback_topics(self):
+        """Embeds and clusters new feedback with the pipeline's embedding model."""
+        return topics.update_topics(embeddings=self.embeddings)
+
+    def feedback_themes(self, report, limit=5):
+        themes = topics.top_topics(limit, report.start_date, report.end_date)
+        return topics.format_topics_text(themes) if themes else None
+
+    def build_prompt(self, report, previous_report, context, last_week_reco=None, feedback_themes=None):
+        """`last_week_reco` overrides the previous report's stored recommendation."""
+        kpi_text, _, _ = format_kpi_text(report)
+        if last_week_reco is None:
+            last_week_reco = previous_report.recommendation if previous_report else "N/A (First week of data)"
+        last_week_status_text = previous_report.get_recommendation_status_display() if previous_report else "N/A"
+        return build_system_prompt(kpi_text, last_week_reco, last_week_status_text, context, report, feedback_themes)
+
+    def generate(self, prompt):
+        """Returns (recommendation, cached). Raises LLMError."""
+        return self.llm.generate(prompt)
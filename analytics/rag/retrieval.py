@@ -0,0 +1,40 @@
+# backend/analytics/rag/retrieval.py
+import time
+
+# Standard damping constant for reciprocal-rank fusion; keeps one top hit from dominating.
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(result_lists, rrf_k=RRF_K):
+    """Merges ranked result lists into one, scoring each chunk id by sum(1 / (rrf_k + rank))."""
+    scores = {}
+    first_seen = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            scores[result.id] = scores.get(result.id, 0.0) + 1.0 / (rrf_k + rank)
+            first_seen.setdefault(result.id, result)
+    return [first_seen[i] for i in sorted(scores, key=scores.get, reverse=True)]
+
+
+def retrieve(store, embeddings, queries, k=2, where=None):
+    """
+    Embeds all `queries` in one batch, searches them together and fuses the rankings.
+
+    Returns (results, timings) where results are unique by chunk id and timings holds the
+    milliseconds spent in each stage.
+    """
+    timings = {}
+
+    started = time.perf_counter()
+    vectors = embeddings.embed_queries(queries)
+    timings['embed_ms'] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    result_lists = store.search(vectors, k=k, where=where)
+    timings['search_ms'] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    results = reciprocal_rank_fusion(result_lists)
+    timings['fuse_ms'] = (time.perf_counter() - started) * 1000
+
+    return results, timings
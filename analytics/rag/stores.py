@@ -0,0 +1,217 @@
+# backend/analytics/rag/stores.py
+"""
+Retrieval backends for the knowledge base.
+
+Both backends store pre-computed, L2-normalized embeddings and score by cosine similarity:
+
+- `numpy`: a memory-mapped float32 matrix plus a JSON metadata sidecar, searched with one
+  matrix multiply. No extra services, near-zero startup; meant for small corpora.
+- `chroma`: a persistent Chroma collection with an HNSW index, for large corpora.
+
+This module deliberately avoids Django imports so it can be loaded in benchmark subprocesses.
+"""
+import json
+import os
+
+import numpy as np
+
+BACKENDS = ('numpy', 'chroma')
+
+
+class SearchResult:
+    __slots__ = ('id', 'text', 'metadata', 'score')
+
+    def __init__(self, id, text, metadata, score):
+        self.id = id
+        self.text = text
+        self.metadata = metadata
+        self.score = score
+
+    # Retrieval callers only need the chunk text; keep the Document-style name.
+    @property
+    def page_content(self):
+        return self.text
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _matches(metadata, where):
+    return all(metadata.get(key) == value for key, value in where.items())
+
+
+class NumpyVectorStore:
+    MATRIX_FILE = 'embeddings.npy'
+    METADATA_FILE = 'metadata.json'
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._pending = {}
+        self._deleted = set()
+        self._load()
+
+    def _load(self):
+        matrix_path = os.path.join(self.directory, self.MATRIX_FILE)
+        metadata_path = os.path.join(self.directory, self.METADATA_FILE)
+        if os.path.exists(matrix_path) and os.path.exists(metadata_path):
+            self._matrix = np.load(matrix_path, mmap_mode='r')
+            with open(metadata_path, encoding='utf-8') as f:
+                sidecar = json.load(f)
+            self._ids = sidecar['ids']
+            self._texts = sidecar['texts']
+            self._metadatas = sidecar['metadatas']
+        else:
+            self._matrix = np.zeros((0, 0), dtype=np.float32)
+            self._ids, self._texts, self._metadatas = [], [], []
+        self._row = {chunk_id: i for i, chunk_id in enumerate(self._ids)}
+
+    def __len__(self):
+        return len(self._ids)
+
+    def ids(self):
+        return set(self._ids)
+
+    def reset(self):
+        for name in (self.MATRIX_FILE, self.METADATA_FILE):
+            path = os.path.join(self.directory, name)
+            if os.path.exists(path):
+                os.remove(path)
+        self._pending.clear()
+        self._deleted.clear()
+        self._load()
+
+    def upsert(self, ids, texts, metadatas, vectors):
+        for chunk_id, text, metadata, vector in zip(ids, texts, metadatas, normalize(vectors)):
+            self._pending[chunk_id] = (text, metadata, vector)
+            self._deleted.discard(chunk_id)
+
+    def delete(self, ids):
+        for chunk_id in ids:
+            self._pending.pop(chunk_id, None)
+            self._deleted.add(chunk_id)
+
+    def persist(self):
+        """Rewrites the matrix and sidecar with pending upserts and deletions applied."""
+        if not self._pending and not self._deleted:
+            return
+        keep = [
+            i for i, chunk_id in enumerate(self._ids)
+            if chunk_id not in self._deleted and chunk_id not in self._pending
+        ]
+        ids = [self._ids[i] for i in keep] + list(self._pending)
+        texts = [self._texts[i] for i in keep] + [p[0] for p in self._pending.values()]
+        metadatas = [self._metadatas[i] for i in keep] + [p[1] for p in self._pending.values()]
+        blocks = []
+        if keep:
+            blocks.append(np.asarray(self._matrix[keep], dtype=np.float32))
+        if self._pending:
+            blocks.append(np.stack([p[2] for p in self._pending.values()]))
+        matrix = np.concatenate(blocks) if blocks else np.zeros((0, 0), dtype=np.float32)
+
+        matrix_path = os.path.join(self.directory, self.MATRIX_FILE)
+        metadata_path = os.path.join(self.directory, self.METADATA_FILE)
+        # np.save appends ".npy" to names that lack it, so the temp name keeps the suffix.
+        tmp_matrix_path = os.path.join(self.directory, f"tmp-{self.MATRIX_FILE}")
+        np.save(tmp_matrix_path, matrix)
+        with open(f"{metadata_path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump({'ids': ids, 'texts': texts, 'metadatas': metadatas}, f)
+        # Drop the old memory map before replacing the file underneath it.
+        self._matrix = None
+        os.replace(tmp_matrix_path, matrix_path)
+        os.replace(f"{metadata_path}.tmp", metadata_path)
+
+        self._pending.clear()
+        self._deleted.clear()
+        self._load()
+
+    def search(self, query_vectors, k=4, where=None):
+        """Returns, for each query vector, the `k` best SearchResults by cosine similarity."""
+        queries = normalize(query_vectors)
+        if not self._ids:
+            return [[] for _ in range(len(queries))]
+
+        scores = queries @ self._matrix.T
+        if where:
+            allowed = np.array([_matches(m, where) for m in self._metadatas])
+            scores = np.where(allowed[None, :], scores, -np.inf)
+
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            ranked = candidates[np.argsort(-row[candidates])]
+            results.append([
+                SearchResult(self._ids[i], self._texts[i], self._metadatas[i], float(row[i]))
+                for i in ranked if np.isfinite(row[i])
+            ])
+        return results
+
+
+class ChromaVectorStore:
+    COLLECTION_NAME = 'knowledge_base'
+
+    def __init__(self, directory):
+        import chromadb
+        from chromadb.config import Settings
+
+        self.directory = directory
+        self._client = chromadb.PersistentClient(path=directory, settings=Settings(anonymized_telemetry=False))
+        self._collection = self._open()
+
+    def _open(self):
+        return self._client.get_or_create_collection(self.COLLECTION_NAME, metadata={'hnsw:space': 'cosine'})
+
+    def __len__(self):
+        return self._collection.count()
+
+    def ids(self):
+        return set(self._collection.get(include=[])['ids'])
+
+    def reset(self):
+        self._client.delete_collection(self.COLLECTION_NAME)
+        self._collection = self._open()
+
+    def upsert(self, ids, texts, metadatas, vectors):
+        self._collection.upsert(
+            ids=list(ids), documents=list(texts), metadatas=list(metadatas),
+            embeddings=normalize(vectors).tolist(),
+        )
+
+    def delete(self, ids):
+        self._collection.delete(ids=list(ids))
+
+    def persist(self):
+        # PersistentClient writes through on every call.
+        pass
+
+    def search(self, query_vectors, k=4, where=None):
+        queries = normalize(query_vectors)
+        if not len(self):
+            return [[] for _ in range(len(queries))]
+        response = self._collection.query(
+            query_embeddings=queries.tolist(), n_results=min(k, len(self)), where=where or None,
+            include=['documents', 'metadatas', 'distances'],
+        )
+        return [
+            [
+                SearchResult(i, text, metadata, 1.0 - distance)
+                for i, text, metadata, distance in zip(ids, texts, metadatas, distances)
+            ]
+            for ids, texts, metadatas, distances in zip(
+                response['ids'], response['documents'], response['metadatas'], response['distances']
+            )
+        ]
+
+
+def open_store(backend, directory):
+    if backend == 'numpy':
+        return NumpyVectorStore(directory)
+    if backend == 'chroma':
+        return ChromaVectorStore(directory)
+    raise ValueError(f"Unknown vector store backend '{backend}'. Choose from: {', '.join(BACKENDS)}.")
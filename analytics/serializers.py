@@ -1,6 +1,6 @@
 # backend/analytics/serializers.py
 from rest_framework import serializers
-from .models import Analytics
+from .models import Analytics, RecommendationJob
 
 class AnalyticsSerializer(serializers.ModelSerializer):
     recommendation_status_display = serializers.CharField(source='get_recommendation_status_display', read_only=True)
@@ -10,4 +10,12 @@ class AnalyticsSerializer(serializers.ModelSerializer):
                   'total_order_count', 'online_order_count', 'walkin_order_count', 
                   'avg_items_per_order', 'dish_performance', 'avg_hourly_orders', 
                   'recommendation', 'recommendation_status', 'recommendation_status_display',  'is_viewed',
-                  'generated_at']
\ No newline at end of file
+                  'generated_at']
+
+
+class RecommendationJobSerializer(serializers.ModelSerializer):
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    class Meta:
+        model = RecommendationJob
+        fields = ['id', 'report', 'status', 'status_display', 'stage', 'progress', 'error',
+                  'created_at', 'started_at', 'finished_at']
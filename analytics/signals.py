@@ -0,0 +1,15 @@
+# backend/analytics/signals.py
+from django.dispatch import receiver
+
+from orders.signals import order_completed
+from . import basket, intraday
+
+
+@receiver(order_completed)
+def update_market_basket(sender, order, **kwargs):
+    basket.record_order(order)
+
+
+@receiver(order_completed)
+def update_intraday_kpis(sender, order, **kwargs):
+    intraday.record_completed_order(order)
@@ -1,3 +1,158 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+
+from menu.models import Categories, MenuItems, Variations
+from orders.models import OrderItems, Orders
+from . import basket, intraday
+from .basket import basket_index
+
+
+def make_variations(*names):
+    category = Categories.objects.create(name='Silog')
+    return [
+        Variations.objects.create(
+            menu_item=MenuItems.objects.create(category=category, name=name),
+            size_name='Regular', price=100, stock_level=50,
+        )
+        for name in names
+    ]
+
+
+class MarketBasketTests(TestCase):
+    def setUp(self):
+        self.a, self.b, self.c = (v.id for v in make_variations('Tapsilog', 'Iced Tea', 'Longsilog'))
+        # 6 baskets: A in 4, B in 4, C in 2; A+B together in 3, B+C in 1.
+        for items in [[self.a, self.b]] * 3 + [[self.a], [self.b, self.c], [self.c]]:
+            basket.record_basket(items)
+        # record_basket invalidates the index on commit, which TestCase never reaches.
+        basket_index.invalidate()
+
+    def test_support_confidence_and_lift(self):
+        [pairing] = basket_index.pairings(self.a, min_count=1)
+        self.assertEqual(pairing, {
+            'variation_id': self.b,
+            'order_count': 3,
+            'support': 0.5,            # 3 of 6 baskets
+            'confidence': 0.75,        # 3 of the 4 baskets with A
+            'lift': 1.125,             # 0.75 / (4 / 6)
+        })
+
+    def test_pairings_are_ranked_by_lift(self):
+        pairings = basket_index.pairings(self.b, min_count=1)
+        self.assertEqual([p['variation_id'] for p in pairings], [self.a, self.c])
+        self.assertEqual(pairings[1]['confidence'], 0.25)
+        self.assertEqual(pairings[1]['lift'], 0.75)
+
+    def test_rare_pairs_are_dropped(self):
+        self.assertEqual([p['variation_id'] for p in basket_index.pairings(self.b, min_count=3)], [self.a])
+        self.assertEqual(basket_index.pairings(self.c, min_count=3), [])
+
+    def test_k_limits_the_result(self):
+        self.assertEqual(len(basket_index.pairings(self.b, k=1, min_count=1)), 1)
+
+    def test_repeated_items_count_once_per_basket(self):
+        basket.record_basket([self.a, self.a, self.c])
+        basket_index.invalidate()
+        pairing = next(p for p in basket_index.pairings(self.c, min_count=1) if p['variation_id'] == self.a)
+        self.assertEqual(pairing['order_count'], 1)
+        self.assertEqual(pairing['confidence'], round(1 / 3, 4))
+
+    def test_rebuild_matches_incremental_counts(self):
+        expected = {v: basket_index.pairings(v, min_count=1) for v in (self.a, self.b, self.c)}
+        for i, items in enumerate([[self.a, self.b]] * 3 + [[self.a], [self.b, self.c], [self.c]]):
+            order = Orders.objects.create(
+                order_number=f"T{i}", total_amount=100, status='completed', dining_method='dine-in',
+            )
+            OrderItems.objects.bulk_create([
+                OrderItems(order=order, variation_id=v, quantity=1, price_at_order=100) for v in items
+            ])
+        Orders.objects.create(order_number='PENDING', total_amount=100, dining_method='dine-in')
+
+        self.assertEqual(basket.rebuild(), (6, 2))
+        basket_index.invalidate()
+        self.assertEqual({v: basket_index.pairings(v, min_count=1) for v in expected}, expected)
+
+
+def local(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()).replace(hour=hour, minute=minute))
+
+
+class IntradayKPITests(TestCase):
+    day = date(2025, 3, 14)
+
+    def setUp(self):
+        cache.clear()
+        [self.variation] = make_variations('Tapsilog')
+        self.count = 0
+
+    def order(self, processed_at, total, quantity=1, order_type='pre-selection', status='completed'):
+        self.count += 1
+        order = Orders.objects.create(
+            order_number=f"T{self.count}", total_amount=total, status=status, order_type=order_type,
+            dining_method='dine-in', processed_at=processed_at,
+        )
+        OrderItems.objects.create(order=order, variation=self.variation, quantity=quantity, price_at_order=total)
+        return order
+
+    def hourly(self, counters):
+        return {h['hour']: h['orders'] for h in counters['hourly_orders'] if h['orders']}
+
+    def test_prime_counts_the_local_day(self):
+        self.order(local(self.day, 0, 5), '120.50', quantity=2)
+        self.order(local(self.day, 12, 30), '80.25', order_type='walk-in')
+        self.order(local(self.day, 23, 59), '10.00')
+        self.order(local(self.day, 12), '999.00', status='cancelled')
+        self.order(local(date(2025, 3, 15), 0, 1), '999.00')
+
+        counters = intraday.get_counters(self.day)
+        self.assertEqual(counters['total_sales_revenue'], Decimal('210.75'))
+        self.assertEqual(counters['total_order_count'], 3)
+        self.assertEqual(counters['total_items_sold'], 4)
+        self.assertEqual(counters['online_order_count'], 2)
+        self.assertEqual(counters['walkin_order_count'], 1)
+        self.assertEqual(counters['average_order_value'], Decimal('70.25'))
+        self.assertEqual(self.hourly(counters), {0: 1, 12: 1, 23: 1})
+        self.assertEqual(len(counters['hourly_orders']), 24)
+
+    def test_completed_orders_increment_their_hour(self):
+        intraday.prime(self.day)
+        intraday.record_completed_order(self.order(local(self.day, 9, 45), '99.99', quantity=3, order_type='walk-in'))
+        intraday.record_completed_order(self.order(local(self.day, 9, 10), '0.01'))
+
+        counters = intraday.get_counters(self.day)
+        self.assertEqual(counters['total_sales_revenue'], Decimal('100.00'))
+        self.assertEqual(counters['total_order_count'], 2)
+        self.assertEqual(counters['total_items_sold'], 4)
+        self.assertEqual((counters['online_order_count'], counters['walkin_order_count']), (1, 1))
+        self.assertEqual(self.hourly(counters), {9: 2})
+
+    def test_increments_match_a_recount(self):
+        intraday.prime(self.day)
+        for hour, total in [(8, '15.10'), (13, '20.20'), (13, '30.30')]:
+            intraday.record_completed_order(self.order(local(self.day, hour), total))
+        incremented = intraday.get_counters(self.day)
+        intraday.prime(self.day)
+        self.assertEqual(intraday.get_counters(self.day), incremented)
+
+    def test_missing_counters_are_recounted(self):
+        # Nothing cached yet: the increment is dropped and the next read recounts the day.
+        intraday.record_completed_order(self.order(local(self.day, 18), '45.00'))
+        self.assertEqual(intraday.get_counters(self.day)['total_order_count'], 1)
+
+        cache.delete(intraday._key(self.day, 'hour:18'))
+        intraday.record_completed_order(self.order(local(self.day, 18, 30), '5.00'))
+        counters = intraday.get_counters(self.day)
+        self.assertEqual(counters['total_sales_revenue'], Decimal('50.00'))
+        self.assertEqual(self.hourly(counters), {18: 2})
 
-# Create your tests here.
+    def test_expired_recount_marker_triggers_a_recount(self):
+        intraday.prime(self.day)
+        # An increment that raced a recount and was lost.
+        self.order(local(self.day, 11), '12.00')
+        self.assertEqual(intraday.get_counters(self.day)['total_order_count'], 0)
+        cache.delete(intraday._key(self.day, 'primed'))
+        self.assertEqual(intraday.get_counters(self.day)['total_order_count'], 1)
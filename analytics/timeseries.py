@@ -0,0 +1,166 @@
+# backend/analytics/timeseries.py
+"""
+Revenue / orders / units time series at an arbitrary bucket size.
+
+The database groups completed orders by hour, day, week or month on the indexed
+(status, processed_at) range; multiples of those units (e.g. "6hour", "2week") are folded in
+Python, and the result is cached per (range, bucket). Downsampling to a maximum point count
+merges adjacent buckets so sums are preserved.
+"""
+import math
+import re
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Sum, Count
+from django.db.models.functions import Trunc
+from django.utils import timezone
+from django.utils.timezone import localtime
+
+from orders.models import Orders, OrderItems
+
+BUCKET_RE = re.compile(r'^(\d*)\s*(hour|day|week|month)s?$')
+UNIT_ALIASES = {'h': 'hour', 'd': 'day', 'w': 'week', 'm': 'month'}
+CACHE_TIMEOUT_PAST = 60 * 60 * 24
+CACHE_TIMEOUT_CURRENT = 60 * 5
+
+
+def parse_bucket(value):
+    """Parses '6hour', '2 weeks', 'day' or '3d' into (count, unit). Raises ValueError."""
+    value = (value or 'day').strip().lower()
+    short = re.match(r'^(\d*)([hdwm])$', value)
+    if short:
+        value = f"{short.group(1)}{UNIT_ALIASES[short.group(2)]}"
+    match = BUCKET_RE.match(value)
+    if not match:
+        raise ValueError(f"Invalid bucket '{value}'.")
+    count = int(match.group(1) or 1)
+    if count < 1:
+        raise ValueError("Bucket size must be at least 1.")
+    return count, match.group(2)
+
+
+def _month_index(d):
+    return d.year * 12 + d.month - 1
+
+
+def bucket_count(start_date, end_date, count, unit):
+    """Buckets covering [start_date, end_date], without building them. Raises OverflowError near date.max."""
+    if unit == 'month':
+        return (_month_index(end_date) - _month_index(start_date)) // count + 1
+    origin = start_date - timedelta(days=start_date.weekday()) if unit == 'week' else start_date
+    seconds = ((end_date + timedelta(days=1)) - origin).days * 86400
+    return math.ceil(seconds / ({'hour': 3600, 'day': 86400, 'week': 604800}[unit] * count))
+
+
+def _bucket_starts(start_date, end_date, count, unit):
+    """Local bucket start datetimes covering [start_date, end_date]."""
+    tz = timezone.get_current_timezone()
+    if unit == 'month':
+        first = _month_index(start_date)
+        last = _month_index(end_date)
+        return [
+            timezone.make_aware(datetime(i // 12, i % 12 + 1, 1), tz)
+            for i in range(first, last + 1, count)
+        ]
+
+    if unit == 'week':
+        origin = start_date - timedelta(days=start_date.weekday())
+        step = timedelta(weeks=count)
+    elif unit == 'day':
+        origin = start_date
+        step = timedelta(days=count)
+    else:
+        origin = start_date
+        step = timedelta(hours=count)
+
+    current = datetime.combine(origin, time.min)
+    end = datetime.combine(end_date + timedelta(days=1), time.min)
+    starts = []
+    while current < end:
+        starts.append(timezone.make_aware(current, tz))
+        current += step
+    return starts
+
+
+def _bucket_index(value, origin, count, unit):
+    value = localtime(value).replace(tzinfo=None)
+    origin = localtime(origin).replace(tzinfo=None)
+    if unit == 'month':
+        return (_month_index(value) - _month_index(origin)) // count
+    step = {'hour': 3600, 'day': 86400, 'week': 604800}[unit] * count
+    return int((value - origin).total_seconds() // step)
+
+
+def build_series(start_date, end_date, count, unit):
+    tz = timezone.get_current_timezone()
+    range_start = timezone.make_aware(datetime.combine(start_date, time.min), tz)
+    range_end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), tz)
+
+    starts = _bucket_starts(start_date, end_date, count, unit)
+    points = [{'bucket_start': s, 'revenue': Decimal('0.00'), 'orders': 0, 'units': 0} for s in starts]
+    if not points:
+        return points
+    origin = starts[0]
+
+    orders = Orders.objects.filter(
+        status='completed', processed_at__gte=range_start, processed_at__lt=range_end
+    )
+    order_rows = (
+        orders.annotate(period=Trunc('processed_at', unit, tzinfo=tz))
+        .values('period')
+        .annotate(revenue=Sum('total_amount'), orders=Count('id'))
+        .values_list('period', 'revenue', 'orders')
+    )
+    for period, revenue, order_count in order_rows:
+        i = _bucket_index(period, origin, count, unit)
+        if 0 <= i < len(points):
+            points[i]['revenue'] += revenue or 0
+            points[i]['orders'] += order_count
+
+    unit_rows = (
+        OrderItems.objects.filter(
+            order__status='completed',
+            order__processed_at__gte=range_start,
+            order__processed_at__lt=range_end,
+        )
+        .annotate(period=Trunc('order__processed_at', unit, tzinfo=tz))
+        .values('period')
+        .annotate(units=Sum('quantity'))
+        .values_list('period', 'units')
+    )
+    for period, units in unit_rows:
+        i = _bucket_index(period, origin, count, unit)
+        if 0 <= i < len(points):
+            points[i]['units'] += units or 0
+
+    return points
+
+
+def get_series(start_date, end_date, count, unit):
+    key = f"timeseries:{start_date.isoformat()}:{end_date.isoformat()}:{count}{unit}"
+    points = cache.get(key)
+    if points is None:
+        points = build_series(start_date, end_date, count, unit)
+        today = localtime(timezone.now()).date()
+        cache.set(key, points, CACHE_TIMEOUT_CURRENT if end_date >= today else CACHE_TIMEOUT_PAST)
+    return points
+
+
+def downsample(points, max_points):
+    """Merges runs of adjacent buckets so at most `max_points` remain. Returns (points, factor)."""
+    if not max_points or len(points) <= max_points:
+        return points, 1
+
+    factor = math.ceil(len(points) / max_points)
+    merged = []
+    for i in range(0, len(points), factor):
+        group = points[i:i + factor]
+        merged.append({
+            'bucket_start': group[0]['bucket_start'],
+            'revenue': sum((p['revenue'] for p in group), Decimal('0.00')),
+            'orders': sum(p['orders'] for p in group),
+            'units': sum(p['units'] for p in group),
+        })
+    return merged, factor
@@ -1,10 +1,17 @@
 # backend/analytics/urls.py
 from django.urls import path
-from .views import AnalyticsDataView, PerformanceReportView, RecommendationView
+from .views import (
+    AnalyticsDataView, TodayKPIView, TimeSeriesView, PerformanceReportView, RecommendationView,
+    RecommendationJobListView, RecommendationJobDetailView,
+)
 
 urlpatterns = [
     path('', AnalyticsDataView.as_view(), name='analytics-data'),
+    path('today/', TodayKPIView.as_view(), name='analytics-today'),
+    path('timeseries/', TimeSeriesView.as_view(), name='analytics-timeseries'),
     path('performance-report/', PerformanceReportView.as_view(), name='performance-report'),
     path('recommendation/', RecommendationView.as_view(), name='analytics-recommendation'),
+    path('recommendation/jobs/', RecommendationJobListView.as_view(), name='recommendation-job-list'),
+    path('recommendation/jobs/<int:pk>/', RecommendationJobDetailView.as_view(), name='recommendation-job-detail'),
 
 ]
\ No newline at end of file
@@ -1,15 +1,18 @@
 # backend/analytics/views.py
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from users.permissions import IsAdminUser
-from .models import Analytics
-from .serializers import AnalyticsSerializer
+from .models import Analytics, RecommendationJob
+from .serializers import AnalyticsSerializer, RecommendationJobSerializer
+from . import intraday, timeseries, comparison, jobs
 
 from django.utils.dateparse import parse_date
 from django.db.models import Sum, Count, Avg, F
 from orders.models import Orders, OrderItems
 from django.utils import timezone
+from django.utils.timezone import localtime
 from datetime import timedelta
 
 class AnalyticsDataView(APIView):
@@ -27,9 +30,77 @@ class AnalyticsDataView(APIView):
             return Response({"message": "No analytics data found for the selected period."}, status=404)
 
         serializer = AnalyticsSerializer(analytics_record)
-        return Response(serializer.data)
+
+        compare = request.query_params.get('compare')
+        if not compare:
+            return Response(serializer.data)
+        if compare not in comparison.COMPARE_MODES:
+            return Response({"error": "Invalid compare mode. Use 'previous' or 'last_year'."}, status=400)
+
+        previous_record = comparison.find_comparison_report(analytics_record, compare)
+        response_data = dict(serializer.data)
+        response_data['comparison'] = comparison.compare_reports(analytics_record, previous_record)
+        return Response(response_data)
     
 
+class TodayKPIView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        today = localtime(timezone.now()).date()
+        return Response(intraday.get_counters(today))
+
+
+class TimeSeriesView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    # Buckets built (and cached) per request, before downsampling.
+    MAX_BUCKETS = 20000
+
+    def get(self, request):
+        today = localtime(timezone.now()).date()
+        end_date_str = request.query_params.get('end_date')
+        start_date_str = request.query_params.get('start_date')
+
+        try:
+            end_date = parse_date(end_date_str) if end_date_str else today
+            start_date = parse_date(start_date_str) if start_date_str else end_date - timedelta(days=29)
+        except (ValueError, OverflowError):
+            # parse_date raises ValueError for well-formed but impossible dates (2024-02-30).
+            return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=400)
+
+        if not start_date or not end_date:
+            return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=400)
+        if start_date > end_date:
+            return Response({"error": "start_date must be on or before end_date."}, status=400)
+
+        try:
+            count, unit = timeseries.parse_bucket(request.query_params.get('bucket', 'day'))
+            max_points = int(request.query_params.get('max_points', 500))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        try:
+            num_buckets = timeseries.bucket_count(start_date, end_date, count, unit)
+        except OverflowError:
+            return Response({"error": "Date out of range."}, status=400)
+        if num_buckets > self.MAX_BUCKETS:
+            return Response(
+                {"error": f"Range covers {num_buckets} buckets; use a larger bucket or a shorter range (max {self.MAX_BUCKETS})."},
+                status=400,
+            )
+
+        points = timeseries.get_series(start_date, end_date, count, unit)
+        points, factor = timeseries.downsample(points, max(1, min(max_points, 5000)))
+
+        return Response({
+            'start_date': start_date,
+            'end_date': end_date,
+            'bucket': f"{count}{unit}",
+            'effective_bucket': f"{count * factor}{unit}",
+            'points': points,
+        })
+
+
 class PerformanceReportView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
@@ -43,6 +114,13 @@ class PerformanceReportView(APIView):
         if not start_date or not end_date:
             return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=400)
 
+        compare = request.query_params.get('compare')
+        if compare:
+            if compare not in comparison.COMPARE_MODES:
+                return Response({"error": "Invalid compare mode. Use 'previous' or 'last_year'."}, status=400)
+            previous_start, previous_end = comparison.comparison_period(start_date, end_date, compare)
+            return Response(comparison.compare_performance(start_date, end_date, previous_start, previous_end))
+
         orders_in_period = Orders.objects.filter(
             status='completed',
             processed_at__date__gte=start_date,
@@ -62,10 +140,7 @@ class PerformanceReportView(APIView):
 
         item_performance = (
             order_items_in_period
-            .values(
-                'variation__menu_item__name', 
-                'variation__size_name'
-            )
+            .values('variation_id')
             .annotate(
                 item_name=F('variation__menu_item__name'),
                 variation_name=F('variation__size_name'),
@@ -74,7 +149,7 @@ class PerformanceReportView(APIView):
                 average_price=Avg('price_at_order')
             )
             .values(
-                'item_name', 'variation_name', 'units_sold', 
+                'variation_id', 'item_name', 'variation_name', 'units_sold', 
                 'total_revenue', 'average_price'
             )
             .order_by('-total_revenue')
@@ -127,3 +202,38 @@ class RecommendationView(APIView):
             return Response({"success": "Status updated successfully."})
         except Analytics.DoesNotExist:
             return Response({"error": "Report not found."}, status=status.HTTP_404_NOT_FOUND)
+
+
+class RecommendationJobListView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def post(self, request):
+        """Queues a fresh recommendation for a weekly report; repeats reuse the active job."""
+        report_id = request.data.get('report_id')
+        if not report_id:
+            return Response({"error": "report_id is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            report = Analytics.objects.get(id=report_id, report_type='weekly')
+        except (Analytics.DoesNotExist, ValueError):
+            return Response({"error": "Weekly report not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        job, created = jobs.enqueue_recommendation(report, request.user.id)
+        if job is None:
+            return Response(
+                {"error": "Another request for this report is being processed. Please try again."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        serializer = RecommendationJobSerializer(job)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK)
+
+
+class RecommendationJobDetailView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request, pk):
+        try:
+            job = RecommendationJob.objects.get(pk=pk)
+        except RecommendationJob.DoesNotExist:
+            return Response({"error": "Job not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(RecommendationJobSerializer(job).data)
@@ -59,11 +59,14 @@ INSTALLED_APPS = [
     'feedback',
     'analytics',
     'facial_auth',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'monitoring.middleware.MetricsMiddleware',
+    'monitoring.middleware.ProfilerMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware', 
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -108,6 +111,18 @@ DATABASES = {
     }
 }
 
+# DB_ENGINE=sqlite runs against a local SQLite file instead (DB_NAME, default db.sqlite3), e.g. for
+# benchmark_endpoints without a Postgres server. Transactions take the write lock when they begin,
+# so concurrent writers wait for it instead of failing with "database is locked".
+if os.getenv('DB_ENGINE') == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('DB_NAME') or BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 30},
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -154,10 +169,14 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CORS_ALLOW_ALL_ORIGINS = True  # Allow all origins (for development)
 
+# Client IPs (login rate limiting, throttles) come from X-Forwarded-For only as far back as
+# NUM_PROXIES trusted reverse proxies; with 0 the header is ignored and REMOTE_ADDR is used, so
+# clients can't pick their own IP. Set it to the number of proxies in front of the app.
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ),
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
 
 SIMPLE_JWT = {
@@ -170,17 +189,110 @@ SIMPLE_JWT = {
 
 AUTH_USER_MODEL = 'users.User'
 
+# API requests build request.user from the access token's claims instead of loading the User row;
+# set to False to go back to one user lookup per request.
+JWT_STATELESS_USER = os.getenv('JWT_STATELESS_USER', 'True') == 'True'
+# Seconds a process trusts its cached user version (password/active/role) before re-checking the
+# database, i.e. how long a revoked token can still be used on another worker.
+JWT_USER_CACHE_TTL = int(os.getenv('JWT_USER_CACHE_TTL', 60))
+
+# Login attempts are limited per client IP and per account with token buckets (burst size, then
+# tokens regained per minute), checked before any password hashing. 'local' keeps the buckets in
+# each process; 'cache' shares them through CACHES (set REDIS_URL) across workers.
+LOGIN_RATE_LIMIT_ENABLED = os.getenv('LOGIN_RATE_LIMIT_ENABLED', 'True') == 'True'
+LOGIN_RATE_LIMIT_BACKEND = os.getenv('LOGIN_RATE_LIMIT_BACKEND', 'local')
+LOGIN_IP_BURST = int(os.getenv('LOGIN_IP_BURST', 20))
+LOGIN_IP_REFILL_PER_MINUTE = float(os.getenv('LOGIN_IP_REFILL_PER_MINUTE', 10))
+LOGIN_ACCOUNT_BURST = int(os.getenv('LOGIN_ACCOUNT_BURST', 5))
+LOGIN_ACCOUNT_REFILL_PER_MINUTE = float(os.getenv('LOGIN_ACCOUNT_REFILL_PER_MINUTE', 2))
+
+# Live counters (intraday KPIs, dashboards) need a cache shared by every worker process in production.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 #for image
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# e.g. 'django.core.mail.backends.filebased.EmailBackend' (with EMAIL_FILE_PATH) or '...locmem.EmailBackend' locally.
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = os.getenv('EMAIL_FILE_PATH', os.path.join(BASE_DIR, 'sent_emails'))
+EMAIL_TIMEOUT = int(os.getenv('EMAIL_TIMEOUT', 20))
 EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
+# Queued emails are delivered by a background thread in the web process after each commit;
+# set to False when `send_queued_emails --loop` runs as a separate worker instead.
+EMAIL_OUTBOX_AUTO_SEND = os.getenv('EMAIL_OUTBOX_AUTO_SEND', 'True') == 'True'
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
 
 CORS_ALLOWED_ORIGINS = os.getenv('CORS_ALLOWED_ORIGINS', 'http://localhost:5173,http://127.0.0.1:5173').split(',')
+
+# Per-route request metrics (latency, SQL count/time, response size) served at /metrics to staff.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True') == 'True'
+# A request running the same SQL statement this many times is counted as a likely N+1.
+METRICS_N_PLUS_ONE_THRESHOLD = int(os.getenv('METRICS_N_PLUS_ONE_THRESHOLD', 10))
+
+# Staff can profile a single request with an `X-Profile: sample|cprofile` header (or `_profile`
+# query parameter) when this is on; profiles are written to PROFILING_DIR, see monitoring.profiling.
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False') == 'True'
+PROFILING_DIR = os.getenv('PROFILING_DIR', os.path.join(BASE_DIR, 'profiles'))
+# Profiles each process may take per minute (also the burst size).
+PROFILING_MAX_PER_MINUTE = int(os.getenv('PROFILING_MAX_PER_MINUTE', 6))
+PROFILING_SAMPLE_INTERVAL = float(os.getenv('PROFILING_SAMPLE_INTERVAL', 0.005))
+
+# Bulk staff import: maximum rows per request and threads hashing their passwords.
+STAFF_IMPORT_MAX_ROWS = int(os.getenv('STAFF_IMPORT_MAX_ROWS', 500))
+STAFF_IMPORT_HASH_WORKERS = int(os.getenv('STAFF_IMPORT_HASH_WORKERS', os.cpu_count() or 1))
+
+# Admin dashboard counters are kept current in the cache by model signals and recounted in the
+# background at most this many seconds after their last count.
+DASHBOARD_COUNTER_TTL = int(os.getenv('DASHBOARD_COUNTER_TTL', 300))
+# Available variations at or below this stock level count as low stock on the dashboard.
+DASHBOARD_LOW_STOCK_THRESHOLD = int(os.getenv('DASHBOARD_LOW_STOCK_THRESHOLD', 10))
+# Today's KPI counters (analytics.intraday) are recounted from the orders table at most this many
+# seconds after their last count, which bounds drift from orders completing during a count.
+INTRADAY_KPI_RECOUNT_TTL = int(os.getenv('INTRADAY_KPI_RECOUNT_TTL', 300))
+
+# Seconds the in-process market basket index is served before it is reloaded from the database.
+MARKET_BASKET_INDEX_TTL = int(os.getenv('MARKET_BASKET_INDEX_TTL', 300))
+
+# Knowledge base for the weekly recommendation (RAG): every .txt/.md file under RAG_DATA_DIR is indexed.
+RAG_DATA_DIR = os.getenv('RAG_DATA_DIR', os.path.join(BASE_DIR, 'analytics', 'data'))
+RAG_INDEX_DIR = os.getenv('RAG_INDEX_DIR', os.path.join(BASE_DIR, 'chroma_db'))
+RAG_INGEST_WORKERS = int(os.getenv('RAG_INGEST_WORKERS', 0)) or None
+# 'numpy' (in-process matrix, best for small knowledge bases) or 'chroma' (HNSW index, for large corpora).
+RAG_VECTOR_BACKEND = os.getenv('RAG_VECTOR_BACKEND', 'numpy')
+
+# LLM used to write the recommendation: 'gemini' or 'stub' (deterministic, offline; for CI and benchmarks).
+GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
+RAG_LLM_PROVIDER = os.getenv('RAG_LLM_PROVIDER', 'gemini')
+RAG_LLM_MODEL = os.getenv('RAG_LLM_MODEL', 'gemini-2.0-flash')
+RAG_LLM_TIMEOUT = int(os.getenv('RAG_LLM_TIMEOUT', 60))
+RAG_LLM_MAX_RETRIES = int(os.getenv('RAG_LLM_MAX_RETRIES', 3))
+# Responses are cached by hash of provider, model and prompt; set to '' to disable.
+RAG_LLM_CACHE_DIR = os.getenv('RAG_LLM_CACHE_DIR', os.path.join(RAG_INDEX_DIR, 'llm_cache'))
+# Concurrent LLM calls when back-filling recommendations with `generate_recommendation --all`.
+RAG_LLM_CONCURRENCY = int(os.getenv('RAG_LLM_CONCURRENCY', 4))
+# In-process worker threads for on-demand recommendation jobs, and seconds before a job left
+# queued/running (e.g. by a restarted server) stops blocking new requests for its report.
+RECOMMENDATION_JOB_WORKERS = int(os.getenv('RECOMMENDATION_JOB_WORKERS', 2))
+RECOMMENDATION_JOB_TIMEOUT = int(os.getenv('RECOMMENDATION_JOB_TIMEOUT', 900))
+# Minimum cosine similarity for a feedback comment to join an existing topic instead of starting one.
+FEEDBACK_TOPIC_THRESHOLD = float(os.getenv('FEEDBACK_TOPIC_THRESHOLD', 0.6))
@@ -19,6 +19,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from monitoring.views import MetricsView
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -32,6 +34,8 @@ urlpatterns = [
     path('api/analytics/', include('analytics.urls')), # --- ADD THIS LINE ---
     path("api/facial/", include("facial_auth.urls")),
 
+    path('metrics', MetricsView.as_view(), name='metrics'),
+
 
 ]
 
@@ -6,7 +6,7 @@ from django.contrib.auth import get_user_model
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from users.serializers import MyTokenObtainPairSerializer
 from .models import FacialData
 
 User = get_user_model()
@@ -36,7 +36,7 @@ def upload_face(request):
         embedding = DeepFace.represent(img_path=img, model_name='Facenet')[0]["embedding"]
         encoding = np.asarray(embedding, dtype=np.float32).tobytes()
 
-        FacialData.objects.update_or_create(user=request.user, defaults={'encoding': encoding})
+        FacialData.objects.update_or_create(user_id=request.user.id, defaults={'encoding': encoding})
         return Response({"status": "Face data uploaded successfully"})
     except Exception as e:
         return Response({"error": str(e)}, status=500)
@@ -63,7 +63,7 @@ def verify_face(request):
                 if user.role not in ['admin', 'staff']:
                     return Response({"verified": False, "error": "Unauthorized role"}, status=403)
 
-                refresh = RefreshToken.for_user(user)
+                refresh = MyTokenObtainPairSerializer.get_token(user)
                 return Response({
                     "verified": True,
                     "token": str(refresh.access_token),
@@ -80,7 +80,7 @@ def verify_face(request):
 @permission_classes([IsAuthenticated])
 def delete_face(request):
     try:
-        FacialData.objects.get(user=request.user).delete()
+        FacialData.objects.get(user_id=request.user.id).delete()
         return Response({"status": "Face data deleted"})
     except FacialData.DoesNotExist:
         return Response({"status": "No face data to delete"})
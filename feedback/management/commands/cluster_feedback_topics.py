@@ -0,0 +1,31 @@
+# backend/feedback/management/commands/cluster_feedback_topics.py
+
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from feedback import topics
+
+
+class Command(BaseCommand):
+    help = 'Embeds new feedback comments and assigns them to topic clusters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threshold', type=float, default=settings.FEEDBACK_TOPIC_THRESHOLD, help='Cosine similarity needed to join an existing topic.')
+        parser.add_argument('--batch-size', type=int, default=topics.EMBED_BATCH_SIZE, help='Comments embedded per model call.')
+        parser.add_argument('--recluster', action='store_true', help='Rebuild all topics from the stored embeddings.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        embedded = topics.embed_new(batch_size=options['batch_size'])
+        embed_seconds = time.perf_counter() - started
+        self.stdout.write(f"Embedded {embedded} new comments in {embed_seconds:.2f}s.")
+
+        started = time.perf_counter()
+        if options['recluster']:
+            assigned, new_topics = topics.recluster(options['threshold'])
+        else:
+            assigned, new_topics = topics.assign_topics(options['threshold'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Assigned {assigned} comments ({new_topics} new topics) in {time.perf_counter() - started:.2f}s."
+        ))
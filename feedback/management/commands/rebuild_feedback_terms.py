@@ -0,0 +1,13 @@
+# backend/feedback/management/commands/rebuild_feedback_terms.py
+
+from django.core.management.base import BaseCommand
+
+from feedback import terms
+
+
+class Command(BaseCommand):
+    help = 'Recounts the keyword and phrase frequency table from all feedback comments.'
+
+    def handle(self, *args, **options):
+        processed = terms.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt feedback terms from {processed} comments.'))
@@ -0,0 +1,13 @@
+# backend/feedback/management/commands/rebuild_sentiment_rollups.py
+
+from django.core.management.base import BaseCommand
+
+from feedback import rollups
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the daily feedback sentiment rollups from all scored feedback.'
+
+    def handle(self, *args, **options):
+        days = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt sentiment rollups for {days} days.'))
@@ -0,0 +1,22 @@
+# backend/feedback/management/commands/rescore_feedback_sentiment.py
+
+import time
+from django.core.management.base import BaseCommand
+
+from feedback.scoring import score_feedback, BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Re-scores the sentiment of all feedback, e.g. after changing the thresholds in feedback.utils.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Comments scored and saved per batch.')
+        parser.add_argument('--workers', type=int, default=None, help='Scoring processes (default: CPU count).')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        scored = score_feedback(rescore=True, batch_size=options['batch_size'], workers=options['workers'])
+        elapsed = max(time.perf_counter() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f"Re-scored {scored} feedback comments in {elapsed:.2f}s ({scored / elapsed:.0f}/sec)."
+        ))
@@ -0,0 +1,35 @@
+# backend/feedback/management/commands/score_feedback_sentiment.py
+
+import time
+from django.core.management.base import BaseCommand
+
+from feedback.scoring import score_feedback, scoring_pool, BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Scores the sentiment of feedback still marked as pending.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Comments scored and saved per batch.')
+        parser.add_argument('--workers', type=int, default=None, help='Scoring processes (default: CPU count).')
+        parser.add_argument('--loop', action='store_true', help='Keep running, polling for new feedback.')
+        parser.add_argument('--interval', type=float, default=10.0, help='Seconds between polls with --loop.')
+
+    def handle(self, *args, **options):
+        # One pool for the whole run, so TextBlob is loaded once rather than on every poll.
+        pool = scoring_pool(options['workers'])
+        try:
+            while True:
+                started = time.perf_counter()
+                scored = score_feedback(batch_size=options['batch_size'], workers=options['workers'], pool=pool)
+                if scored or not options['loop']:
+                    elapsed = max(time.perf_counter() - started, 1e-6)
+                    self.stdout.write(self.style.SUCCESS(
+                        f"Scored {scored} feedback comments in {elapsed:.2f}s ({scored / elapsed:.0f}/sec)."
+                    ))
+                if not options['loop']:
+                    return
+                time.sleep(options['interval'])
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
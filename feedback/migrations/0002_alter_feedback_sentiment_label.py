@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='feedback',
+            name='sentiment_label',
+            field=models.CharField(blank=True, db_index=True, max_length=10, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0004_feedbacktopic_feedbackembedding'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('term', models.CharField(max_length=100)),
+                ('kind', models.CharField(choices=[('word', 'Word'), ('phrase', 'Phrase')], max_length=10)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'date'], name='feedback_fe_kind_50d435_idx')],
+                'unique_together': {('date', 'term')},
+            },
+        ),
+    ]
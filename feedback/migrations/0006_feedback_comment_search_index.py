@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:31
+
+from django.db import migrations
+
+INDEX_NAME = 'feedback_comment_search_idx'
+
+
+def create_search_index(apps, schema_editor):
+    # GIN / tsvector indexes only exist on PostgreSQL; other backends use the substring fallback.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    index = GinIndex(SearchVector('comment', config='english'), name=INDEX_NAME)
+    schema_editor.add_index(apps.get_model('feedback', 'Feedback'), index)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS "{INDEX_NAME}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0005_feedbackterm'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -8,7 +8,8 @@ class Feedback(models.Model):
     
     comment = models.TextField(max_length=250) 
     
-    sentiment_label = models.CharField(max_length=10, blank=True, null=True) 
+    # "pending" until the background scorer has run (see feedback.scoring).
+    sentiment_label = models.CharField(max_length=10, blank=True, null=True, db_index=True)
     sentiment_score = models.FloatField(blank=True, null=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
@@ -17,4 +18,67 @@ class Feedback(models.Model):
         return f"Feedback from {self.user.email} on {self.created_at.strftime('%Y-%m-%d')}"
 
     class Meta:
-        ordering = ['-created_at'] 
\ No newline at end of file
+        ordering = ['-created_at'] 
+
+class FeedbackDailySentiment(models.Model):
+    # Per-day rollup of scored feedback (local date of submission), kept in step by
+    # feedback.rollups as the scorer writes labels. Pending feedback is not counted.
+    date = models.DateField(unique=True)
+    positive_count = models.PositiveIntegerField(default=0)
+    negative_count = models.PositiveIntegerField(default=0)
+    neutral_count = models.PositiveIntegerField(default=0)
+    score_sum = models.FloatField(default=0.0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"Sentiment for {self.date}: +{self.positive_count} / -{self.negative_count} / ={self.neutral_count}"
+
+
+class FeedbackTopic(models.Model):
+    # Running mean of the unit-normalized embeddings assigned to the topic (float32 bytes).
+    centroid = models.BinaryField()
+    size = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-size']
+
+    def __str__(self):
+        return f"Topic {self.id} ({self.size} comments)"
+
+
+class FeedbackEmbedding(models.Model):
+    # Sentence embedding of a comment, stored once so topics can be rebuilt without re-embedding.
+    feedback = models.OneToOneField(Feedback, on_delete=models.CASCADE, primary_key=True, related_name='embedding')
+    vector = models.BinaryField()
+    model_name = models.CharField(max_length=100)
+    topic = models.ForeignKey(FeedbackTopic, on_delete=models.SET_NULL, null=True, blank=True, related_name='embeddings')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Embedding for feedback {self.feedback_id}"
+
+
+class FeedbackTerm(models.Model):
+    # Keyword (single word) and phrase (two-word) frequencies per local day, counted when
+    # feedback is submitted so "top terms" never has to scan comments.
+    KIND_CHOICES = [
+        ('word', 'Word'),
+        ('phrase', 'Phrase'),
+    ]
+
+    date = models.DateField()
+    term = models.CharField(max_length=100)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('date', 'term')
+        indexes = [models.Index(fields=['kind', 'date'])]
+
+    def __str__(self):
+        return f"{self.term} on {self.date}: {self.count}"
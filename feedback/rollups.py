@@ -0,0 +1,131 @@
+# backend/feedback/rollups.py
+"""
+Daily sentiment rollups and the trend built from them.
+
+`apply_changes` moves each re-labelled comment from its old label's counters to its new one,
+so scoring and re-scoring keep FeedbackDailySentiment current without rescanning Feedback.
+`rebuild` recomputes everything from scratch. Trends fold the daily rows into buckets of N
+days, weeks or months.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.timezone import localtime
+
+from .models import Feedback, FeedbackDailySentiment
+
+LABELS = ('positive', 'negative', 'neutral')
+BUCKET_UNITS = ('day', 'week', 'month')
+
+
+def _day(created_at):
+    return localtime(created_at).date()
+
+
+def apply_changes(changes):
+    """
+    `changes` is an iterable of (created_at, old_label, old_score, new_label, new_score) for
+    feedback whose sentiment was just written. Labels outside LABELS (e.g. pending) are ignored.
+    """
+    deltas = defaultdict(lambda: defaultdict(float))
+    for created_at, old_label, old_score, new_label, new_score in changes:
+        delta = deltas[_day(created_at)]
+        if old_label in LABELS:
+            delta[f'{old_label}_count'] -= 1
+            delta['score_sum'] -= old_score or 0.0
+        if new_label in LABELS:
+            delta[f'{new_label}_count'] += 1
+            delta['score_sum'] += new_score or 0.0
+
+    with transaction.atomic():
+        FeedbackDailySentiment.objects.bulk_create(
+            [FeedbackDailySentiment(date=day) for day in deltas], ignore_conflicts=True
+        )
+        for day, delta in deltas.items():
+            updates = {
+                field: F(field) + (int(value) if field.endswith('_count') else value)
+                for field, value in delta.items() if value
+            }
+            if updates:
+                FeedbackDailySentiment.objects.filter(date=day).update(updated_at=timezone.now(), **updates)
+
+
+@transaction.atomic
+def rebuild():
+    """Recomputes every daily rollup from the Feedback table. Returns the number of days."""
+    scored = Q(sentiment_label__in=LABELS)
+    rows = (
+        Feedback.objects.filter(scored)
+        .annotate(day=TruncDate('created_at', tzinfo=timezone.get_current_timezone()))
+        .order_by()
+        .values('day')
+        .annotate(
+            positive_count=Count('id', filter=Q(sentiment_label='positive')),
+            negative_count=Count('id', filter=Q(sentiment_label='negative')),
+            neutral_count=Count('id', filter=Q(sentiment_label='neutral')),
+            score_sum=Sum('sentiment_score'),
+        )
+    )
+    FeedbackDailySentiment.objects.all().delete()
+    FeedbackDailySentiment.objects.bulk_create([
+        FeedbackDailySentiment(
+            date=row['day'],
+            positive_count=row['positive_count'],
+            negative_count=row['negative_count'],
+            neutral_count=row['neutral_count'],
+            score_sum=row['score_sum'] or 0.0,
+        )
+        for row in rows
+    ], batch_size=1000)
+    return FeedbackDailySentiment.objects.count()
+
+
+def _month_index(d):
+    return d.year * 12 + d.month - 1
+
+
+def _bucket_start(day, origin, count, unit):
+    if unit == 'month':
+        i = (_month_index(day) - _month_index(origin)) // count * count + _month_index(origin)
+        return day.replace(year=i // 12, month=i % 12 + 1, day=1)
+    step = count * (7 if unit == 'week' else 1)
+    return origin + timedelta(days=(day - origin).days // step * step)
+
+
+def get_trend(start_date, end_date, count=1, unit='day'):
+    """Per-bucket label counts, total and mean score between start_date and end_date inclusive."""
+    if unit not in BUCKET_UNITS:
+        raise ValueError(f"Bucket unit must be one of: {', '.join(BUCKET_UNITS)}.")
+    if unit == 'week':
+        origin = start_date - timedelta(days=start_date.weekday())
+    elif unit == 'month':
+        origin = start_date.replace(day=1)
+    else:
+        origin = start_date
+
+    points = {}
+    day = start_date
+    while day <= end_date:
+        bucket = _bucket_start(day, origin, count, unit)
+        points.setdefault(bucket, {'bucket_start': bucket, 'positive': 0, 'negative': 0, 'neutral': 0, 'score_sum': 0.0})
+        day += timedelta(days=1)
+
+    for row in FeedbackDailySentiment.objects.filter(date__gte=start_date, date__lte=end_date):
+        point = points[_bucket_start(row.date, origin, count, unit)]
+        point['positive'] += row.positive_count
+        point['negative'] += row.negative_count
+        point['neutral'] += row.neutral_count
+        point['score_sum'] += row.score_sum
+
+    result = []
+    for point in points.values():
+        total = point['positive'] + point['negative'] + point['neutral']
+        score_sum = point.pop('score_sum')
+        point['total'] = total
+        point['mean_score'] = round(score_sum / total, 4) if total else None
+        result.append(point)
+    return result
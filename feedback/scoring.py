@@ -0,0 +1,90 @@
+# backend/feedback/scoring.py
+"""
+Background sentiment scoring.
+
+Submissions are stored with the "pending" label. `score_feedback` walks the rows to score in
+primary-key order, `batch_size` at a time, sends each batch to a process pool whose workers
+load TextBlob once at start-up, and writes the results back with one `bulk_update` per batch,
+updating the daily sentiment rollups in the same transaction. A polling scorer keeps one pool
+for its whole run.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import transaction
+
+from . import rollups
+from .models import Feedback
+from .utils import PENDING_LABEL, score_comments, warm_up
+
+BATCH_SIZE = 500
+
+
+def _batches(queryset, batch_size):
+    """Keyset-paginates (id, comment) rows so updates made meanwhile don't shift the pages."""
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id).order_by('id').values_list('id', 'comment')[:batch_size])
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def _save(results):
+    new = {pk: (label, score) for pk, label, score in results}
+    with transaction.atomic():
+        # Lock the rows while reading their previous labels so concurrent scorers can't both
+        # count the same comment in the rollups.
+        old = Feedback.objects.select_for_update().filter(id__in=new).values_list('id', 'sentiment_label', 'sentiment_score', 'created_at')
+        changes = [(created_at, label, score, *new[pk]) for pk, label, score, created_at in old]
+        Feedback.objects.bulk_update(
+            [Feedback(id=pk, sentiment_label=label, sentiment_score=score) for pk, (label, score) in new.items()],
+            ['sentiment_label', 'sentiment_score'],
+        )
+        rollups.apply_changes(changes)
+    return len(new)
+
+
+def scoring_pool(workers=None):
+    """
+    Starts the process pool `score_feedback` sends batches to, or returns None (after loading
+    TextBlob here) if one worker means scoring in this process. The caller shuts the pool down.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        warm_up()
+        return None
+    return ProcessPoolExecutor(max_workers=workers, initializer=warm_up)
+
+
+def score_feedback(rescore=False, batch_size=BATCH_SIZE, workers=None, pool=None):
+    """
+    Scores pending feedback, or every row with `rescore`. Returns the number of rows written.
+
+    Batches are scored in `pool` (from `scoring_pool(workers)`), which a polling caller keeps
+    open across calls; without one a pool is started for this call alone. Up to two batches per
+    worker are in flight. With one worker the batches are scored in this process.
+    """
+    workers = workers or os.cpu_count() or 1
+    if pool is None and workers > 1:
+        with scoring_pool(workers) as pool:
+            return score_feedback(rescore, batch_size, workers, pool)
+
+    queryset = Feedback.objects.all() if rescore else Feedback.objects.filter(sentiment_label=PENDING_LABEL)
+    scored = 0
+
+    if pool is None:
+        warm_up()
+        for rows in _batches(queryset, batch_size):
+            scored += _save(score_comments(rows))
+        return scored
+
+    pending = []
+    for rows in _batches(queryset, batch_size):
+        pending.append(pool.submit(score_comments, rows))
+        if len(pending) >= workers * 2:
+            scored += _save(pending.pop(0).result())
+    for future in pending:
+        scored += _save(future.result())
+    return scored
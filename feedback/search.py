@@ -0,0 +1,33 @@
+# backend/feedback/search.py
+"""
+Comment search. On PostgreSQL this is ranked full-text search over an English `tsvector`,
+served by the GIN expression index created in migration 0006; other databases (local SQLite)
+fall back to requiring every word as a case-insensitive substring.
+"""
+from django.db import connection
+
+SEARCH_CONFIG = 'english'
+
+
+def comment_search_vector():
+    # Must stay identical to the indexed expression, or PostgreSQL won't use the index.
+    from django.contrib.postgres.search import SearchVector
+    return SearchVector('comment', config=SEARCH_CONFIG)
+
+
+def search_feedback(queryset, query):
+    """Filters `queryset` to comments matching `query`, best matches first."""
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+        vector = comment_search_vector()
+        return (
+            queryset.alias(document=vector)
+            .filter(document=search_query)
+            .annotate(rank=SearchRank(vector, search_query))
+            .order_by('-rank', '-created_at')
+        )
+
+    for word in query.split():
+        queryset = queryset.filter(comment__icontains=word)
+    return queryset.order_by('-created_at')
@@ -0,0 +1,97 @@
+# backend/feedback/terms.py
+"""
+Keyword and phrase frequencies for feedback.
+
+Each comment is lower-cased and tokenized; words that aren't stopwords count as keywords and
+adjacent pairs of them ("cold rice", "slow service") as phrases. Counts are added to the
+FeedbackTerm row for the comment's local submission date when the feedback is saved.
+"""
+import re
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils.timezone import localtime
+
+from .models import Feedback, FeedbackTerm
+
+TOKEN_RE = re.compile(r"[a-z][a-z']*")
+MAX_TERM_LENGTH = 100
+STOPWORDS = frozenset("""
+a about after again all also am an and any are as at be been before being but by can could
+did do does doing don't for from get got had has have having he her here hers him his how i
+i'm if in into is it it's its just me more most my no nor not of off on once only or other our
+out over own same she should so some such than that the their them then there these they this
+those through to too under until up very was we were what when where which while who why will
+with would you your yours
+""".split())
+
+
+def extract_terms(text):
+    """Returns a Counter of {(term, kind): occurrences} for one comment."""
+    words = TOKEN_RE.findall(text.lower())
+    terms = Counter()
+    previous = None
+    for word in words:
+        if word in STOPWORDS or len(word) < 2:
+            previous = None
+            continue
+        terms[(word, 'word')] += 1
+        if previous:
+            terms[(f"{previous} {word}", 'phrase')] += 1
+        previous = word
+    return terms
+
+
+@transaction.atomic
+def add_counts(day, terms):
+    terms = {key: n for key, n in terms.items() if len(key[0]) <= MAX_TERM_LENGTH}
+    if not terms:
+        return
+    FeedbackTerm.objects.bulk_create(
+        [FeedbackTerm(date=day, term=term, kind=kind, count=0) for term, kind in terms], ignore_conflicts=True
+    )
+    # One UPDATE per distinct increment; nearly always just "+1".
+    by_increment = defaultdict(list)
+    for (term, _), n in terms.items():
+        by_increment[n].append(term)
+    for n, names in by_increment.items():
+        FeedbackTerm.objects.filter(date=day, term__in=names).update(count=F('count') + n)
+
+
+def record_feedback(feedback):
+    add_counts(localtime(feedback.created_at).date(), extract_terms(feedback.comment))
+
+
+@transaction.atomic
+def rebuild(batch_size=2000):
+    """Recounts every term from all feedback. Returns the number of comments processed."""
+    FeedbackTerm.objects.all().delete()
+    counts = defaultdict(Counter)
+    processed = 0
+    for comment, created_at in Feedback.objects.order_by().values_list('comment', 'created_at').iterator(chunk_size=batch_size):
+        counts[localtime(created_at).date()].update(extract_terms(comment))
+        processed += 1
+    FeedbackTerm.objects.bulk_create([
+        FeedbackTerm(date=day, term=term, kind=kind, count=n)
+        for day, terms in counts.items()
+        for (term, kind), n in terms.items() if len(term) <= MAX_TERM_LENGTH
+    ], batch_size=batch_size)
+    return processed
+
+
+def top_terms(start_date, end_date, kind=None, limit=20):
+    rows = FeedbackTerm.objects.filter(date__gte=start_date, date__lte=end_date)
+    if kind:
+        rows = rows.filter(kind=kind)
+    return list(
+        rows.values('term', 'kind')
+        .annotate(count=Sum('count'))
+        .order_by('-count', 'term')[:limit]
+    )
+
+
+def default_period(today):
+    """The current week so far (Monday through today)."""
+    return today - timedelta(days=today.weekday()), today
@@ -1,3 +1,91 @@
+import math
+
+import numpy as np
 from django.test import TestCase
 
-# Create your tests here.
+from analytics.rag.embeddings import EMBEDDING_MODEL_NAME
+from users.models import User
+from . import topics
+from .models import Feedback, FeedbackEmbedding, FeedbackTopic
+
+
+def direction(degrees):
+    """A unit vector at `degrees` from the first axis, in the plane of the first two."""
+    radians = math.radians(degrees)
+    return [math.cos(radians), math.sin(radians), 0.0]
+
+
+class TopicAssignmentTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ana@example.com', 'pass12345', first_name='Ana', last_name='Cruz')
+
+    def embed(self, *degrees, model_name=EMBEDDING_MODEL_NAME):
+        embeddings = []
+        for angle in degrees:
+            feedback = Feedback.objects.create(user=self.user, comment=f"At {angle} degrees")
+            embeddings.append(FeedbackEmbedding.objects.create(
+                feedback=feedback, vector=topics._to_bytes(direction(angle)), model_name=model_name,
+            ))
+        return embeddings
+
+    def members(self):
+        """Each topic's feedback ids and stored size."""
+        return sorted(
+            (sorted(topic.embeddings.values_list('feedback_id', flat=True)), topic.size)
+            for topic in FeedbackTopic.objects.all()
+        )
+
+    def centroid(self, embedding):
+        embedding.refresh_from_db()
+        return topics._from_bytes(embedding.topic.centroid)
+
+    def test_threshold_decides_join_or_new_topic(self):
+        a, b, c = self.embed(0, 30, 90)
+        # cos 30° = 0.866 joins at 0.8; cos 90° = 0 starts a topic of its own.
+        self.assertEqual(topics.assign_topics(threshold=0.8), (3, 2))
+        self.assertEqual(self.members(), [([a.pk, b.pk], 2), ([c.pk], 1)])
+
+    def test_threshold_above_similarity_splits(self):
+        self.embed(0, 30)
+        self.assertEqual(topics.assign_topics(threshold=0.87), (2, 2))
+
+    def test_centroid_is_the_running_mean(self):
+        a, b = self.embed(0, 40)
+        topics.assign_topics(threshold=0.7)
+        np.testing.assert_allclose(self.centroid(a), np.mean([direction(0), direction(40)], axis=0), atol=1e-6)
+
+        # 60° is only cos 60° = 0.5 from the first comment but cos 40° = 0.77 from the mean at 20°.
+        [c] = self.embed(60)
+        self.assertEqual(topics.assign_topics(threshold=0.7), (1, 0))
+        self.assertEqual(self.members(), [([a.pk, b.pk, c.pk], 3)])
+        np.testing.assert_allclose(
+            self.centroid(c), np.mean([direction(0), direction(40), direction(60)], axis=0), atol=1e-6,
+        )
+
+    def test_batches_give_the_same_topics(self):
+        self.embed(0, 20, 85, 40, 100, 180, 60)
+        topics.assign_topics(threshold=0.75)
+        expected = self.members()
+        FeedbackEmbedding.objects.update(topic=None)
+        FeedbackTopic.objects.all().delete()
+
+        topics.assign_topics(threshold=0.75, batch_size=2)
+        self.assertEqual(self.members(), expected)
+
+    def test_only_unassigned_current_model_embeddings_are_assigned(self):
+        [a] = self.embed(0)
+        topics.assign_topics(threshold=0.8)
+        [other_model] = self.embed(5, model_name='another-model')
+        [b] = self.embed(10)
+
+        self.assertEqual(topics.assign_topics(threshold=0.8), (1, 0))
+        self.assertEqual(self.members(), [([a.pk, b.pk], 2)])
+        other_model.refresh_from_db()
+        self.assertIsNone(other_model.topic_id)
+
+    def test_recluster_replays_with_a_new_threshold(self):
+        self.embed(0, 30, 60)
+        topics.assign_topics(threshold=0.8)
+        self.assertEqual(FeedbackTopic.objects.count(), 2)
+        self.assertEqual(topics.recluster(threshold=0.4), (3, 1))
+        self.assertEqual([size for _, size in self.members()], [3])
@@ -0,0 +1,221 @@
+# backend/feedback/topics.py
+"""
+Topic clustering of feedback comments.
+
+Each comment is embedded once with the same sentence-transformers model as the recommendation
+knowledge base and stored in FeedbackEmbedding. Comments are then assigned to topics online, in
+submission order: a comment joins the topic whose centroid is most similar if the cosine
+similarity reaches the threshold, otherwise it starts a new topic, and the joined topic's
+centroid is updated as a running mean. Re-clustering (e.g. with a new threshold) replays the
+stored embeddings and never re-embeds.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Q
+from django.utils import timezone
+
+from analytics.rag.embeddings import LazyEmbeddings, EMBEDDING_MODEL_NAME
+from .models import Feedback, FeedbackEmbedding, FeedbackTopic
+
+EMBED_BATCH_SIZE = 256
+ASSIGN_BATCH_SIZE = 1000
+# Members scanned when picking a topic's representative comments.
+REPRESENTATIVE_SCAN_LIMIT = 500
+# Key of the PostgreSQL advisory lock held while topics are assigned.
+TOPIC_LOCK_KEY = 4_040_001
+
+_embeddings = None
+
+
+def _get_embeddings():
+    global _embeddings
+    if _embeddings is None:
+        _embeddings = LazyEmbeddings(EMBEDDING_MODEL_NAME)
+    return _embeddings
+
+
+def _to_bytes(vector):
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def _from_bytes(data):
+    return np.frombuffer(bytes(data), dtype=np.float32)
+
+
+def _unit(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def embed_new(batch_size=EMBED_BATCH_SIZE, embeddings=None):
+    """Embeds feedback that has no stored embedding yet, `batch_size` comments per model call."""
+    embeddings = embeddings or _get_embeddings()
+    pending = Feedback.objects.filter(embedding__isnull=True)
+    embedded = 0
+    last_id = 0
+    while True:
+        rows = list(pending.filter(id__gt=last_id).order_by('id').values_list('id', 'comment')[:batch_size])
+        if not rows:
+            return embedded
+        vectors = _unit(embeddings.embed_documents([comment for _, comment in rows]))
+        FeedbackEmbedding.objects.bulk_create([
+            FeedbackEmbedding(feedback_id=pk, vector=_to_bytes(vector), model_name=embeddings.model_name)
+            for (pk, _), vector in zip(rows, vectors)
+        ], ignore_conflicts=True)
+        embedded += len(rows)
+        last_id = rows[-1][0]
+
+
+def _lock_topics():
+    """
+    Serializes topic assignment until the transaction ends, so concurrent runs (the command and a
+    recommendation job) neither overwrite each other's centroids nor start duplicate topics.
+    Without advisory locks only the existing topic rows can be locked.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [TOPIC_LOCK_KEY])
+    else:
+        list(FeedbackTopic.objects.select_for_update().values_list('id', flat=True))
+
+
+def assign_topics(threshold=None, batch_size=ASSIGN_BATCH_SIZE):
+    """Assigns every unassigned embedding to a topic. Returns (assigned, new_topics)."""
+    threshold = settings.FEEDBACK_TOPIC_THRESHOLD if threshold is None else threshold
+    assigned = new_topics = 0
+
+    unassigned = FeedbackEmbedding.objects.filter(topic__isnull=True, model_name=EMBEDDING_MODEL_NAME)
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            # Topics are reloaded under the lock each batch, so another run's changes are kept.
+            _lock_topics()
+            topics = list(FeedbackTopic.objects.order_by('id'))
+            rows = list(
+                unassigned.filter(feedback_id__gt=last_id).order_by('feedback_id')
+                .values_list('feedback_id', 'vector')[:batch_size]
+            )
+            if not rows:
+                return assigned, new_topics
+            means = [_from_bytes(t.centroid).copy() for t in topics]
+            directions = _unit(np.stack(means)) if means else None
+
+            assignments = []
+            changed = set()
+            for feedback_id, data in rows:
+                vector = _from_bytes(data)
+                best = -1
+                if directions is not None:
+                    similarities = directions @ vector
+                    best = int(np.argmax(similarities))
+                    if similarities[best] < threshold:
+                        best = -1
+
+                if best < 0:
+                    topic = FeedbackTopic.objects.create(centroid=_to_bytes(vector), size=1)
+                    topics.append(topic)
+                    means.append(vector.copy())
+                    row = _unit(vector)[None, :]
+                    directions = row if directions is None else np.vstack([directions, row])
+                    new_topics += 1
+                    best = len(topics) - 1
+                else:
+                    topic = topics[best]
+                    means[best] += (vector - means[best]) / (topic.size + 1)
+                    topic.size += 1
+                    directions[best] = _unit(means[best])
+                    changed.add(best)
+                assignments.append(FeedbackEmbedding(feedback_id=feedback_id, topic_id=topics[best].id))
+
+            for i in changed:
+                topics[i].centroid = _to_bytes(means[i])
+                topics[i].updated_at = timezone.now()
+            FeedbackTopic.objects.bulk_update([topics[i] for i in changed], ['centroid', 'size', 'updated_at'])
+            FeedbackEmbedding.objects.bulk_update(assignments, ['topic'])
+
+        assigned += len(rows)
+        last_id = rows[-1][0]
+
+
+def update_topics(embeddings=None, threshold=None):
+    """Embeds new comments and assigns them to topics. Returns (embedded, assigned, new_topics)."""
+    embedded = embed_new(embeddings=embeddings)
+    return (embedded, *assign_topics(threshold))
+
+
+@transaction.atomic
+def recluster(threshold=None):
+    """Rebuilds all topics from the stored embeddings. Returns (assigned, new_topics)."""
+    _lock_topics()
+    FeedbackEmbedding.objects.update(topic=None)
+    FeedbackTopic.objects.all().delete()
+    return assign_topics(threshold)
+
+
+def top_topics(limit=5, start_date=None, end_date=None, representatives=3):
+    """
+    The topics with the most comments submitted between start_date and end_date (inclusive,
+    either may be omitted), with sentiment counts and the comments closest to each centroid.
+    """
+    members = FeedbackEmbedding.objects.filter(topic__isnull=False)
+    if start_date:
+        members = members.filter(feedback__created_at__date__gte=start_date)
+    if end_date:
+        members = members.filter(feedback__created_at__date__lte=end_date)
+
+    rows = list(
+        members.values('topic_id')
+        .annotate(
+            comments=Count('pk'),
+            positive=Count('pk', filter=Q(feedback__sentiment_label='positive')),
+            negative=Count('pk', filter=Q(feedback__sentiment_label='negative')),
+            neutral=Count('pk', filter=Q(feedback__sentiment_label='neutral')),
+            mean_score=Avg('feedback__sentiment_score'),
+        )
+        .order_by('-comments')[:limit]
+    )
+    topics = FeedbackTopic.objects.in_bulk([row['topic_id'] for row in rows])
+
+    result = []
+    for row in rows:
+        topic = topics[row['topic_id']]
+        direction = _unit(_from_bytes(topic.centroid))
+        candidates = list(
+            members.filter(topic_id=topic.id).order_by('-feedback__created_at')
+            .values_list('feedback__comment', 'vector')[:REPRESENTATIVE_SCAN_LIMIT]
+        )
+        candidates.sort(key=lambda c: float(direction @ _from_bytes(c[1])), reverse=True)
+        examples = []
+        for comment, _ in candidates:
+            if comment not in examples:
+                examples.append(comment)
+            if len(examples) == representatives:
+                break
+
+        result.append({
+            'topic_id': topic.id,
+            'size': topic.size,
+            'comments': row['comments'],
+            'sentiment': {
+                'positive': row['positive'],
+                'negative': row['negative'],
+                'neutral': row['neutral'],
+                'mean_score': round(row['mean_score'], 4) if row['mean_score'] is not None else None,
+            },
+            'representative_comments': examples,
+        })
+    return result
+
+
+def format_topics_text(topics):
+    lines = []
+    for i, topic in enumerate(topics, start=1):
+        sentiment = topic['sentiment']
+        lines.append(
+            f"{i}. {topic['comments']} comments (positive {sentiment['positive']}, "
+            f"negative {sentiment['negative']}, neutral {sentiment['neutral']})"
+        )
+        lines.extend(f'   - "{comment}"' for comment in topic['representative_comments'])
+    return "\n".join(lines)
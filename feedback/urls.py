@@ -1,8 +1,15 @@
 # feedback/urls.py
 from django.urls import path
-from .views import FeedbackCreateView, AdminFeedbackListView
+from .views import (
+    FeedbackCreateView, AdminFeedbackListView, AdminFeedbackSearchView, AdminTopTermsView,
+    AdminSentimentTrendView, AdminFeedbackTopicsView,
+)
 
 urlpatterns = [
     path('submit/', FeedbackCreateView.as_view(), name='feedback-submit'),
     path('admin/all/', AdminFeedbackListView.as_view(), name='admin-feedback-list'),
+    path('admin/search/', AdminFeedbackSearchView.as_view(), name='admin-feedback-search'),
+    path('admin/top-terms/', AdminTopTermsView.as_view(), name='admin-feedback-top-terms'),
+    path('admin/sentiment-trend/', AdminSentimentTrendView.as_view(), name='admin-feedback-sentiment-trend'),
+    path('admin/topics/', AdminFeedbackTopicsView.as_view(), name='admin-feedback-topics'),
 ]
\ No newline at end of file
@@ -2,15 +2,34 @@
 
 from textblob import TextBlob
 
+# Polarity above POSITIVE_THRESHOLD is positive, below NEGATIVE_THRESHOLD negative, else neutral.
+# Run `rescore_feedback_sentiment` after changing these so stored labels follow.
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+# Label stored on submission until the background scorer has analyzed the comment.
+PENDING_LABEL = "pending"
+
+
+def label_for(polarity):
+    if polarity > POSITIVE_THRESHOLD:
+        return "positive"
+    if polarity < NEGATIVE_THRESHOLD:
+        return "negative"
+    return "neutral"
+
+
 def analyze_sentiment(text):
     blob = TextBlob(text)
     polarity = blob.sentiment.polarity
-    
-    if polarity > 0.1:
-        label = "positive"
-    elif polarity < -0.1:
-        label = "negative"
-    else:
-        label = "neutral"
-        
-    return label, polarity 
\ No newline at end of file
+    return label_for(polarity), polarity
+
+
+def warm_up():
+    """Loads TextBlob's lexicon so a worker process pays for it once, not per comment."""
+    analyze_sentiment("warm up")
+
+
+def score_comments(rows):
+    """[(id, comment)] -> [(id, label, polarity)]. Runs in a scorer worker process."""
+    return [(pk, *analyze_sentiment(comment)) for pk, comment in rows]
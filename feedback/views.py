@@ -1,11 +1,20 @@
 # feedback/views.py
+from datetime import timedelta
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localtime
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
-from .models import Feedback
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .models import Feedback, FeedbackTerm
 from .serializers import FeedbackCreateSerializer, FeedbackListSerializer
 from users.permissions import IsAdminUser 
 
-from .utils import analyze_sentiment
+from .utils import PENDING_LABEL
+from . import rollups, terms, topics
+from .search import search_feedback
+from analytics.timeseries import parse_bucket
 
 from backend.pagination import StandardResultsSetPagination
 
@@ -17,19 +26,115 @@ class FeedbackCreateView(generics.CreateAPIView):
     permission_classes = [IsAuthenticated] 
 
     def perform_create(self, serializer):
-        comment_text = serializer.validated_data.get('comment', '')
-
-        sentiment_label, sentiment_score = analyze_sentiment(comment_text)
-
-        serializer.save(
-            user=self.request.user,
-            sentiment_label=sentiment_label,
-            sentiment_score=sentiment_score
-        )
+        # Scored later in batches by `score_feedback_sentiment`, off the request path.
+        feedback = serializer.save(user_id=self.request.user.id, sentiment_label=PENDING_LABEL)
+        terms.record_feedback(feedback)
 
 class AdminFeedbackListView(generics.ListAPIView):
-    queryset = Feedback.objects.all()
+    queryset = Feedback.objects.select_related('user')
     serializer_class = FeedbackListSerializer
     permission_classes = [IsAuthenticated, IsAdminUser] 
 
     pagination_class = StandardResultsSetPagination
+
+
+class AdminFeedbackSearchView(generics.ListAPIView):
+    serializer_class = FeedbackListSerializer
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    pagination_class = StandardResultsSetPagination
+
+    def get_queryset(self):
+        query = self.request.query_params.get('q', '').strip()
+        queryset = Feedback.objects.select_related('user')
+        if not query:
+            return queryset.none()
+        return search_feedback(queryset, query)
+
+
+class AdminTopTermsView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        default_start, default_end = terms.default_period(localtime(timezone.now()).date())
+        start_date_str = request.query_params.get('start_date')
+        end_date_str = request.query_params.get('end_date')
+        start_date = parse_date(start_date_str) if start_date_str else default_start
+        end_date = parse_date(end_date_str) if end_date_str else default_end
+
+        if not start_date or not end_date:
+            return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=400)
+        if start_date > end_date:
+            return Response({"error": "start_date must be on or before end_date."}, status=400)
+
+        kind = request.query_params.get('kind')
+        if kind and kind not in dict(FeedbackTerm.KIND_CHOICES):
+            return Response({"error": "Invalid kind. Use 'word' or 'phrase'."}, status=400)
+
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 20)), 100))
+        except ValueError:
+            return Response({"error": "limit must be an integer."}, status=400)
+
+        return Response({
+            'start_date': start_date,
+            'end_date': end_date,
+            'terms': terms.top_terms(start_date, end_date, kind, limit),
+        })
+
+
+class AdminSentimentTrendView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    MAX_DAYS = 366 * 3
+
+    def get(self, request):
+        today = localtime(timezone.now()).date()
+        end_date_str = request.query_params.get('end_date')
+        start_date_str = request.query_params.get('start_date')
+
+        end_date = parse_date(end_date_str) if end_date_str else today
+        start_date = parse_date(start_date_str) if start_date_str else end_date - timedelta(days=29)
+
+        if not start_date or not end_date:
+            return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=400)
+        if start_date > end_date:
+            return Response({"error": "start_date must be on or before end_date."}, status=400)
+        if (end_date - start_date).days > self.MAX_DAYS:
+            return Response({"error": f"Date range cannot exceed {self.MAX_DAYS} days."}, status=400)
+
+        try:
+            count, unit = parse_bucket(request.query_params.get('bucket', 'day'))
+            points = rollups.get_trend(start_date, end_date, count, unit)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        return Response({
+            'start_date': start_date,
+            'end_date': end_date,
+            'bucket': f"{count}{unit}",
+            'points': points,
+        })
+
+
+class AdminFeedbackTopicsView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request):
+        start_date_str = request.query_params.get('start_date')
+        end_date_str = request.query_params.get('end_date')
+        start_date = parse_date(start_date_str) if start_date_str else None
+        end_date = parse_date(end_date_str) if end_date_str else None
+
+        if (start_date_str and not start_date) or (end_date_str and not end_date):
+            return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=400)
+
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 10)), 50))
+        except ValueError:
+            return Response({"error": "limit must be an integer."}, status=400)
+
+        return Response({
+            'start_date': start_date,
+            'end_date': end_date,
+            'topics': topics.top_topics(limit, start_date, end_date),
+        })
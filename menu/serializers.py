@@ -31,4 +31,28 @@ class MenuItemSerializer(serializers.ModelSerializer):
             'variations', 
             'is_fully_out_of_stock' 
         ]
-        
\ No newline at end of file
+
+
+class AdminVariationSerializer(VariationSerializer):
+    predicted_units = serializers.SerializerMethodField()
+    hourly_forecast = serializers.SerializerMethodField()
+
+    class Meta(VariationSerializer.Meta):
+        fields = VariationSerializer.Meta.fields + ['predicted_units', 'hourly_forecast']
+
+    def get_predicted_units(self, obj):
+        forecast = getattr(obj, 'day_forecast', None)
+        if not forecast:
+            return None
+        return round(sum(f.predicted_units for f in forecast), 1)
+
+    def get_hourly_forecast(self, obj):
+        forecast = getattr(obj, 'day_forecast', None) or []
+        return [{'hour': f.hour, 'units': f.predicted_units} for f in forecast]
+
+
+class AdminMenuItemSerializer(MenuItemSerializer):
+    variations = AdminVariationSerializer(many=True, read_only=True)
+
+    class Meta(MenuItemSerializer.Meta):
+        pass
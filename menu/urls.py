@@ -3,6 +3,7 @@ from django.urls import path
 from .views import (
     MenuItemListView, 
     CategoryListView,   
+    VariationPairingsView,
     AdminMenuItemListView, 
     AdminMenuItemDetailView,
     AdminVariationDetailView, 
@@ -13,6 +14,7 @@ from .views import (
 urlpatterns = [
     path('items/', MenuItemListView.as_view(), name='menuitem-list'),
     path('categories/', CategoryListView.as_view(), name='category-list'),
+    path('variations/<int:id>/pairings/', VariationPairingsView.as_view(), name='variation-pairings'),
 
     path('admin/items/', AdminMenuItemListView.as_view(), name='admin-menuitem-list-create'),
     path('admin/items/<int:id>/', AdminMenuItemDetailView.as_view(), name='admin-menuitem-detail'),
@@ -1,15 +1,21 @@
 # backend/menu/views.py
 from rest_framework import generics, status, serializers
 from .models import MenuItems, Categories, Variations
-from .serializers import MenuItemSerializer, CategorySerializer, VariationSerializer 
+from .serializers import MenuItemSerializer, AdminMenuItemSerializer, CategorySerializer, VariationSerializer 
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from users.permissions import IsStaffUser 
+from users import dashboard
 from django.db import transaction
 import json 
 from backend.pagination import StandardResultsSetPagination
-from django.db.models import Q, Exists, OuterRef
+from django.db.models import Q, Exists, OuterRef, Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localtime
 from orders.models import OrderItems 
+from analytics.basket import basket_index, MAX_PAIRINGS
+from analytics.models import DemandForecast
 
 class MenuItemListView(generics.ListAPIView):
     queryset = MenuItems.objects.filter(is_available=True).prefetch_related('variations')
@@ -20,17 +26,67 @@ class MenuItemListView(generics.ListAPIView):
         context['filter_available'] = True 
         return context
 
+class VariationPairingsView(generics.GenericAPIView):
+    queryset = Variations.objects.all()
+    lookup_field = 'id'
+
+    def get(self, request, *args, **kwargs):
+        variation = self.get_object()
+
+        try:
+            k = min(int(request.query_params.get('k', 5)), MAX_PAIRINGS)
+        except ValueError:
+            return Response({'error': 'k must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        if k < 1:
+            return Response({'error': 'k must be at least 1.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        pairings = basket_index.pairings(variation.id, k=k * 2)
+        available = Variations.objects.filter(
+            id__in=[p['variation_id'] for p in pairings],
+            is_available=True,
+            menu_item__is_available=True,
+            stock_level__gt=0,
+        ).select_related('menu_item').in_bulk()
+
+        results = []
+        for pairing in pairings:
+            other = available.get(pairing['variation_id'])
+            if other is None:
+                continue
+            results.append({
+                **pairing,
+                'menu_item_id': other.menu_item_id,
+                'menu_item_name': other.menu_item.name,
+                'size_name': other.size_name,
+                'price': other.price,
+            })
+
+        return Response({'variation_id': variation.id, 'pairings': results[:k]})
+
 class CategoryListView(generics.ListAPIView):
     queryset = Categories.objects.all().order_by('name') 
     serializer_class = CategorySerializer
 
 class AdminMenuItemListView(generics.ListCreateAPIView):
-    serializer_class = MenuItemSerializer
+    serializer_class = AdminMenuItemSerializer
     permission_classes = [IsAuthenticated, IsStaffUser]
     pagination_class = StandardResultsSetPagination
 
     def get_queryset(self):
-        queryset = MenuItems.objects.select_related('category').prefetch_related('variations').order_by('category__name', 'name')
+        forecast_date_str = self.request.query_params.get('forecast_date')
+        forecast_date = parse_date(forecast_date_str) if forecast_date_str else None
+        forecast_date = forecast_date or localtime(timezone.now()).date()
+
+        variations = Variations.objects.prefetch_related(
+            Prefetch(
+                'demand_forecasts',
+                queryset=DemandForecast.objects.filter(forecast_date=forecast_date).order_by('hour'),
+                to_attr='day_forecast',
+            )
+        )
+        queryset = MenuItems.objects.select_related('category').prefetch_related(
+            Prefetch('variations', queryset=variations)
+        ).order_by('category__name', 'name')
         
         status_filter = self.request.query_params.get('status', 'active')
 
@@ -114,6 +170,7 @@ class AdminMenuItemDetailView(generics.RetrieveUpdateDestroyAPIView):
         menu_item.is_available = False
         menu_item.save()
         menu_item.variations.update(is_available=False)
+        dashboard.invalidate('low_stock_variations')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -0,0 +1,256 @@
+# backend/monitoring/benchmark.py
+"""
+Load test of the hot endpoints against whatever data the database holds.
+
+Each scenario sends its requests from `concurrency` worker threads, each with its own client,
+token and database connection. In-process runs go through the Django test client and count the
+SQL of every request; runs against a server (`base_url`) go over HTTP, so their query counts are
+unknown. Orders created by the run are deleted and stock levels restored afterwards; command
+runs are rolled back.
+"""
+import io
+import json
+import logging
+import threading
+from collections import Counter
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlencode
+
+import numpy as np
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import Client
+from django.urls import reverse
+from django.utils.timezone import localdate, localtime
+
+from menu.models import Variations
+from orders.models import Orders
+from users import dashboard
+from users.serializers import MyTokenObtainPairSerializer
+from .middleware import QueryRecorder
+
+logger = logging.getLogger(__name__)
+
+
+class Scenario:
+    """
+    `path(context)` and `body(context, i)` build the i-th request; POST scenarios report the
+    ids of the orders they create.
+    """
+
+    concurrent = True
+    in_process = False
+
+    def __init__(self, name, role, method, path, body=None):
+        self.name = name
+        self.role = role
+        self.method = method
+        self.path = path
+        self.body = body
+
+    def send(self, transport, context, i):
+        body = self.body(context, i) if self.body else None
+        status, content = transport.request(self.method, self.path(context), body)
+        order_id = None
+        if self.method == 'POST' and status == 201:
+            order_id = json.loads(content).get('order_id')
+        return status, order_id
+
+
+class CommandScenario(Scenario):
+    """
+    Runs a management command in-process; analytics generation isn't an endpoint. Each run is
+    rolled back so the reports it writes don't change what later runs, or the app, see.
+    """
+
+    concurrent = False
+    in_process = True
+
+    def __init__(self, name, command):
+        super().__init__(name, role=None, method='COMMAND', path=lambda context: command)
+        self.command = command
+
+    def send(self, transport, context, i):
+        with transaction.atomic():
+            call_command(self.command, stdout=io.StringIO())
+            transaction.set_rollback(True)
+        return 200, None
+
+
+def _cart(context, i):
+    variations = context['variations']
+    return [{'variation_id': variations[(i + offset) % len(variations)], 'quantity': 1} for offset in range(2)]
+
+
+def _date_range(context):
+    return urlencode({'start_date': context['start_date'], 'end_date': context['end_date']})
+
+
+SCENARIOS = [
+    Scenario('menu-list', 'customer', 'GET', lambda context: reverse('menuitem-list')),
+    Scenario(
+        'order-create', 'customer', 'POST', lambda context: reverse('order-create'),
+        body=lambda context, i: {'items': _cart(context, i), 'dining_method': 'dine-in'},
+    ),
+    Scenario(
+        'pos-order-create', 'staff', 'POST', lambda context: reverse('pos-order-create'),
+        body=lambda context, i: {
+            'items': _cart(context, i), 'dining_method': 'take-out', 'amount_paid': '1000', 'change_given': '0',
+        },
+    ),
+    Scenario(
+        'admin-order-list-search', 'staff', 'GET',
+        lambda context: f"{reverse('admin-order-list')}?{urlencode({'status': 'pending', 'search': context['search']})}",
+    ),
+    Scenario('sales-report', 'staff', 'GET', lambda context: f"{reverse('sales-report')}?{_date_range(context)}"),
+    Scenario('performance-report', 'admin', 'GET', lambda context: f"{reverse('performance-report')}?{_date_range(context)}"),
+    CommandScenario('analytics-generation', 'generate_analytics'),
+]
+SCENARIOS_BY_NAME = {scenario.name: scenario for scenario in SCENARIOS}
+
+
+class TestClientTransport:
+    def __init__(self, token):
+        headers = {'HTTP_AUTHORIZATION': f"Bearer {token}"} if token else {}
+        # Server errors are counted like any other status instead of aborting the run.
+        self.client = Client(raise_request_exception=False, **headers)
+
+    def request(self, method, path, body):
+        if method == 'GET':
+            response = self.client.get(path)
+        else:
+            response = self.client.post(path, body, content_type='application/json')
+        return response.status_code, response.content
+
+
+class HTTPTransport:
+    def __init__(self, base_url, token):
+        self.base_url = base_url.rstrip('/')
+        self.headers = {'Content-Type': 'application/json'}
+        if token:
+            self.headers['Authorization'] = f"Bearer {token}"
+
+    def request(self, method, path, body):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method, headers=self.headers)
+        try:
+            with urllib.request.urlopen(request, timeout=120) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+
+def build_context(users, search=None, report_days=30):
+    """Request parameters shared by every scenario, taken from the data in the database."""
+    last_processed = Orders.objects.filter(status='completed').aggregate(last=Max('processed_at'))['last']
+    end_date = localtime(last_processed).date() if last_processed else localdate()
+    variations = list(
+        Variations.objects.filter(is_available=True, menu_item__is_available=True)
+        .order_by('id').values_list('id', flat=True)
+    )
+    return {
+        'tokens': {
+            role: str(MyTokenObtainPairSerializer.get_token(user).access_token) for role, user in users.items()
+        },
+        'variations': variations,
+        'search': search or 'ORDER',
+        'start_date': (end_date - timedelta(days=report_days - 1)).isoformat(),
+        'end_date': end_date.isoformat(),
+    }
+
+
+def _percentiles(values):
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return round(float(p50), 2), round(float(p95), 2), round(float(p99), 2)
+
+
+def run_scenario(scenario, context, num_requests, concurrency, created, warmup=0, base_url=None):
+    """
+    Ids of the orders the requests create are appended to `created` as they come in, so they
+    can be cleaned up even if the run fails. A request that raises (connection refused, an
+    unreadable response...) is counted as an error with status 0.
+    """
+    concurrency = concurrency if scenario.concurrent else 1
+    next_index = iter(range(-warmup, num_requests))
+    index_lock = threading.Lock()
+    samples = []
+    exceptions = Counter()
+
+    def worker():
+        token = context['tokens'].get(scenario.role)
+        transport = HTTPTransport(base_url, token) if base_url else TestClientTransport(token)
+        recorder = QueryRecorder()
+        mine = []
+        try:
+            with connection.execute_wrapper(recorder):
+                while True:
+                    with index_lock:
+                        i = next(next_index, None)
+                    if i is None:
+                        break
+                    queries_before = recorder.count
+                    started = time.perf_counter()
+                    try:
+                        status, order_id = scenario.send(transport, context, i)
+                    except Exception as e:
+                        logger.debug("%s request %s failed", scenario.name, i, exc_info=True)
+                        if i >= 0:
+                            exceptions[type(e).__name__] += 1
+                        status, order_id = 0, None
+                    finished = time.perf_counter()
+                    if order_id is not None:
+                        created.append(order_id)
+                    if i >= 0:
+                        mine.append((started, finished, status, recorder.count - queries_before))
+        finally:
+            connection.close()
+        samples.extend(mine)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='benchmark') as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+
+    # Throughput spans the timed requests only; warm-up requests (negative indexes) are dropped.
+    wall_seconds = max(s[1] for s in samples) - min(s[0] for s in samples)
+    latencies = [(s[1] - s[0]) * 1000 for s in samples]
+    statuses = [s[2] for s in samples]
+    queries = [s[3] for s in samples]
+    p50, p95, p99 = _percentiles(latencies)
+    counted = base_url is None or scenario.in_process
+    return {
+        'scenario': scenario.name,
+        'requests': len(samples),
+        'concurrency': concurrency,
+        'errors': sum(1 for code in statuses if code == 0 or code >= 400),
+        'status_codes': {str(code): statuses.count(code) for code in sorted(set(statuses))},
+        'exceptions': dict(exceptions),
+        'req_per_sec': round(len(samples) / wall_seconds, 2),
+        'mean_ms': round(float(np.mean(latencies)), 2),
+        'p50_ms': p50,
+        'p95_ms': p95,
+        'p99_ms': p99,
+        'max_ms': round(max(latencies), 2),
+        'queries_per_request': round(float(np.mean(queries)), 2) if counted else None,
+        'max_queries': max(queries) if counted else None,
+    }
+
+
+def snapshot_stock(variation_ids):
+    return dict(Variations.objects.filter(id__in=variation_ids).values_list('id', 'stock_level'))
+
+
+@transaction.atomic
+def clean_up(order_ids, stock):
+    """Deletes the orders a run created and puts stock levels back where they were."""
+    deleted = 0
+    for start in range(0, len(order_ids), 500):
+        deleted += Orders.objects.filter(id__in=order_ids[start:start + 500]).delete()[1].get('orders.Orders', 0)
+    for variation_id, stock_level in stock.items():
+        Variations.objects.filter(id=variation_id).exclude(stock_level=stock_level).update(stock_level=stock_level)
+    transaction.on_commit(lambda: dashboard.invalidate('low_stock_variations'))
+    return deleted
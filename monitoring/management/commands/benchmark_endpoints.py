@@ -0,0 +1,192 @@
+# backend/monitoring/management/commands/benchmark_endpoints.py
+
+import io
+import json
+import subprocess
+from contextlib import redirect_stdout
+from datetime import date
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from menu.models import Variations
+from monitoring.benchmark import SCENARIOS_BY_NAME, build_context, clean_up, run_scenario, snapshot_stock
+from orders.models import OrderItems, Orders
+from users.models import User
+
+COLUMNS = [
+    'scenario', 'requests', 'errors', 'req_per_sec', 'p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request',
+]
+COMPARED = ['req_per_sec', 'p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request']
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-tests the hot endpoints (menu, order and POS create, admin order search, reports, '
+        'analytics generation) with concurrent clients and reports latency percentiles, throughput '
+        'and queries per request.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS_BY_NAME), choices=SCENARIOS_BY_NAME)
+        parser.add_argument('--requests', type=int, default=200, help='Timed requests per scenario.')
+        parser.add_argument('--concurrency', type=int, default=4, help='Concurrent clients (threads) per scenario.')
+        parser.add_argument('--warmup', type=int, default=10, help='Untimed requests per scenario.')
+        parser.add_argument('--command-runs', type=int, default=5, help='Timed runs of analytics generation.')
+        parser.add_argument(
+            '--base-url',
+            help='Send the requests to a running server (e.g. http://127.0.0.1:8000) instead of the '
+                 'test client. It must use this database; query counts are not available.',
+        )
+        parser.add_argument('--seed', action='store_true', help='Run seed_data before benchmarking.')
+        parser.add_argument('--seed-start-date', type=date.fromisoformat, help='seed_data --start-date.')
+        parser.add_argument('--seed-end-date', type=date.fromisoformat, help='seed_data --end-date.')
+        parser.add_argument('--seed-orders-per-day', type=float, help='seed_data --orders-per-day.')
+        parser.add_argument(
+            '--seed-random-seed', type=int, default=0,
+            help='seed_data --random-seed; fixed by default so runs on different commits see the same data.',
+        )
+        parser.add_argument('--seed-workers', type=int, default=1, help='seed_data --workers.')
+        parser.add_argument('--search', default='ORDER', help='Search term for the admin order list.')
+        parser.add_argument('--report-days', type=int, default=30, help='Days covered by the report requests.')
+        parser.add_argument('--customer', help='Email of the customer to request as (default: first active customer).')
+        parser.add_argument('--staff', help='Email of the staff user to request as (default: first active one).')
+        parser.add_argument('--admin', help='Email of the admin to request as (default: first active one).')
+        parser.add_argument('--keep-data', action='store_true', help="Keep the orders the run creates and their stock changes.")
+        parser.add_argument('--output', help='Write the results as JSON to this path.')
+        parser.add_argument('--compare', help='JSON results of an earlier run to compare against.')
+
+    def handle(self, *args, **options):
+        if min(options['requests'], options['concurrency'], options['command_runs']) < 1:
+            raise CommandError("--requests, --concurrency and --command-runs must be at least 1.")
+        baseline = self.load_baseline(options['compare']) if options['compare'] else None
+
+        seed_options = None
+        if options['seed']:
+            seed_options = {
+                'start_date': options['seed_start_date'],
+                'end_date': options['seed_end_date'],
+                'orders_per_day': options['seed_orders_per_day'],
+                'random_seed': options['seed_random_seed'],
+                'workers': options['seed_workers'],
+            }
+            seed_options = {name: value for name, value in seed_options.items() if value is not None}
+            call_command('seed_data', stdout=self.stdout, stderr=self.stderr, **seed_options)
+
+        users = {
+            'customer': self.pick_user(options['customer'], ['customer']),
+            'staff': self.pick_user(options['staff'], ['staff', 'admin']),
+            'admin': self.pick_user(options['admin'], ['admin']),
+        }
+        context = build_context(users, options['search'], options['report_days'])
+        if not context['variations']:
+            raise CommandError("No available menu variations to order.")
+        stock = snapshot_stock(context['variations'])
+        report = {
+            'commit': self.git_commit(),
+            'database': connection.vendor,
+            'started_at': timezone.now().isoformat(),
+            'transport': 'http' if options['base_url'] else 'test-client',
+            'options': {k: options[k] for k in ('requests', 'concurrency', 'warmup', 'command_runs', 'search', 'report_days')},
+            'seed_data': seed_options,
+            'dataset': self.dataset(),
+            'results': [],
+        }
+
+        self.stdout.write(
+            f"{connection.vendor} database with {report['dataset']['orders']} orders; "
+            f"{options['requests']} requests x {options['concurrency']} clients per scenario."
+        )
+        self.stdout.write("  ".join(f"{c:>24}" for c in COLUMNS))
+        created = []
+        try:
+            # Some views print debugging output; keep it out of the report.
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']), redirect_stdout(io.StringIO()):
+                for name in options['scenarios']:
+                    scenario = SCENARIOS_BY_NAME[name]
+                    if scenario.in_process:
+                        num_requests, warmup = options['command_runs'], min(options['warmup'], 1)
+                    else:
+                        num_requests, warmup = options['requests'], options['warmup']
+                    result = run_scenario(
+                        scenario, context, num_requests, options['concurrency'], created,
+                        warmup=warmup, base_url=options['base_url'],
+                    )
+                    report['results'].append(result)
+                    self.stdout.write("  ".join(f"{result[c]!s:>24}" for c in COLUMNS))
+        finally:
+            if created and not options['keep_data']:
+                deleted = clean_up(created, stock)
+                self.stdout.write(f"Deleted {deleted} benchmark orders and restored stock levels.")
+
+        for result in report['results']:
+            if result['errors']:
+                self.stdout.write(self.style.WARNING(
+                    f"{result['scenario']}: status codes {result['status_codes']}"
+                    + (f", exceptions {result['exceptions']}." if result['exceptions'] else ".")
+                ))
+        if baseline:
+            self.compare(baseline, report)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, default=str)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+
+    def pick_user(self, email, roles):
+        users = User.objects.filter(is_active=True, role__in=roles)
+        user = users.filter(email__iexact=email).first() if email else users.order_by('id').first()
+        if user is None:
+            raise CommandError(f"No active {'/'.join(roles)} user found{f' with email {email}' if email else ''}.")
+        return user
+
+    def load_baseline(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Can't read {path}: {e}")
+
+    def git_commit(self):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+            dirty = subprocess.run(
+                ['git', 'status', '--porcelain', '--untracked-files=no'], cwd=settings.BASE_DIR,
+                capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        return f"{commit}-dirty" if dirty else commit
+
+    def dataset(self):
+        return {
+            'orders': Orders.objects.count(),
+            'order_items': OrderItems.objects.count(),
+            'users': User.objects.count(),
+            'variations': Variations.objects.count(),
+        }
+
+    def compare(self, baseline, report):
+        self.stdout.write(f"Compared with {baseline.get('commit')} ({baseline.get('started_at')}):")
+        previous = {result['scenario']: result for result in baseline.get('results', [])}
+        self.stdout.write("  ".join(f"{c:>24}" for c in ['scenario', *COMPARED]))
+        for result in report['results']:
+            before = previous.get(result['scenario'])
+            if before is None:
+                continue
+            cells = [result['scenario']]
+            for column in COMPARED:
+                old, new = before.get(column), result[column]
+                if old is None or new is None:
+                    cells.append('-')
+                elif old == 0:
+                    cells.append(f"{old} -> {new}")
+                else:
+                    cells.append(f"{new} ({(new - old) / old:+.1%})")
+            self.stdout.write("  ".join(f"{c:>24}" for c in cells))
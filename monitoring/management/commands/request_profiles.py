@@ -0,0 +1,50 @@
+# backend/monitoring/management/commands/request_profiles.py
+
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from monitoring.profiling import delete_profile, list_profiles
+
+
+class Command(BaseCommand):
+    help = 'Lists stored request profiles, or prunes them with --older-than-days / --keep.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--route', help='Only profiles of this route (URL name).')
+        parser.add_argument('--limit', type=int, default=50, help='Profiles listed, newest first.')
+        parser.add_argument('--older-than-days', type=float, help='Delete profiles taken more than this many days ago.')
+        parser.add_argument('--keep', type=int, help='Delete all but the newest N profiles.')
+
+    def handle(self, *args, **options):
+        profiles = list_profiles()
+        if options['route']:
+            profiles = [p for p in profiles if p.get('route') == options['route']]
+
+        if options['older_than_days'] is None and options['keep'] is None:
+            self.list(profiles[:options['limit']], len(profiles))
+            return
+
+        doomed = {}
+        if options['keep'] is not None:
+            doomed.update((p['id'], p) for p in profiles[options['keep']:])
+        if options['older_than_days'] is not None:
+            cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+            doomed.update(
+                (p['id'], p) for p in profiles if datetime.fromisoformat(p['started_at']) < cutoff
+            )
+        for profile in doomed.values():
+            delete_profile(profile)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {len(doomed)} of {len(profiles)} profiles."))
+
+    def list(self, profiles, total):
+        if not profiles:
+            self.stdout.write(self.style.WARNING(f"No profiles in {settings.PROFILING_DIR}."))
+            return
+        columns = ['id', 'mode', 'method', 'route', 'status', 'duration_ms', 'query_count', 'sql_ms']
+        self.stdout.write("  ".join(f"{c:>24}" for c in columns))
+        for profile in profiles:
+            self.stdout.write("  ".join(f"{profile.get(c)!s:>24}" for c in columns))
+        self.stdout.write(f"{len(profiles)} of {total} profiles shown; files are in {settings.PROFILING_DIR}.")
@@ -0,0 +1,142 @@
+# backend/monitoring/metrics.py
+"""
+In-process request metrics, rendered in the Prometheus text exposition format.
+
+Series are labelled by route: the resolved URL name (or the URL pattern for unnamed routes), so
+the label set stays bounded. Each worker process keeps its own registry; every scrape sees the
+process that served it, and Prometheus `rate()`/`sum()` over the series handle the rest.
+"""
+import bisect
+import threading
+from collections import defaultdict
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+
+
+class RouteStats:
+    __slots__ = ('latency', 'queries', 'sql_seconds', 'response_bytes', 'n_plus_one', 'max_repeated_query')
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.sql_seconds = 0.0
+        self.response_bytes = 0
+        self.n_plus_one = 0
+        self.max_repeated_query = 0
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = defaultdict(RouteStats)
+        self._requests = defaultdict(int)
+
+    def observe(self, route, method, status, seconds, queries, sql_seconds, response_bytes, max_repeated, n_plus_one):
+        with self._lock:
+            stats = self._routes[route]
+            stats.latency.observe(seconds)
+            stats.queries.observe(queries)
+            stats.sql_seconds += sql_seconds
+            stats.response_bytes += response_bytes
+            stats.max_repeated_query = max(stats.max_repeated_query, max_repeated)
+            if n_plus_one:
+                stats.n_plus_one += 1
+            self._requests[(route, method, status)] += 1
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._requests.clear()
+
+    def render(self):
+        with self._lock:
+            routes = {route: _copy(stats) for route, stats in self._routes.items()}
+            requests = dict(self._requests)
+
+        lines = []
+        _header(lines, 'http_requests_total', 'counter', 'Requests served, by route, method and status code.')
+        for (route, method, status), count in sorted(requests.items()):
+            lines.append(f"http_requests_total{_labels(route=route, method=method, status=status)} {count}")
+
+        _header(lines, 'http_request_duration_seconds', 'histogram', 'Request latency, by route.')
+        for route, stats in sorted(routes.items()):
+            _histogram(lines, 'http_request_duration_seconds', route, stats.latency)
+
+        _header(lines, 'db_queries_per_request', 'histogram', 'SQL queries executed per request, by route.')
+        for route, stats in sorted(routes.items()):
+            _histogram(lines, 'db_queries_per_request', route, stats.queries)
+
+        _counter(lines, routes, 'db_query_duration_seconds_total', 'sql_seconds', 'Time spent in SQL queries, by route.')
+        _counter(lines, routes, 'http_response_size_bytes_total', 'response_bytes', 'Response body bytes sent, by route.')
+        _counter(lines, routes, 'db_n_plus_one_requests_total', 'n_plus_one', 'Requests that repeated one query shape past the N+1 threshold, by route.')
+
+        _header(lines, 'db_max_repeated_query', 'gauge', 'Most executions of a single query shape in one request, by route.')
+        for route, stats in sorted(routes.items()):
+            lines.append(f"db_max_repeated_query{_labels(route=route)} {stats.max_repeated_query}")
+        return "\n".join(lines) + "\n"
+
+
+def _copy(stats):
+    copy = RouteStats()
+    for name in RouteStats.__slots__:
+        value = getattr(stats, name)
+        if isinstance(value, Histogram):
+            histogram = Histogram(value.buckets)
+            histogram.counts, histogram.sum, histogram.count = list(value.counts), value.sum, value.count
+            value = histogram
+        setattr(copy, name, value)
+    return copy
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _header(lines, name, kind, help_text):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _histogram(lines, name, route, histogram):
+    for bound, total in histogram.cumulative():
+        lines.append(f"{name}_bucket{_labels(route=route, le=bound)} {total}")
+    lines.append(f"{name}_bucket{_labels(route=route, le='+Inf')} {histogram.count}")
+    lines.append(f"{name}_sum{_labels(route=route)} {histogram.sum}")
+    lines.append(f"{name}_count{_labels(route=route)} {histogram.count}")
+
+
+def _counter(lines, routes, name, attribute, help_text):
+    _header(lines, name, 'counter', help_text)
+    for route, stats in sorted(routes.items()):
+        lines.append(f"{name}{_labels(route=route)} {getattr(stats, attribute)}")
+
+
+registry = Registry()
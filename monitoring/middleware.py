@@ -0,0 +1,177 @@
+# backend/monitoring/middleware.py
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from users.authentication import ClaimsJWTAuthentication
+from users.ratelimit import LocalTokenBucket
+from .metrics import registry
+from .profiling import MODES, Profiler, QueryLog, new_profile_id, save_profile
+
+logger = logging.getLogger(__name__)
+
+# N+1 patterns remembered per process so each is logged once; the oldest are forgotten first.
+MAX_REPORTED_PATTERNS = 1000
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)', re.IGNORECASE)
+
+
+def sql_pattern(sql):
+    """Collapses `IN (%s, ...)` lists so batches of any size share one pattern."""
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+class QueryRecorder:
+    """Database execute wrapper counting queries, their time and repeats of each SQL shape."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # Django SQL is parameterised, so the statement text is its shape.
+        self.shapes = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.shapes[sql] = self.shapes.get(sql, 0) + 1
+
+    def most_repeated(self):
+        if not self.shapes:
+            return None, 0
+        sql = max(self.shapes, key=self.shapes.get)
+        return sql, self.shapes[sql]
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        # Unresolved paths share one series so scanners can't inflate the label set.
+        return 'unmatched'
+    return match.url_name or match.route
+
+
+class MetricsMiddleware:
+    """
+    Records latency, SQL query count and time, response size and likely N+1 query patterns
+    per route. Served at /metrics by monitoring.views.MetricsView.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._reported = OrderedDict()
+        self._reported_lock = threading.Lock()
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        route = route_name(request)
+        sql, repeats = recorder.most_repeated()
+        n_plus_one = repeats >= settings.METRICS_N_PLUS_ONE_THRESHOLD
+        if n_plus_one and self._first_report(route, sql):
+            logger.warning("Possible N+1 on %s: query repeated %d times: %s", route, repeats, sql[:300])
+
+        if response.streaming:
+            size = int(response.get('Content-Length') or 0)
+        else:
+            size = len(response.content)
+        registry.observe(
+            route, request.method, response.status_code, elapsed,
+            recorder.count, recorder.seconds, size, repeats, n_plus_one,
+        )
+        return response
+
+    def _first_report(self, route, sql):
+        key = (route, sql_pattern(sql))
+        with self._reported_lock:
+            if key in self._reported:
+                self._reported.move_to_end(key)
+                return False
+            self._reported[key] = True
+            if len(self._reported) > MAX_REPORTED_PATTERNS:
+                self._reported.popitem(last=False)
+        return True
+
+
+def _staff_user(request):
+    try:
+        result = ClaimsJWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    user = result[0] if result else None
+    return user if user is not None and user.role in ('admin', 'staff') else None
+
+
+class ProfilerMiddleware:
+    """
+    Profiles a request when a staff user asks for it with an `X-Profile` header or `_profile`
+    query parameter whose value is the mode ('sample' or 'cprofile'; anything else samples).
+    The stored profile's id is returned in the `X-Profile-Id` response header. Requests from
+    anyone else, and requests past PROFILING_MAX_PER_MINUTE, run unprofiled.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self._bucket = LocalTokenBucket('profile', settings.PROFILING_MAX_PER_MINUTE, settings.PROFILING_MAX_PER_MINUTE)
+
+    def __call__(self, request):
+        requested = request.headers.get('X-Profile') or request.GET.get('_profile')
+        if not settings.PROFILING_ENABLED or not requested:
+            return self.get_response(request)
+
+        user = _staff_user(request)
+        if user is None:
+            return self.get_response(request)
+        if self._bucket.take('requests') is not None:
+            response = self.get_response(request)
+            response['X-Profile-Skipped'] = 'rate-limited'
+            return response
+
+        profiler = Profiler(requested if requested in MODES else 'sample')
+        queries = QueryLog()
+        started_at = timezone.now()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            profiler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.stop()
+        elapsed = time.perf_counter() - started
+
+        profile_id = new_profile_id()
+        save_profile(profile_id, profiler, {
+            'method': request.method,
+            'path': request.path,
+            'route': route_name(request),
+            'status': response.status_code,
+            'user_id': user.id,
+            'started_at': started_at.isoformat(),
+            'duration_ms': round(elapsed * 1000, 3),
+            'query_count': len(queries.queries),
+            'sql_ms': round(sum(q['ms'] for q in queries.queries), 3),
+            'queries': queries.queries,
+        })
+        response['X-Profile-Id'] = profile_id
+        return response
@@ -0,0 +1,145 @@
+# backend/monitoring/profiling.py
+"""
+On-demand profiles of single requests.
+
+A profile is stored in PROFILING_DIR as `<id>.json` (request, timings and the SQL statements
+with their durations; parameters are not kept) next to the profile itself:
+
+- 'sample' (default): a stack sampler thread records the request thread's stack every
+  PROFILING_SAMPLE_INTERVAL seconds and writes `<id>.collapsed`, one "frame;frame;... count"
+  line per stack, which flamegraph.pl and speedscope read directly.
+- 'cprofile': the deterministic profiler writes `<id>.prof` (pstats; snakeviz, flameprof).
+  Its overhead inflates the timings, so prefer it for call counts.
+"""
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.utils import timezone
+
+MODES = ('sample', 'cprofile')
+PROFILE_EXTENSIONS = {'sample': '.collapsed', 'cprofile': '.prof'}
+
+
+class QueryLog:
+    """Database execute wrapper keeping each statement and its duration."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({'sql': sql, 'ms': round((time.perf_counter() - started) * 1000, 3), 'many': many})
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    for prefix in (str(settings.BASE_DIR) + os.sep, *(p + os.sep for p in sys.path if p.endswith('-packages'))):
+        if filename.startswith(prefix):
+            filename = filename[len(prefix):]
+            break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(';', ':')
+
+
+class StackSampler:
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class Profiler:
+    def __init__(self, mode):
+        self.mode = mode
+        self._sampler = None
+        self._profile = None
+
+    def start(self):
+        if self.mode == 'cprofile':
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = StackSampler(threading.get_ident(), settings.PROFILING_SAMPLE_INTERVAL)
+            self._sampler.start()
+
+    def stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+        else:
+            self._sampler.stop()
+
+    def save(self, path):
+        if self._profile is not None:
+            self._profile.dump_stats(path)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self._sampler.collapsed())
+
+
+def new_profile_id():
+    return f"{timezone.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+
+def save_profile(profile_id, profiler, metadata):
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    profile_file = profile_id + PROFILE_EXTENSIONS[profiler.mode]
+    profiler.save(os.path.join(settings.PROFILING_DIR, profile_file))
+    metadata = {'id': profile_id, 'mode': profiler.mode, 'profile_file': profile_file, **metadata}
+    with open(os.path.join(settings.PROFILING_DIR, profile_id + '.json'), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2)
+
+
+def list_profiles():
+    """Metadata of every stored profile, newest first."""
+    if not os.path.isdir(settings.PROFILING_DIR):
+        return []
+    profiles = []
+    for name in os.listdir(settings.PROFILING_DIR):
+        if not name.endswith('.json'):
+            continue
+        try:
+            with open(os.path.join(settings.PROFILING_DIR, name), encoding='utf-8') as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda p: p['id'], reverse=True)
+
+
+def delete_profile(metadata):
+    for name in (metadata['id'] + '.json', metadata.get('profile_file')):
+        if name:
+            try:
+                os.remove(os.path.join(settings.PROFILING_DIR, name))
+            except FileNotFoundError:
+                pass
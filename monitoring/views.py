@@ -0,0 +1,17 @@
+# backend/monitoring/views.py
+from django.http import HttpResponse
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+
+from users.permissions import IsStaffUser
+from .metrics import registry
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsView(APIView):
+    permission_classes = [IsAuthenticated, IsStaffUser]
+
+    def get(self, request):
+        """Request metrics of this process in the Prometheus text format."""
+        return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
 from orders.models import Orders
+from users import dashboard
 
 class Command(BaseCommand):
     help = 'Finds and cancels pending orders that are older than one hour.'
@@ -18,6 +19,7 @@ class Command(BaseCommand):
         
         if count > 0:
             orders_to_cancel.update(status='cancelled')
+            dashboard.invalidate('pending_orders')
             
             self.stdout.write(self.style.SUCCESS(f'Successfully cancelled {count} old pending orders.'))
         else:
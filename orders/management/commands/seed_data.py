@@ -1,26 +1,57 @@
 # backend/orders/management/commands/seed_data.py
 
-import random
-from datetime import timedelta, date
-from django.core.management.base import BaseCommand
-from django.utils import timezone
-from django.db import transaction
-import uuid
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from users import dashboard
 from users.models import User
 from menu.models import Variations
-from orders.models import Orders, OrderItems
+from orders.seeding import OrderGenerator, write_bulk, write_copy
+
+METHODS = ('auto', 'bulk', 'copy')
+
 
 class Command(BaseCommand):
-    help = 'Seeds the database with a large amount of realistic order data for one year.'
+    help = 'Seeds the database with realistic completed orders, one year of them by default.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', type=date.fromisoformat, default=date(2024, 7, 16))
+        parser.add_argument('--end-date', type=date.fromisoformat, default=date(2025, 7, 16))
+        parser.add_argument(
+            '--orders-per-day', type=float, default=60,
+            help='Mean orders on an average weekday; Fridays and Saturdays get more, most Sundays none.',
+        )
+        parser.add_argument('--random-seed', type=int, help='Seed for a reproducible dataset (default: random).')
+        parser.add_argument('--workers', type=int, default=1, help='Days are generated and written by this many threads.')
+        parser.add_argument('--chunk-days', type=int, default=7, help='Days written per transaction.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT with --method bulk.')
+        parser.add_argument(
+            '--method', choices=METHODS, default='auto',
+            help='bulk: bulk_create; copy: PostgreSQL COPY; auto: copy on PostgreSQL, bulk elsewhere.',
+        )
 
-    @transaction.atomic
     def handle(self, *args, **options):
+        start_date, end_date = options['start_date'], options['end_date']
+        if end_date < start_date:
+            raise CommandError("--end-date is before --start-date.")
+        if min(options['workers'], options['chunk_days'], options['batch_size']) < 1:
+            raise CommandError("--workers, --chunk-days and --batch-size must be at least 1.")
+        method = options['method']
+        if method == 'auto':
+            method = 'copy' if connection.vendor == 'postgresql' else 'bulk'
+        elif method == 'copy' and connection.vendor != 'postgresql':
+            raise CommandError("--method copy needs PostgreSQL.")
+
         self.stdout.write("Starting database seeding process...")
 
-        customers = list(User.objects.filter(role='customer'))
-        staff_members = list(User.objects.filter(role__in=['staff', 'admin']))
-        variations = list(Variations.objects.filter(is_available=True))
+        customers = list(User.objects.filter(role='customer').values_list('id', flat=True))
+        staff_members = list(User.objects.filter(role__in=['staff', 'admin']).values_list('id', flat=True))
+        variations = list(Variations.objects.filter(is_available=True).order_by('id').values_list('id', 'price'))
 
         if not customers:
             self.stdout.write(self.style.ERROR("No customers found. Please create customer users first."))
@@ -31,63 +62,55 @@ class Command(BaseCommand):
         if not staff_members:
             self.stdout.write(self.style.WARNING("No staff members found. Walk-in orders will not be assigned a processor."))
 
-        end_date = date(2025, 7, 16)
-        start_date = date(2024, 7, 16)
-        delta = end_date - start_date
-
-        for i in range(delta.days + 1):
-            current_date = start_date + timedelta(days=i)
-            
-            if current_date.weekday() == 6 and random.random() > 0.1: 
-                continue
-
-            self.stdout.write(f"Seeding data for {current_date}...")
-
-            num_orders_today = random.randint(20, 100) 
-            
-            for _ in range(num_orders_today):
-                order_type = random.choice(['pre-selection', 'walk-in'])
-                customer = random.choice(customers) if order_type == 'pre-selection' else None
-                staff = random.choice(staff_members) if order_type == 'walk-in' and staff_members else None
-                
-                order_hour = random.randint(8, 22)
-                order_minute = random.randint(0, 59)
-                order_second = random.randint(0, 59)
-                order_time = timezone.datetime(
-                    current_date.year, current_date.month, current_date.day,
-                    order_hour, order_minute, order_second
-                )
-                aware_order_time = timezone.make_aware(order_time)
-
-                order = Orders.objects.create(
-                    user=customer,
-                    processed_by_staff=staff,
-                    order_number=f"SEED#{str(uuid.uuid4().hex[:8]).upper()}",
-                    status='completed', 
-                    order_type=order_type,
-                    dining_method=random.choice(['dine-in', 'take-out']),
-                    total_amount=0, 
-                    created_at=aware_order_time,
-                    processed_at=aware_order_time + timedelta(minutes=random.randint(5, 30))
-                )
-
-                num_items_in_order = random.randint(1, 5)
-                order_total = 0
-                
-                for _ in range(num_items_in_order):
-                    variation = random.choice(variations)
-                    quantity = random.randint(1, 3)
-                    price = variation.price
-                    
-                    OrderItems.objects.create(
-                        order=order,
-                        variation=variation,
-                        quantity=quantity,
-                        price_at_order=price
-                    )
-                    order_total += price * quantity
-                
-                order.total_amount = order_total
-                order.save()
-
-        self.stdout.write(self.style.SUCCESS('Successfully seeded the database with one year of order data.'))
\ No newline at end of file
+        seed = options['random_seed']
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy % 2 ** 32)
+        generator = OrderGenerator(
+            np.random.default_rng([seed, 0]), options['orders_per_day'], customers, staff_members, variations,
+        )
+        days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        chunks = [days[i:i + options['chunk_days']] for i in range(0, len(days), options['chunk_days'])]
+        self.stdout.write(
+            f"Seeding {start_date} to {end_date} in {len(chunks)} chunks with {method} "
+            f"({options['workers']} workers, random seed {seed})..."
+        )
+
+        def seed_chunk(index):
+            # Each chunk has its own stream, so the data doesn't depend on the worker count.
+            rng = np.random.default_rng([seed, index + 1])
+            with transaction.atomic():
+                batch = generator.generate(rng, chunks[index])
+                if method == 'copy':
+                    return write_copy(batch)
+                return write_bulk(batch, options['batch_size'])
+
+        def seed_chunk_in_thread(index):
+            try:
+                return seed_chunk(index)
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        total_orders = total_items = 0
+        if options['workers'] == 1:
+            results = map(seed_chunk, range(len(chunks)))
+        else:
+            executor = ThreadPoolExecutor(max_workers=options['workers'], thread_name_prefix='seed-data')
+            results = executor.map(seed_chunk_in_thread, range(len(chunks)))
+        try:
+            for chunk, (orders, items) in zip(chunks, results):
+                total_orders += orders
+                total_items += items
+                self.stdout.write(f"Seeded {chunk[0]} to {chunk[-1]}: {orders} orders, {items} order items.")
+        finally:
+            if options['workers'] > 1:
+                executor.shutdown(cancel_futures=True)
+            # bulk_create and COPY don't send post_save.
+            dashboard.invalidate()
+
+        elapsed = time.perf_counter() - started
+        rows = total_orders + total_items
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully seeded {total_orders} orders and {total_items} order items in {elapsed:.1f}s "
+            f"({rows / elapsed:,.0f} rows/sec)."
+        ))
@@ -35,6 +35,11 @@ class Orders(models.Model):
 
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'processed_at']),
+        ]
     
     def __str__(self):
         return self.order_number
@@ -0,0 +1,209 @@
+# backend/orders/seeding.py
+"""
+Synthetic order history for load testing, written by the seed_data command.
+
+Orders for a run of days are drawn at once with numpy: orders per day are Poisson around the
+requested mean scaled by WEEKDAY_WEIGHTS (most Sundays closed), order times follow
+HOURLY_WEIGHTS and dishes a skewed popularity. Each run of days is written in its own
+transaction with `bulk_create`, or with COPY on PostgreSQL.
+"""
+import io
+import uuid
+from datetime import datetime, time, timezone as dt_timezone
+from decimal import Decimal
+
+import numpy as np
+from django.db import connection
+from django.utils import timezone
+
+from .models import OrderItems, Orders
+
+OPEN_HOURS = np.arange(8, 23)
+# Relative orders per hour from 08:00 to 22:00: lunch and dinner peaks.
+HOURLY_WEIGHTS = np.array([2, 3, 5, 9, 10, 7, 4, 3, 4, 7, 10, 9, 6, 3, 2], dtype=float)
+# Relative orders per weekday, Monday first.
+WEEKDAY_WEIGHTS = np.array([0.85, 0.8, 0.85, 0.95, 1.2, 1.4, 1.0])
+SUNDAY_OPEN_PROBABILITY = 0.1
+WALK_IN_SHARE = 0.5
+TAKE_OUT_SHARE = 0.5
+MAX_ITEMS_PER_ORDER = 5
+MAX_QUANTITY = 3
+# Popularity of the n-th most popular variation is proportional to 1 / n**POPULARITY_SKEW.
+POPULARITY_SKEW = 0.8
+
+
+class OrderBatch:
+    """Column arrays for the orders of some days and their items; -1 stands for NULL ids."""
+
+    def __init__(self, created, processed, user_ids, staff_ids, walk_in, take_out, totals,
+                 item_orders, item_variations, item_quantities, item_prices):
+        self.created = created
+        self.processed = processed
+        self.user_ids = user_ids
+        self.staff_ids = staff_ids
+        self.walk_in = walk_in
+        self.take_out = take_out
+        self.totals = totals
+        self.item_orders = item_orders
+        self.item_variations = item_variations
+        self.item_quantities = item_quantities
+        self.item_prices = item_prices
+        # Unique per batch, so reruns never collide on order_number.
+        tag = uuid.uuid4().hex[:8].upper()
+        self.order_numbers = [f"SEED#{tag}{i:06X}" for i in range(len(created))]
+
+    def __len__(self):
+        return len(self.created)
+
+
+class OrderGenerator:
+    """
+    `customers` and `staff` are user ids, `variations` (id, price) pairs. Variation popularity is
+    drawn once from `rng`, so every batch shares the same best sellers.
+    """
+
+    def __init__(self, rng, orders_per_day, customers, staff, variations):
+        self.orders_per_day = orders_per_day
+        self.customers = np.asarray(customers, dtype=np.int64)
+        self.staff = np.asarray(staff, dtype=np.int64)
+        self.variation_ids = np.array([v[0] for v in variations], dtype=np.int64)
+        self.variation_prices = np.array([int(v[1] * 100) for v in variations], dtype=np.int64)
+        ranks = rng.permutation(len(variations)) + 1
+        popularity = 1 / ranks ** POPULARITY_SKEW
+        self.popularity = popularity / popularity.sum()
+        self.hour_p = HOURLY_WEIGHTS / HOURLY_WEIGHTS.sum()
+
+    def generate(self, rng, days):
+        weekdays = np.array([day.weekday() for day in days])
+        is_open = (weekdays != 6) | (rng.random(len(days)) < SUNDAY_OPEN_PROBABILITY)
+        per_day = rng.poisson(self.orders_per_day * WEEKDAY_WEIGHTS[weekdays]) * is_open
+        count = int(per_day.sum())
+
+        midnights = np.array([
+            int(timezone.make_aware(datetime.combine(day, time.min)).timestamp()) for day in days
+        ], dtype=np.int64)
+        seconds = rng.choice(OPEN_HOURS, size=count, p=self.hour_p) * 3600 + rng.integers(0, 3600, count)
+        # Days are already in order; sorting within them keeps ids in time order.
+        created = np.sort(np.repeat(midnights, per_day) + seconds)
+        processed = created + rng.integers(5, 31, count) * 60
+
+        walk_in = rng.random(count) < WALK_IN_SHARE
+        take_out = rng.random(count) < TAKE_OUT_SHARE
+        user_ids = np.where(walk_in, -1, self.customers[rng.integers(0, len(self.customers), count)])
+        if len(self.staff):
+            staff_ids = np.where(walk_in, self.staff[rng.integers(0, len(self.staff), count)], -1)
+        else:
+            staff_ids = np.full(count, -1)
+
+        items_per_order = rng.integers(1, MAX_ITEMS_PER_ORDER + 1, count)
+        item_orders = np.repeat(np.arange(count), items_per_order)
+        picks = rng.choice(len(self.variation_ids), size=len(item_orders), p=self.popularity)
+        item_quantities = rng.integers(1, MAX_QUANTITY + 1, len(item_orders))
+        item_prices = self.variation_prices[picks]
+        totals = np.bincount(item_orders, weights=item_prices * item_quantities, minlength=count).astype(np.int64)
+
+        return OrderBatch(
+            created, processed, user_ids, staff_ids, walk_in, take_out, totals,
+            item_orders, self.variation_ids[picks], item_quantities, item_prices,
+        )
+
+
+def _datetimes(epoch_seconds):
+    return [datetime.fromtimestamp(s, tz=dt_timezone.utc) for s in epoch_seconds.tolist()]
+
+
+def _money(cents):
+    return [Decimal(c).scaleb(-2) for c in cents.tolist()]
+
+
+def _nullable(ids):
+    return [i if i >= 0 else None for i in ids.tolist()]
+
+
+def write_bulk(batch, batch_size):
+    """Inserts the batch with `bulk_create`; returns (orders, items) written."""
+    orders = [
+        Orders(
+            user_id=user_id,
+            processed_by_staff_id=staff_id,
+            order_number=order_number,
+            status='completed',
+            order_type='walk-in' if walk_in else 'pre-selection',
+            dining_method='take-out' if take_out else 'dine-in',
+            total_amount=total,
+            created_at=created,
+            processed_at=processed,
+        )
+        for user_id, staff_id, order_number, walk_in, take_out, total, created, processed in zip(
+            _nullable(batch.user_ids), _nullable(batch.staff_ids), batch.order_numbers,
+            batch.walk_in.tolist(), batch.take_out.tolist(), _money(batch.totals),
+            _datetimes(batch.created), _datetimes(batch.processed),
+        )
+    ]
+    Orders.objects.bulk_create(orders, batch_size=batch_size)
+    if connection.features.can_return_rows_from_bulk_insert:
+        order_ids = [order.pk for order in orders]
+    else:
+        ids_by_number = dict(
+            Orders.objects.filter(order_number__in=batch.order_numbers).values_list('order_number', 'id')
+        )
+        order_ids = [ids_by_number[number] for number in batch.order_numbers]
+
+    items = [
+        OrderItems(order_id=order_ids[order], variation_id=variation, quantity=quantity, price_at_order=price)
+        for order, variation, quantity, price in zip(
+            batch.item_orders.tolist(), batch.item_variations.tolist(),
+            batch.item_quantities.tolist(), _money(batch.item_prices),
+        )
+    ]
+    OrderItems.objects.bulk_create(items, batch_size=batch_size)
+    return len(orders), len(items)
+
+
+def _copy(cursor, model, columns, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(r'\N' if value is None else str(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    quote = connection.ops.quote_name
+    cursor.copy_expert(
+        f"COPY {quote(model._meta.db_table)} ({', '.join(quote(c) for c in columns)}) FROM STDIN",
+        buffer,
+    )
+
+
+def _timestamps(epoch_seconds):
+    return np.char.add(np.datetime_as_string(epoch_seconds.astype('datetime64[s]'), unit='s'), '+00:00').tolist()
+
+
+def write_copy(batch):
+    """
+    Inserts the batch with PostgreSQL COPY (psycopg2); returns (orders, items) written. Order
+    ids are taken from the table's sequence up front so the items can reference them.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)",
+            [Orders._meta.db_table, Orders._meta.pk.column, len(batch)],
+        )
+        order_ids = [row[0] for row in cursor.fetchall()]
+        updated_at = timezone.now().isoformat()
+        _copy(cursor, Orders, [
+            'id', 'user_id', 'processed_by_staff_id', 'order_number', 'status', 'order_type',
+            'dining_method', 'total_amount', 'created_at', 'processed_at', 'updated_at',
+        ], zip(
+            order_ids, _nullable(batch.user_ids), _nullable(batch.staff_ids), batch.order_numbers,
+            ['completed'] * len(batch),
+            np.where(batch.walk_in, 'walk-in', 'pre-selection').tolist(),
+            np.where(batch.take_out, 'take-out', 'dine-in').tolist(),
+            _money(batch.totals), _timestamps(batch.created), _timestamps(batch.processed),
+            [updated_at] * len(batch),
+        ))
+
+        order_ids = np.asarray(order_ids, dtype=np.int64)
+        _copy(cursor, OrderItems, ['order_id', 'variation_id', 'quantity', 'price_at_order'], zip(
+            order_ids[batch.item_orders].tolist(), batch.item_variations.tolist(),
+            batch.item_quantities.tolist(), _money(batch.item_prices),
+        ))
+    return len(batch), len(batch.item_orders)
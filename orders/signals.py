@@ -0,0 +1,26 @@
+# orders/signals.py
+import logging
+
+from django.db import transaction
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+# Sent after the surrounding transaction commits, once an order has moved to 'completed'.
+# Receivers get `order`.
+order_completed = Signal()
+
+
+def _send(order):
+    # The status change is already committed; a failing receiver (cache outage...) is logged
+    # rather than turning the request into a 500 or stopping the other receivers.
+    for receiver, result in order_completed.send_robust(sender=order.__class__, order=order):
+        if isinstance(result, Exception):
+            logger.error(
+                "order_completed receiver %r failed for order %s", receiver, order.pk,
+                exc_info=(type(result), result, result.__traceback__),
+            )
+
+
+def send_order_completed(order):
+    transaction.on_commit(lambda: _send(order))
@@ -1,5 +1,6 @@
 # backend/orders/views.py
 from rest_framework import generics, status
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
@@ -13,6 +14,7 @@ from datetime import datetime, time, timedelta
 from .models import Orders, OrderItems
 from menu.models import Variations
 from .serializers import OrderCreateSerializer, OrderListSerializer , SalesReportSerializer
+from .signals import send_order_completed
 
 from rest_framework.views import APIView 
 from users.permissions import IsStaffUser 
@@ -51,7 +53,7 @@ class OrderCreateView(generics.CreateAPIView):
                 return Response({'error': 'Invalid item in cart.'}, status=status.HTTP_400_BAD_REQUEST)
 
         order = Orders.objects.create(
-            user=request.user,
+            user_id=request.user.id,
             order_number=f"ORDER#{str(uuid.uuid4().fields[-1])[:8].upper()}", 
             total_amount=total_amount,
             dining_method=dining_method,
@@ -79,7 +81,7 @@ class UserOrderListView(generics.ListAPIView):
 
 
     def get_queryset(self):
-        return Orders.objects.filter(user=self.request.user).order_by('-created_at')
+        return Orders.objects.filter(user_id=self.request.user.id).order_by('-created_at')
     
 class AdminOrderListView(generics.ListAPIView):
     serializer_class = OrderListSerializer
@@ -114,8 +116,12 @@ class AdminOrderDetailView(generics.UpdateAPIView):
 
     @transaction.atomic
     def partial_update(self, request, *args, **kwargs):
-        order = self.get_object()
+        # Locked until commit, so concurrent updates can't both see the old status and count
+        # the order as completed twice.
+        order = get_object_or_404(self.get_queryset().select_for_update(), id=kwargs['id'])
+        self.check_object_permissions(request, order)
         new_status = request.data.get('status')
+        previous_status = order.status
 
         if order.status == 'pending' and new_status == 'processing':
             for item in order.order_items.all():
@@ -137,6 +143,9 @@ class AdminOrderDetailView(generics.UpdateAPIView):
         order.status = new_status
         order.save()
 
+        if new_status == 'completed' and previous_status != 'completed':
+            send_order_completed(order)
+
         serializer = self.get_serializer(order)
         return Response(serializer.data)
 
@@ -185,7 +194,7 @@ class POSOrderCreateView(APIView):
 
         order = Orders.objects.create(
             user=None,
-            processed_by_staff=request.user,
+            processed_by_staff_id=request.user.id,
             order_number=f"POS#{str(uuid.uuid4().fields[-1])[:8].upper()}", 
             total_amount=total_amount,
             dining_method=dining_method,
@@ -221,7 +230,7 @@ class UserCancelOrderView(APIView):
     @transaction.atomic
     def post(self, request, order_id, *args, **kwargs):
         try:
-            order = Orders.objects.get(id=order_id, user=request.user)
+            order = Orders.objects.get(id=order_id, user_id=request.user.id)
         except Orders.DoesNotExist:
             return Response(
                 {"error": "Order not found or you do not have permission to cancel it."},
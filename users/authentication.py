@@ -0,0 +1,101 @@
+# backend/users/authentication.py
+"""
+JWT authentication without a user lookup per request.
+
+Access tokens carry the user's id, role and first name plus a `ver` claim: a keyed hash of the
+user's password hash, active flag and role. `ClaimsJWTAuthentication` builds a `ClaimsUser` from
+those claims and only compares `ver` with the user's current version, which is kept in a small
+per-process cache for JWT_USER_CACHE_TTL seconds. Changing the password, deactivating the user or
+changing their role therefore revokes their existing tokens, within the TTL on other processes
+and immediately on the one that saved the change.
+
+Views get a user with `id`, `role` and `first_name` but no model methods; anything that needs the
+`User` row must fetch it (or filter on `user_id=request.user.id`).
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.crypto import salted_hmac
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+VERSION_CLAIM = 'ver'
+MAX_CACHED_USERS = 10000
+
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def user_version(password, is_active, role):
+    return salted_hmac('users.authentication.user_version', f"{password}|{is_active}|{role}").hexdigest()[:16]
+
+
+def token_version(user):
+    return user_version(user.password, user.is_active, user.role)
+
+
+def current_version(user_id):
+    """The user's version, or None if they no longer exist or are inactive."""
+    now = time.monotonic()
+    entry = _versions.get(user_id)
+    if entry and entry[1] > now:
+        return entry[0]
+
+    row = User.objects.filter(pk=user_id).values_list('password', 'is_active', 'role').first()
+    version = user_version(*row) if row and row[1] else None
+    with _versions_lock:
+        if len(_versions) >= MAX_CACHED_USERS:
+            _versions.clear()
+        _versions[user_id] = (version, now + settings.JWT_USER_CACHE_TTL)
+    return version
+
+
+def forget_user(user_id):
+    with _versions_lock:
+        _versions.pop(user_id, None)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+class ClaimsUser(TokenUser):
+    """A user backed by access token claims."""
+
+    @cached_property
+    def id(self):
+        # simplejwt stores the id claim as a string.
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @property
+    def role(self):
+        return self.token.get('role')
+
+    @property
+    def first_name(self):
+        return self.token.get('first_name', '')
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if not settings.JWT_STATELESS_USER or VERSION_CLAIM not in validated_token:
+            # Tokens issued before the version claim existed still resolve the user from the database.
+            return super().get_user(validated_token)
+
+        user = ClaimsUser(validated_token)
+        version = current_version(user.id)
+        if version is None:
+            raise AuthenticationFailed('User not found or inactive.', code='user_inactive')
+        if version != validated_token[VERSION_CLAIM]:
+            raise AuthenticationFailed('Token has been revoked. Please log in again.', code='token_revoked')
+        return user
@@ -0,0 +1,270 @@
+# backend/users/dashboard.py
+"""
+Counters for the admin dashboard, served from the cache.
+
+Each counter is a count of rows matching a condition (pending orders, low-stock variations...).
+Before a tracked row is updated, the fields its counters depend on are read back in one query
+(skipped when `update_fields` leaves them all out); after the save or delete the row is moved
+between buckets with `cache.incr`/`decr` once the transaction commits, so the dashboard never
+runs the counts on the request path. Bulk `.update()` calls bypass the signals and must call
+`invalidate`.
+
+A counter is recounted from the database DASHBOARD_COUNTER_TTL seconds after its last count,
+which bounds the drift from increments that race a recount. Reads of a counter that is due (or
+invalidated) serve the cached value and recount it on a background thread; only a counter that
+isn't cached at all is counted inline.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.timezone import localdate, localtime
+
+from analytics.models import Analytics
+from menu.models import Variations
+from orders.models import Orders
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+VALUE_TIMEOUT = 60 * 60 * 48
+UNKNOWN = object()
+
+
+def _day_range(day):
+    start = timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+    return start, start + timedelta(days=1)
+
+
+def _today_orders(bucket):
+    start, end = _day_range(datetime.strptime(bucket, '%Y-%m-%d').date())
+    return Orders.objects.filter(created_at__gte=start, created_at__lt=end).count()
+
+
+def _is_low_stock(variation):
+    return variation.is_available and variation.stock_level <= settings.DASHBOARD_LOW_STOCK_THRESHOLD
+
+
+class Counter:
+    """
+    `bucket(instance)` names the bucket the instance is counted in (None if it isn't counted) and
+    only reads `fields`; `current()` the bucket the dashboard shows and `count(bucket)` recounts one from the database.
+    """
+
+    def __init__(self, name, model, fields, bucket, count, current=lambda: ''):
+        self.name = name
+        self.model = model
+        self.fields = set(fields)
+        self.bucket = bucket
+        self.count = count
+        self.current = current
+
+
+COUNTERS = [
+    Counter(
+        'total_users', User, [],
+        bucket=lambda user: '',
+        count=lambda bucket: User.objects.count(),
+    ),
+    Counter(
+        'today_orders', Orders, ['created_at'],
+        bucket=lambda order: localtime(order.created_at).date().isoformat() if order.created_at else None,
+        count=_today_orders,
+        current=lambda: localdate().isoformat(),
+    ),
+    Counter(
+        'pending_orders', Orders, ['status'],
+        bucket=lambda order: '' if order.status == 'pending' else None,
+        count=lambda bucket: Orders.objects.filter(status='pending').count(),
+    ),
+    Counter(
+        'low_stock_variations', Variations, ['stock_level', 'is_available'],
+        bucket=lambda variation: '' if _is_low_stock(variation) else None,
+        count=lambda bucket: Variations.objects.filter(
+            is_available=True, stock_level__lte=settings.DASHBOARD_LOW_STOCK_THRESHOLD
+        ).count(),
+    ),
+    Counter(
+        'unread_recommendations', Analytics, ['recommendation', 'is_viewed'],
+        bucket=lambda report: '' if report.recommendation is not None and not report.is_viewed else None,
+        count=lambda bucket: Analytics.objects.filter(recommendation__isnull=False, is_viewed=False).count(),
+    ),
+]
+COUNTERS_BY_NAME = {counter.name: counter for counter in COUNTERS}
+TRACKED_MODELS = {counter.model for counter in COUNTERS}
+
+
+def _key(name, bucket):
+    return f"dashboard:{name}:{bucket}"
+
+
+def _checked_key(name, bucket):
+    # Present while the counter's last recount is recent enough.
+    return f"dashboard:checked:{name}:{bucket}"
+
+
+def _counters_for(instance, update_fields=None):
+    return [
+        counter for counter in COUNTERS
+        if isinstance(instance, counter.model) and (update_fields is None or counter.fields & update_fields)
+    ]
+
+
+def _fields(counters):
+    return set().union(*(counter.fields for counter in counters))
+
+
+def _buckets(instance):
+    deferred = instance.get_deferred_fields()
+    return {
+        counter.name: UNKNOWN if counter.fields & deferred else counter.bucket(instance)
+        for counter in _counters_for(instance)
+    }
+
+
+def _apply(deltas, invalid):
+    if invalid:
+        invalidate(*invalid)
+    for (name, bucket), delta in deltas.items():
+        if not delta:
+            continue
+        try:
+            cache.incr(_key(name, bucket), delta)
+        except ValueError:
+            # Not cached; the next read counts it.
+            pass
+
+
+def _moved(name, old, new, deltas, invalid):
+    if old is UNKNOWN or new is UNKNOWN:
+        invalid.add(name)
+    elif old != new:
+        if old is not None:
+            deltas[(name, old)] = deltas.get((name, old), 0) - 1
+        if new is not None:
+            deltas[(name, new)] = deltas.get((name, new), 0) + 1
+
+
+def saving(instance, update_fields):
+    """Reads the counted fields of the row `instance` is about to overwrite."""
+    update_fields = set(update_fields) if update_fields is not None else None
+    counters = _counters_for(instance, update_fields)
+    if not instance._state.adding:
+        # Counters that depend on no field (row counts) can't change when a row is updated.
+        counters = [counter for counter in counters if counter.fields]
+    old = None
+    if counters and not instance._state.adding:
+        old = (
+            type(instance)._base_manager.using(instance._state.db)
+            .filter(pk=instance.pk).values(*_fields(counters)).first()
+        )
+    instance._dashboard_saving = (counters, update_fields, old)
+
+
+def changed(instance, created):
+    counters, update_fields, old = instance.__dict__.pop('_dashboard_saving', ([], None, None))
+    if not counters:
+        return
+    # Fields the save didn't write keep their old value; the rest were all loaded.
+    new = dict(old or {})
+    for name in _fields(counters):
+        if update_fields is None or name in update_fields:
+            new[name] = getattr(instance, name)
+    before_row = SimpleNamespace(**old) if old is not None else None
+    after_row = SimpleNamespace(**new)
+
+    deltas, invalid = {}, set()
+    for counter in counters:
+        if created:
+            before = None
+        elif before_row is None:
+            # An update of a row we couldn't read beforehand.
+            before = UNKNOWN
+        else:
+            before = counter.bucket(before_row)
+        _moved(counter.name, before, counter.bucket(after_row), deltas, invalid)
+    if deltas or invalid:
+        transaction.on_commit(lambda: _apply(deltas, invalid))
+
+
+def removed(instance):
+    deltas, invalid = {}, set()
+    for name, bucket in _buckets(instance).items():
+        _moved(name, bucket, None, deltas, invalid)
+    if deltas or invalid:
+        transaction.on_commit(lambda: _apply(deltas, invalid))
+
+
+def invalidate(*names):
+    """Makes the named counters (all by default) due for a recount on their next read."""
+    cache.delete_many([_checked_key(name, COUNTERS_BY_NAME[name].current()) for name in names or COUNTERS_BY_NAME])
+
+
+def refresh(name):
+    counter = COUNTERS_BY_NAME[name]
+    bucket = counter.current()
+    value = counter.count(bucket)
+    cache.set(_key(name, bucket), value, VALUE_TIMEOUT)
+    cache.set(_checked_key(name, bucket), True, settings.DASHBOARD_COUNTER_TTL)
+    return value
+
+
+_executor = None
+_executor_lock = threading.Lock()
+_refreshing = set()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dashboard-refresh')
+        return _executor
+
+
+def _refresh_in_background(names):
+    try:
+        for name in names:
+            refresh(name)
+    except Exception:
+        logger.exception("Dashboard counter refresh failed")
+    finally:
+        with _executor_lock:
+            _refreshing.difference_update(names)
+        close_old_connections()
+
+
+def refresh_in_background(names):
+    with _executor_lock:
+        names = [name for name in names if name not in _refreshing]
+        _refreshing.update(names)
+    if names:
+        _get_executor().submit(_refresh_in_background, names)
+
+
+def snapshot():
+    """Returns ({counter: value}, [names of counters served stale while they are recounted])."""
+    buckets = {counter.name: counter.current() for counter in COUNTERS}
+    values = cache.get_many(
+        [_key(name, bucket) for name, bucket in buckets.items()]
+        + [_checked_key(name, bucket) for name, bucket in buckets.items()]
+    )
+
+    counters = {}
+    stale = []
+    for name, bucket in buckets.items():
+        if _key(name, bucket) not in values:
+            counters[name] = refresh(name)
+            continue
+        counters[name] = values[_key(name, bucket)]
+        if _checked_key(name, bucket) not in values:
+            stale.append(name)
+    if stale:
+        refresh_in_background(stale)
+    return counters, stale
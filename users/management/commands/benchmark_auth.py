@@ -0,0 +1,81 @@
+# backend/users/management/commands/benchmark_auth.py
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from users.models import User
+from users.serializers import MyTokenObtainPairSerializer
+
+# (url name, role of the user requesting it)
+ENDPOINTS = [
+    ('user-order-list', 'customer'),
+    ('admin-order-list', 'staff'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Measures requests/sec on the order list endpoints with database-backed and claims-based JWT users.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Timed requests per endpoint and mode.')
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--customer', help='Email of the customer to request as (default: first active customer).')
+        parser.add_argument('--staff', help='Email of the staff/admin user to request as (default: first active one).')
+
+    def handle(self, *args, **options):
+        users = {
+            'customer': self.pick_user(options['customer'], ['customer']),
+            'staff': self.pick_user(options['staff'], ['staff', 'admin']),
+        }
+        tokens = {role: str(MyTokenObtainPairSerializer.get_token(user).access_token) for role, user in users.items()}
+
+        columns = ['endpoint', 'mode', 'requests', 'req_per_sec', 'mean_ms', 'queries']
+        self.stdout.write("  ".join(f"{c:>16}" for c in columns))
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for name, role in ENDPOINTS:
+                url = reverse(name)
+                results = {}
+                for mode, stateless in (('database', False), ('claims', True)):
+                    with override_settings(JWT_STATELESS_USER=stateless):
+                        results[mode] = self.run(url, tokens[role], options['requests'], options['warmup'])
+                    result = results[mode]
+                    self.stdout.write("  ".join(f"{v!s:>16}" for v in (
+                        name, mode, options['requests'], f"{result['req_per_sec']:.1f}",
+                        f"{result['mean_ms']:.2f}", result['queries'],
+                    )))
+                speedup = results['claims']['req_per_sec'] / results['database']['req_per_sec']
+                self.stdout.write(self.style.SUCCESS(f"{name}: claims-based users are {speedup:.2f}x the database throughput."))
+
+    def pick_user(self, email, roles):
+        users = User.objects.filter(is_active=True, role__in=roles)
+        user = users.filter(email__iexact=email).first() if email else users.order_by('id').first()
+        if user is None:
+            raise CommandError(f"No active {'/'.join(roles)} user found{f' with email {email}' if email else ''}.")
+        return user
+
+    def run(self, url, token, num_requests, warmup):
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {token}")
+        for _ in range(warmup):
+            response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f"GET {url} returned {response.status_code}: {response.content[:200]!r}")
+
+        # The test client resets connection.queries per request, so count through a wrapper.
+        queries = []
+        with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+            client.get(url)
+
+        started = time.perf_counter()
+        for _ in range(num_requests):
+            client.get(url)
+        elapsed = time.perf_counter() - started
+        return {
+            'req_per_sec': num_requests / elapsed,
+            'mean_ms': elapsed / num_requests * 1000,
+            'queries': len(queries),
+        }
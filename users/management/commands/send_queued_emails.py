@@ -0,0 +1,24 @@
+# backend/users/management/commands/send_queued_emails.py
+
+import time
+from django.core.management.base import BaseCommand
+
+from users import outbox
+
+
+class Command(BaseCommand):
+    help = 'Delivers queued emails from the outbox over one reused mail connection per batch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=outbox.BATCH_SIZE, help='Emails claimed and sent per connection.')
+        parser.add_argument('--loop', action='store_true', help='Keep running, polling the outbox.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --loop.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = outbox.drain(batch_size=options['batch_size'])
+            if sent or failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f"Sent {sent} emails; {failed} failed or scheduled for retry."))
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -1,6 +1,8 @@
 # users/models.py
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
 from .managers import CustomUserManager 
 
 
@@ -22,6 +24,36 @@ class User(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        # Login looks users up by lower(email).
+        indexes = [models.Index(Lower('email'), name='users_user_email_lower_idx')]
 
     def __str__(self):
-        return self.email
\ No newline at end of file
+        return self.email
+
+class OutgoingEmail(models.Model):
+    # Transactional email outbox: rows are written with the change that triggers them and
+    # delivered afterwards by users.outbox, so requests never wait on the mail server.
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Earliest time of the next delivery attempt; while 'sending' it is the claim's lease expiry.
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def __str__(self):
+        return f"{self.subject} to {self.to_email} ({self.status})"
@@ -0,0 +1,174 @@
+# backend/users/outbox.py
+"""
+Delivery of queued OutgoingEmail rows.
+
+`drain` claims due rows in batches (skipping rows another sender has locked), sends each
+batch over a single backend connection, and records each outcome as soon as it is known:
+sent, retried later with exponential backoff, or failed after EMAIL_OUTBOX_MAX_ATTEMPTS. A
+claim is a lease: rows left 'sending' by a crashed sender become due again once
+`next_attempt_at` passes. The lease is renewed before every send, so a slow batch can't have
+its rows re-claimed and sent again, and a crash re-sends at most the message in flight.
+
+`wake` is called after a commit that queued mail and runs `drain` on a background thread of
+the current process, so no separate worker is needed unless EMAIL_OUTBOX_AUTO_SEND is off.
+"""
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+LEASE = timedelta(minutes=5)
+BACKOFF_BASE = timedelta(seconds=30)
+
+
+def _claim(batch_size):
+    now = timezone.now()
+    due = OutgoingEmail.objects.filter(
+        Q(status='pending') | Q(status='sending'), next_attempt_at__lte=now
+    ).order_by('next_attempt_at')
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        batch = list(due[:batch_size])
+        OutgoingEmail.objects.filter(id__in=[m.id for m in batch]).update(
+            status='sending', next_attempt_at=now + LEASE
+        )
+    for message in batch:
+        message.status = 'sending'
+        message.next_attempt_at = now + LEASE
+    return batch
+
+
+def _retry_later(message, error, max_attempts):
+    message.last_error = str(error)
+    if message.attempts >= max_attempts:
+        message.status = 'failed'
+    else:
+        message.status = 'pending'
+        message.next_attempt_at = timezone.now() + BACKOFF_BASE * 2 ** (message.attempts - 1)
+
+
+RESULT_FIELDS = ['status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at']
+
+
+def _claimed(message, lease):
+    # Matches only while this sender's claim stands; another sender re-claiming sets a new lease.
+    return OutgoingEmail.objects.filter(id=message.id, status='sending', next_attempt_at=lease)
+
+
+def _renew_lease(message):
+    """Extends the claim before a send; False if the lease ran out and another sender took it."""
+    lease = timezone.now() + LEASE
+    if not _claimed(message, message.next_attempt_at).update(next_attempt_at=lease):
+        return False
+    message.next_attempt_at = lease
+    return True
+
+
+def _record(message, lease):
+    _claimed(message, lease).update(**{field: getattr(message, field) for field in RESULT_FIELDS})
+
+
+def _deliver(batch, max_attempts):
+    sent = failed = 0
+    unsent = list(batch)
+    mail_connection = get_connection(fail_silently=False)
+    try:
+        mail_connection.open()
+        while unsent:
+            message = unsent[0]
+            if not _renew_lease(message):
+                unsent.pop(0)
+                continue
+            lease = message.next_attempt_at
+            email = EmailMessage(
+                subject=message.subject,
+                body=message.body,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[message.to_email],
+                connection=mail_connection,
+            )
+            email.content_subtype = "html"
+            message.attempts += 1
+            try:
+                email.send()
+            except Exception as e:
+                logger.warning("Error sending email %s to %s: %s", message.id, message.to_email, e)
+                _retry_later(message, e, max_attempts)
+                _record(message, lease)
+                unsent.pop(0)
+                failed += 1
+                # The connection may be what failed; reconnect before the next message.
+                mail_connection.close()
+                mail_connection.open()
+            else:
+                # Recorded right away, so a crash or an expired lease never sends it twice.
+                message.status = 'sent'
+                message.sent_at = timezone.now()
+                message.last_error = ''
+                _record(message, lease)
+                unsent.pop(0)
+                sent += 1
+    except Exception as e:
+        # Could not (re)connect: every message not yet attempted is retried later.
+        logger.warning("Email connection failed: %s", e)
+        for message in unsent:
+            lease = message.next_attempt_at
+            message.attempts += 1
+            _retry_later(message, e, max_attempts)
+            _record(message, lease)
+            failed += 1
+    finally:
+        mail_connection.close()
+    return sent, failed
+
+
+def drain(batch_size=BATCH_SIZE, max_attempts=None):
+    """Delivers every due email. Returns (sent, failed) where failed includes retries."""
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    sent = failed = 0
+    while True:
+        batch = _claim(batch_size)
+        if not batch:
+            return sent, failed
+        batch_sent, batch_failed = _deliver(batch, max_attempts)
+        sent += batch_sent
+        failed += batch_failed
+
+
+_wake_event = threading.Event()
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def _run_sender():
+    while True:
+        _wake_event.wait(timeout=60)
+        _wake_event.clear()
+        try:
+            drain()
+        except Exception:
+            logger.exception("Email outbox drain failed")
+        finally:
+            close_old_connections()
+
+
+def wake():
+    global _sender
+    if not settings.EMAIL_OUTBOX_AUTO_SEND:
+        return
+    with _sender_lock:
+        if _sender is None:
+            _sender = threading.Thread(target=_run_sender, name='email-outbox', daemon=True)
+            _sender.start()
+    _wake_event.set()
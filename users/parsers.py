@@ -0,0 +1,23 @@
+# backend/users/parsers.py
+import csv
+import io
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+def read_csv(text):
+    return list(csv.DictReader(io.StringIO(text.lstrip('\ufeff'))))
+
+
+class CSVParser(BaseParser):
+    """Parses a CSV body with a header row into a list of dicts."""
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        try:
+            text = stream.read().decode(encoding)
+        except UnicodeDecodeError as e:
+            raise ParseError(f"CSV parse error - {e}")
+        return read_csv(text)
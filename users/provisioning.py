@@ -0,0 +1,115 @@
+# backend/users/provisioning.py
+"""
+Bulk creation of staff accounts.
+
+Every row is validated before anything is written: field rules match StaffUserSerializer, and
+emails are checked for duplicates within the batch and against existing accounts in a single
+query. Passwords are hashed on a thread pool (PBKDF2 in hashlib releases the GIL, so threads
+hash in parallel), the users are inserted with one `bulk_create`, and their activation emails
+are queued in the outbox together.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.tokens import default_token_generator
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework import serializers
+
+from .models import User
+from .utils import queue_emails
+from . import dashboard
+
+
+class StaffRowSerializer(serializers.Serializer):
+    email = serializers.EmailField(max_length=254)
+    first_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    last_name = serializers.CharField(max_length=150, required=False, allow_blank=True, default='')
+    password = serializers.CharField(write_only=True, min_length=8)
+
+
+def validate_rows(rows):
+    """
+    Returns (valid, results): `valid` maps row index -> validated data, `results` has one entry
+    per row, with the errors of invalid rows.
+    """
+    valid = {}
+    results = []
+    seen = {}
+    for index, row in enumerate(rows):
+        result = {'row': index + 1, 'email': row.get('email') if isinstance(row, dict) else None}
+        results.append(result)
+        if not isinstance(row, dict):
+            result.update(status='invalid', errors={'non_field_errors': ["Expected an object."]})
+            continue
+        serializer = StaffRowSerializer(data=row)
+        if not serializer.is_valid():
+            result.update(status='invalid', errors=serializer.errors)
+            continue
+        data = serializer.validated_data
+        email_key = data['email'].lower()
+        if email_key in seen:
+            result.update(status='invalid', errors={'email': [f"Duplicate of row {seen[email_key] + 1}."]})
+            continue
+        seen[email_key] = index
+        valid[index] = data
+
+    existing = set(
+        User.objects.annotate(email_key=Lower('email')).filter(email_key__in=list(seen))
+        .values_list('email_key', flat=True)
+    )
+    for index in list(valid):
+        if valid[index]['email'].lower() in existing:
+            results[index].update(status='invalid', errors={'email': ["A user with this email already exists."]})
+            del valid[index]
+    return valid, results
+
+
+def _hash_passwords(passwords):
+    workers = min(settings.STAFF_IMPORT_HASH_WORKERS, len(passwords)) or 1
+    if workers == 1:
+        return [make_password(p) for p in passwords]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(make_password, passwords))
+
+
+def _activation_context(user):
+    token = default_token_generator.make_token(user)
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+
+    frontend_url = "http://localhost:5173"
+    return {
+        'user': user,
+        'activation_link': f"{frontend_url}/activate/{uid}/{token}/",
+    }
+
+
+@transaction.atomic
+def create_staff(valid):
+    """Creates inactive staff users from validated rows ({index: data}); returns {index: user}."""
+    indexes = list(valid)
+    hashes = _hash_passwords([valid[i]['password'] for i in indexes])
+    users = User.objects.bulk_create([
+        User(
+            username=valid[i]['email'],
+            email=User.objects.normalize_email(valid[i]['email']),
+            password=password_hash,
+            first_name=valid[i]['first_name'],
+            last_name=valid[i]['last_name'],
+            role='staff',
+            is_active=False,
+        )
+        for i, password_hash in zip(indexes, hashes)
+    ])
+
+    queue_emails(
+        subject="Welcome! Activate Your Luk's by GoodChoice Account",
+        template="account_activation_email.html",
+        messages=[(user.email, _activation_context(user)) for user in users],
+    )
+    # bulk_create doesn't send post_save.
+    transaction.on_commit(lambda: dashboard.invalidate('total_users'))
+    return dict(zip(indexes, users))
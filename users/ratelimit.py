@@ -0,0 +1,118 @@
+# backend/users/ratelimit.py
+"""
+Token-bucket rate limiting for login attempts.
+
+Each key (a client IP or an account email) has a bucket holding up to `capacity` tokens that
+refills at `refill_per_minute` (which must be positive). Every attempt takes one token, and an
+empty bucket rejects the attempt before the password is hashed. The 'local' backend keeps buckets
+in this process; the 'cache' backend stores them in the default Django cache so every worker
+shares them (the read-modify-write is not atomic, so concurrent attempts may occasionally both
+pass).
+"""
+import abc
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+MAX_LOCAL_BUCKETS = 10000
+
+
+class TokenBucket(abc.ABC):
+    def __init__(self, scope, capacity, refill_per_minute):
+        self.scope = scope
+        self.capacity = capacity
+        self.rate = refill_per_minute / 60
+
+    def _refill(self, state, now):
+        if state is None:
+            return float(self.capacity)
+        tokens, updated = state
+        return min(self.capacity, tokens + (now - updated) * self.rate)
+
+    def _wait(self, tokens):
+        """Seconds until a token is available."""
+        return (1 - tokens) / self.rate
+
+    @abc.abstractmethod
+    def take(self, key):
+        """Takes a token for `key`. Returns None if allowed, else the seconds to wait."""
+
+
+class LocalTokenBucket(TokenBucket):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._refill(self._buckets.get(key), now)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return self._wait(tokens)
+            if key not in self._buckets and len(self._buckets) >= MAX_LOCAL_BUCKETS:
+                self._prune(now)
+            self._buckets[key] = (tokens - 1, now)
+        return None
+
+    def _prune(self, now):
+        # Full buckets carry no state; drop them, or everything if that isn't enough.
+        full = [k for k, state in self._buckets.items() if self._refill(state, now) >= self.capacity]
+        for k in full:
+            del self._buckets[k]
+        if len(self._buckets) >= MAX_LOCAL_BUCKETS:
+            self._buckets.clear()
+
+
+class CacheTokenBucket(TokenBucket):
+    def take(self, key):
+        now = time.time()
+        cache_key = f"login-ratelimit:{self.scope}:{hashlib.sha256(key.encode()).hexdigest()}"
+        tokens = self._refill(cache.get(cache_key), now)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Kept until the bucket would be full again.
+        timeout = int((self.capacity - tokens) / self.rate) + 1
+        cache.set(cache_key, (tokens, now), timeout)
+        return None if allowed else self._wait(tokens)
+
+
+BACKENDS = {
+    'local': LocalTokenBucket,
+    'cache': CacheTokenBucket,
+}
+
+_limiters = None
+_limiters_lock = threading.Lock()
+
+
+def _get_limiters():
+    global _limiters
+    with _limiters_lock:
+        if _limiters is None:
+            bucket_class = BACKENDS[settings.LOGIN_RATE_LIMIT_BACKEND]
+            _limiters = (
+                bucket_class('ip', settings.LOGIN_IP_BURST, settings.LOGIN_IP_REFILL_PER_MINUTE),
+                bucket_class('account', settings.LOGIN_ACCOUNT_BURST, settings.LOGIN_ACCOUNT_REFILL_PER_MINUTE),
+            )
+    return _limiters
+
+
+def check_login(ip, email):
+    """
+    Takes a token from the client's and the account's buckets. Returns None if the login
+    attempt may proceed, else the seconds until it may be retried.
+    """
+    if not settings.LOGIN_RATE_LIMIT_ENABLED:
+        return None
+    ip_bucket, account_bucket = _get_limiters()
+    wait = ip_bucket.take(ip or 'unknown')
+    # A client that is already limited doesn't use up the account's tokens.
+    if wait is None and email:
+        wait = account_bucket.take(email.strip().lower())
+    return wait
@@ -7,13 +7,21 @@ from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 from django.conf import settings
 from django.utils import timezone
+from django.db import transaction
+from django.contrib.auth.models import update_last_login
+from django.db.models.functions import Lower
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import BaseThrottle
 from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 
 
 
 
 from .models import User
-from .utils import send_email 
+from .utils import queue_email
+from .authentication import VERSION_CLAIM, token_version
+from . import ratelimit
 
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
@@ -21,13 +29,21 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
         token['first_name'] = user.first_name
         token['role'] = user.role
+        token[VERSION_CLAIM] = token_version(user)
         return token
 
     def validate(self, attrs):
         email = attrs.get('email')
         password = attrs.get('password')
 
-        user = User.objects.filter(email__iexact=email).first()
+        request = self.context.get('request')
+        wait = ratelimit.check_login(BaseThrottle().get_ident(request) if request else None, email)
+        if wait is not None:
+            raise Throttled(wait=wait, detail='Too many login attempts. Please try again later.')
+
+        # One lookup, served by the lower(email) index; the password is checked on this row
+        # rather than authenticating (and querying) again through the auth backend.
+        user = User.objects.alias(email_lower=Lower('email')).filter(email_lower=email.lower()).first()
 
         if user is None:
             raise AuthenticationFailed('No active account found with the given credentials.', code='authentication_failed')
@@ -38,7 +54,14 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
                 code='account_not_active'
             )
 
-        data = super().validate(attrs)
+        if not user.check_password(password):
+            raise AuthenticationFailed('No active account found with the given credentials.', code='no_active_account')
+
+        self.user = user
+        refresh = self.get_token(user)
+        data = {'refresh': str(refresh), 'access': str(refresh.access_token)}
+        if jwt_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user)
 
         data['role'] = self.user.role
         data['id'] = self.user.id
@@ -54,6 +77,7 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = User
         fields = ('email', 'password', 'first_name', 'last_name')
 
+    @transaction.atomic
     def create(self, validated_data):
         user = User.objects.create_user(
             username=validated_data['email'],
@@ -78,12 +102,7 @@ class RegisterSerializer(serializers.ModelSerializer):
             'activation_link': activation_link,
         }
 
-        print("\n\n" + "="*20)
-        print("!!! ATTEMPTING TO SEND ACTIVATION EMAIL !!!")
-        print(f"To: {user.email}")
-        print("="*20 + "\n\n")
-
-        send_email(
+        queue_email(
             subject="Activate Your Luk's by GoodChoice Account",
             template="account_activation_email.html",
             to_email=user.email,
@@ -101,6 +120,7 @@ class StaffUserSerializer(serializers.ModelSerializer):
         fields = ('id', 'email', 'first_name', 'last_name', 'password', 'role')
         read_only_fields = ('id', 'role')
 
+    @transaction.atomic
     def create(self, validated_data):
         user = User.objects.create_user(
             username=validated_data['email'],
@@ -123,7 +143,7 @@ class StaffUserSerializer(serializers.ModelSerializer):
             'activation_link': activation_link, 
         }
 
-        send_email(
+        queue_email(
             subject="Welcome! Activate Your Luk's by GoodChoice Account",
             template="account_activation_email.html", 
             to_email=user.email,
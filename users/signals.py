@@ -0,0 +1,22 @@
+# backend/users/signals.py
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from . import dashboard
+
+
+def read_dashboard_counters(sender, instance, update_fields, **kwargs):
+    dashboard.saving(instance, update_fields)
+
+
+def update_dashboard_counters(sender, instance, created, **kwargs):
+    dashboard.changed(instance, created)
+
+
+def remove_from_dashboard_counters(sender, instance, **kwargs):
+    dashboard.removed(instance)
+
+
+for model in dashboard.TRACKED_MODELS:
+    pre_save.connect(read_dashboard_counters, sender=model)
+    post_save.connect(update_dashboard_counters, sender=model)
+    post_delete.connect(remove_from_dashboard_counters, sender=model)
@@ -1,3 +1,290 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from menu.models import Categories, MenuItems, Variations
+from orders.models import Orders
+from . import dashboard, outbox, ratelimit
+from .models import OutgoingEmail
+
+NOW = timezone.now()
+
+
+class OutboxTests(TestCase):
+    def queue(self, n=1, **fields):
+        fields.setdefault('next_attempt_at', NOW)
+        return [
+            OutgoingEmail.objects.create(to_email=f"user{i}@example.com", subject='Hi', body='<p>Hi</p>', **fields)
+            for i in range(n)
+        ]
+
+    def drain(self, at=NOW, **kwargs):
+        with mock.patch('django.utils.timezone.now', return_value=at):
+            return outbox.drain(**kwargs)
+
+    def test_due_messages_are_sent_once(self):
+        first, second = self.queue(2)
+        [later] = self.queue(next_attempt_at=NOW + timedelta(minutes=1))
+
+        self.assertEqual(self.drain(batch_size=1), (2, 0))
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), [first.to_email, second.to_email])
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.attempts, first.sent_at), ('sent', 1, NOW))
+        later.refresh_from_db()
+        self.assertEqual(later.status, 'pending')
+
+        self.assertEqual(self.drain(), (0, 0))
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_failures_back_off_exponentially_then_fail(self):
+        [message] = self.queue()
+        at = NOW
+        send = mock.patch.object(outbox.EmailMessage, 'send', side_effect=OSError('refused'))
+        with send, self.assertLogs('users.outbox', 'WARNING'):
+            for attempt, delay in [(1, 30), (2, 60), (3, 120)]:
+                self.assertEqual(self.drain(at=at, max_attempts=4), (0, 1))
+                message.refresh_from_db()
+                self.assertEqual((message.status, message.attempts), ('pending', attempt))
+                self.assertEqual(message.next_attempt_at, at + timedelta(seconds=delay))
+                self.assertEqual(message.last_error, 'refused')
+                # Not due again before the backoff has passed.
+                self.assertEqual(self.drain(at=message.next_attempt_at - timedelta(seconds=1)), (0, 0))
+                at = message.next_attempt_at
+
+            self.assertEqual(self.drain(at=at, max_attempts=4), (0, 1))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('failed', 4))
+        self.assertEqual(self.drain(at=at + timedelta(days=1)), (0, 0))
+
+    def test_a_failure_doesnt_stop_the_batch(self):
+        self.queue(3)
+        sends = iter([None, OSError('timeout'), None])
+
+        def send(*args, **kwargs):
+            error = next(sends)
+            if error:
+                raise error
+
+        with mock.patch.object(outbox.EmailMessage, 'send', send), self.assertLogs('users.outbox', 'WARNING'):
+            self.assertEqual(self.drain(), (2, 1))
+        self.assertEqual(OutgoingEmail.objects.filter(status='sent').count(), 2)
+        self.assertEqual(OutgoingEmail.objects.filter(status='pending', attempts=1).count(), 1)
+
+    def test_connection_failure_retries_the_whole_batch(self):
+        self.queue(2)
+        with mock.patch.object(outbox, 'get_connection') as get_connection, self.assertLogs('users.outbox', 'WARNING'):
+            get_connection.return_value.open.side_effect = OSError('no route to host')
+            self.assertEqual(self.drain(), (0, 2))
+        self.assertEqual(OutgoingEmail.objects.filter(status='pending', attempts=1).count(), 2)
+        self.assertEqual(mail.outbox, [])
+
+    def test_claimed_messages_wait_for_their_lease(self):
+        [message] = self.queue()
+        with mock.patch('django.utils.timezone.now', return_value=NOW):
+            [claimed] = outbox._claim(10)
+        self.assertEqual(claimed.next_attempt_at, NOW + outbox.LEASE)
+
+        # Another sender finds nothing due while the lease holds...
+        self.assertEqual(self.drain(at=NOW + outbox.LEASE - timedelta(seconds=1)), (0, 0))
+        # ...and picks the message up once the claiming sender has died and the lease ran out.
+        self.assertEqual(self.drain(at=NOW + outbox.LEASE), (1, 0))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), ('sent', 1))
+
+    def test_a_lost_lease_is_not_sent(self):
+        first, second = self.queue(2)
+        with mock.patch('django.utils.timezone.now', return_value=NOW):
+            batch = outbox._claim(10)
+        # The lease on the second message ran out and another sender claimed it.
+        OutgoingEmail.objects.filter(pk=second.pk).update(next_attempt_at=NOW + timedelta(hours=1))
+
+        with mock.patch('django.utils.timezone.now', return_value=NOW + timedelta(seconds=1)):
+            self.assertEqual(outbox._deliver(batch, max_attempts=5), (1, 0))
+        self.assertEqual([m.to[0] for m in mail.outbox], [first.to_email])
+        second.refresh_from_db()
+        self.assertEqual((second.status, second.attempts), ('sending', 0))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class RateLimitTestCase(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch.object(ratelimit, 'time', mock.Mock(monotonic=self.clock, time=self.clock))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(ratelimit.cache.clear)
+
+
+class TokenBucketTests(RateLimitTestCase):
+    def assert_refills(self, bucket):
+        # A burst of 3, then one token every 2 seconds (30 per minute).
+        self.assertEqual([bucket.take('k') for _ in range(3)], [None, None, None])
+        self.assertAlmostEqual(bucket.take('k'), 2.0)
+        self.clock.now += 1.5
+        self.assertAlmostEqual(bucket.take('k'), 0.5)
+        self.clock.now += 0.5
+        self.assertIsNone(bucket.take('k'))
+        self.assertAlmostEqual(bucket.take('k'), 2.0)
+        # Other keys have their own bucket.
+        self.assertIsNone(bucket.take('other'))
+        # Refill stops at capacity.
+        self.clock.now += 3600
+        self.assertEqual([bucket.take('k') for _ in range(4)][-2:], [None, 2.0])
+
+    def test_local_bucket(self):
+        self.assert_refills(ratelimit.LocalTokenBucket('test', 3, 30))
+
+    def test_cache_bucket(self):
+        self.assert_refills(ratelimit.CacheTokenBucket('test', 3, 30))
+
+    def test_local_bucket_prunes_full_buckets(self):
+        bucket = ratelimit.LocalTokenBucket('test', 2, 60)
+        with mock.patch.object(ratelimit, 'MAX_LOCAL_BUCKETS', 3):
+            bucket.take('limited')
+            bucket.take('limited')
+            bucket.take('a')
+            bucket.take('b')
+            self.clock.now += 60
+            bucket.take('limited')
+            bucket.take('limited')
+            bucket.take('c')
+        # 'a' and 'b' had refilled and were dropped; 'limited' kept its empty bucket.
+        self.assertEqual(set(bucket._buckets), {'limited', 'c'})
+        self.assertIsNotNone(bucket.take('limited'))
+
+    def test_base_class_is_abstract(self):
+        with self.assertRaises(TypeError):
+            ratelimit.TokenBucket('test', 1, 1)
+
+
+@override_settings(
+    LOGIN_RATE_LIMIT_ENABLED=True, LOGIN_RATE_LIMIT_BACKEND='local',
+    LOGIN_IP_BURST=4, LOGIN_IP_REFILL_PER_MINUTE=60,
+    LOGIN_ACCOUNT_BURST=2, LOGIN_ACCOUNT_REFILL_PER_MINUTE=6,
+)
+class LoginLockoutTests(RateLimitTestCase):
+    def setUp(self):
+        super().setUp()
+        ratelimit._limiters = None
+        self.addCleanup(setattr, ratelimit, '_limiters', None)
+
+    def test_account_locks_out_across_ips(self):
+        self.assertIsNone(ratelimit.check_login('10.0.0.1', 'Ana@example.com'))
+        self.assertIsNone(ratelimit.check_login('10.0.0.2', ' ana@example.com'))
+        self.assertAlmostEqual(ratelimit.check_login('10.0.0.3', 'ana@example.com'), 10.0)
+        self.assertIsNone(ratelimit.check_login('10.0.0.3', 'ben@example.com'))
+        self.clock.now += 10
+        self.assertIsNone(ratelimit.check_login('10.0.0.4', 'ana@example.com'))
+
+    def test_ip_locks_out_across_accounts(self):
+        for i in range(4):
+            self.assertIsNone(ratelimit.check_login('10.0.0.1', f"user{i}@example.com"))
+        self.assertAlmostEqual(ratelimit.check_login('10.0.0.1', 'ana@example.com'), 1.0)
+        # The rejected attempt didn't use up the account's tokens.
+        self.assertIsNone(ratelimit.check_login('10.0.0.2', 'ana@example.com'))
+        self.assertIsNone(ratelimit.check_login('10.0.0.2', 'ana@example.com'))
+
+    @override_settings(LOGIN_RATE_LIMIT_ENABLED=False)
+    def test_disabled(self):
+        for _ in range(10):
+            self.assertIsNone(ratelimit.check_login('10.0.0.1', 'ana@example.com'))
+
+
+@override_settings(DASHBOARD_LOW_STOCK_THRESHOLD=10)
+class DashboardCounterTests(TestCase):
+    def setUp(self):
+        dashboard.cache.clear()
+        self.addCleanup(dashboard.cache.clear)
+        category = Categories.objects.create(name='Silog')
+        self.variation = Variations.objects.create(
+            menu_item=MenuItems.objects.create(category=category, name='Tapsilog'),
+            size_name='Regular', price=100, stock_level=50,
+        )
+        self.pending = self.create_order('pending')
+        self.completed = self.create_order('completed')
+        self.counters()
+
+    def create_order(self, status):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Orders.objects.create(
+                order_number=f"T{Orders.objects.count()}", total_amount=100, status=status, dining_method='dine-in',
+            )
+
+    def counters(self):
+        counters, stale = dashboard.snapshot()
+        self.assertEqual(stale, [])
+        return counters
+
+    def assert_counts(self, **expected):
+        counters = self.counters()
+        self.assertEqual({name: counters[name] for name in expected}, expected)
+        # The cached counters agree with a recount.
+        for name in expected:
+            counter = dashboard.COUNTERS_BY_NAME[name]
+            self.assertEqual(counter.count(counter.current()), expected[name])
+
+    def test_counts_start_from_the_database(self):
+        self.assert_counts(pending_orders=1, today_orders=2, low_stock_variations=0)
+
+    def test_status_changes_move_the_order(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pending.status = 'processing'
+            self.pending.save()
+        self.assert_counts(pending_orders=0, today_orders=2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.completed.status = 'pending'
+            self.completed.save(update_fields=['status'])
+        self.assert_counts(pending_orders=1, today_orders=2)
+
+        # A save that doesn't change the bucket leaves the counter alone.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.completed.save()
+        self.assert_counts(pending_orders=1)
+
+    def test_new_and_deleted_orders(self):
+        order = self.create_order('pending')
+        self.assert_counts(pending_orders=2, today_orders=3)
+        with self.captureOnCommitCallbacks(execute=True):
+            order.delete()
+        self.assert_counts(pending_orders=1, today_orders=2)
+
+    def test_deferred_loads_use_the_stored_values(self):
+        order = Orders.objects.only('id', 'status').get(pk=self.pending.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = 'completed'
+            order.save()
+        self.assert_counts(pending_orders=0, today_orders=2)
+
+        variation = Variations.objects.defer('is_available').get(pk=self.variation.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            variation.stock_level = 3
+            variation.save()
+        self.assert_counts(low_stock_variations=1)
+
+    def test_saves_of_uncounted_fields_skip_the_lookup(self):
+        # Only the UPDATE itself: the counted fields aren't being written.
+        with self.assertNumQueries(1):
+            self.pending.total_amount = 150
+            self.pending.save(update_fields=['total_amount'])
+
+    def test_bulk_updates_need_invalidate(self):
+        Orders.objects.filter(status='pending').update(status='cancelled')
+        dashboard.invalidate('pending_orders')
+        with mock.patch.object(dashboard, 'refresh_in_background') as refresh_in_background:
+            counters, stale = dashboard.snapshot()
+        # Served from the cache while it is recounted in the background.
+        self.assertEqual((counters['pending_orders'], stale), (1, ['pending_orders']))
+        refresh_in_background.assert_called_once_with(['pending_orders'])
+        dashboard.refresh('pending_orders')
+        self.assert_counts(pending_orders=0)
@@ -1,6 +1,6 @@
 # users/urls.py
 from django.urls import path
-from .views import RegisterView, MyTokenObtainPairView, AdminDashboardDataView, StaffUserListView, StaffUserDetailView, UserProfileView, ActivateAccountView, RequestPasswordResetView, PasswordResetConfirmView, ChangePasswordView
+from .views import RegisterView, MyTokenObtainPairView, AdminDashboardDataView, StaffUserListView, StaffUserBulkCreateView, StaffUserDetailView, UserProfileView, ActivateAccountView, RequestPasswordResetView, PasswordResetConfirmView, ChangePasswordView
 from rest_framework_simplejwt.views import TokenRefreshView
 
 urlpatterns = [
@@ -14,6 +14,7 @@ urlpatterns = [
 
 
     path('admin/staff/', StaffUserListView.as_view(), name='admin-staff-list'),
+    path('admin/staff/bulk/', StaffUserBulkCreateView.as_view(), name='admin-staff-bulk-create'),
     path('admin/staff/<int:id>/', StaffUserDetailView.as_view(), name='admin-staff-detail'),
 
     path('activate/<str:uidb64>/<str:token>/', ActivateAccountView.as_view(), name='activate'), 
@@ -1,18 +1,27 @@
 # backend/users/utils.py
-from django.core.mail import EmailMessage
+from django.db import transaction
 from django.template.loader import render_to_string
-from django.conf import settings
 
-def send_email(subject, template, to_email, context):
+from .models import OutgoingEmail
+from . import outbox
+
+
+def queue_email(subject, template, to_email, context):
+    """
+    Renders `template` and adds the email to the outbox. It is written in the caller's
+    transaction and delivered by users.outbox once that commits.
+    """
     html_content = render_to_string(template, context)
-    email = EmailMessage(
-        subject=subject,
-        body=html_content,
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=[to_email]
-    )
-    email.content_subtype = "html" 
-    try:
-        email.send()
-    except Exception as e:
-        print(f"Error sending email to {to_email}: {e}")
\ No newline at end of file
+    email = OutgoingEmail.objects.create(subject=subject, body=html_content, to_email=to_email)
+    transaction.on_commit(outbox.wake)
+    return email
+
+
+def queue_emails(subject, template, messages):
+    """Like `queue_email` for many recipients at once; `messages` is a list of (to_email, context)."""
+    emails = OutgoingEmail.objects.bulk_create([
+        OutgoingEmail(subject=subject, body=render_to_string(template, context), to_email=to_email)
+        for to_email, context in messages
+    ])
+    transaction.on_commit(outbox.wake)
+    return emails
@@ -3,13 +3,16 @@
 from rest_framework import generics, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.views import APIView
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
 
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.utils.encoding import force_str, force_bytes 
-from django.shortcuts import redirect 
+from django.shortcuts import get_object_or_404, redirect
+from django.conf import settings
+from django.db import IntegrityError
 
 from .models import User
 from .serializers import (
@@ -22,7 +25,9 @@ from .serializers import (
     ChangePasswordSerializer,
 )
 from .permissions import IsAdminUser
-from .utils import send_email 
+from .utils import queue_email
+from . import dashboard, provisioning
+from .parsers import CSVParser, read_csv
 from backend.pagination import StandardResultsSetPagination
 
 
@@ -76,7 +81,7 @@ class RequestPasswordResetView(generics.GenericAPIView):
 
             context = {'user': user, 'reset_link': reset_link}
             
-            send_email(
+            queue_email(
                 subject="Password Reset Request for Luk's by GoodChoice",
                 template="password_reset_email.html",
                 to_email=user.email,
@@ -121,15 +126,15 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        return get_object_or_404(User, pk=self.request.user.id)
 
 
 class AdminDashboardDataView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def get(self, request):
-        total_users = User.objects.count()
-        data = {"message": "Welcome to the Admin Dashboard!", "total_users": total_users}
+        counters, stale = dashboard.snapshot()
+        data = {"message": "Welcome to the Admin Dashboard!", **counters, "refreshing": stale}
         return Response(data)
 
 
@@ -142,6 +147,51 @@ class StaffUserListView(generics.ListCreateAPIView):
         return User.objects.filter(role='staff').order_by('first_name')
 
 
+class StaffUserBulkCreateView(APIView):
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    parser_classes = [JSONParser, CSVParser, MultiPartParser]
+
+    def post(self, request):
+        """
+        Creates staff accounts from a JSON list (or {"users": [...]}), a text/csv body or an
+        uploaded CSV `file`, with email, first_name, last_name and password per row. Nothing is
+        created if any row is invalid unless `partial=true` is passed.
+        """
+        rows = request.data
+        if 'file' in request.FILES:
+            try:
+                rows = read_csv(request.FILES['file'].read().decode('utf-8'))
+            except UnicodeDecodeError:
+                return Response({"error": "The CSV file must be UTF-8 encoded."}, status=status.HTTP_400_BAD_REQUEST)
+        elif isinstance(rows, dict):
+            rows = rows.get('users')
+        if not isinstance(rows, list) or not rows:
+            return Response({"error": "Provide a non-empty list of users."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > settings.STAFF_IMPORT_MAX_ROWS:
+            return Response(
+                {"error": f"At most {settings.STAFF_IMPORT_MAX_ROWS} users can be created at once."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        valid, results = provisioning.validate_rows(rows)
+        partial = request.query_params.get('partial', '').lower() in ('true', '1')
+        if not valid or (len(valid) < len(rows) and not partial):
+            for index in valid:
+                results[index]['status'] = 'valid'
+            return Response({"created": 0, "results": results}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            users = provisioning.create_staff(valid) if valid else {}
+        except IntegrityError:
+            return Response(
+                {"error": "Some of these emails were registered while importing. Please retry."},
+                status=status.HTTP_409_CONFLICT
+            )
+        for index, user in users.items():
+            results[index].update(status='created', id=user.id)
+        return Response({"created": len(users), "results": results}, status=status.HTTP_201_CREATED)
+
+
 class StaffUserDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = StaffUserSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
@@ -152,7 +202,7 @@ class StaffUserDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        if instance == request.user:
+        if instance.id == request.user.id:
             return Response(
                 {"error": "Admins cannot delete their own account through this interface."},
                 status=status.HTTP_403_FORBIDDEN
@@ -166,7 +216,7 @@ class ChangePasswordView(generics.UpdateAPIView):
     permission_classes = (IsAuthenticated,)
 
     def get_object(self, queryset=None):
-        return self.request.user
+        return get_object_or_404(User, pk=self.request.user.id)
 
     def update(self, request, *args, **kwargs):
         self.object = self.get_object()
@@ -178,7 +228,13 @@ class ChangePasswordView(generics.UpdateAPIView):
             
             self.object.set_password(serializer.data.get("new_password"))
             self.object.save()
-            
-            return Response({"detail": "Password updated successfully"}, status=status.HTTP_200_OK)
+
+            # The new password revokes existing tokens; hand back a fresh pair.
+            refresh = MyTokenObtainPairSerializer.get_token(self.object)
+            return Response({
+                "detail": "Password updated successfully",
+                "refresh": str(refresh),
+                "access": str(refresh.access_token),
+            }, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file